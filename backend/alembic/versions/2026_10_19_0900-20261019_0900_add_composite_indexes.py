@@ -0,0 +1,98 @@
+"""add composite indexes for hot queries
+
+Revision ID: 20261019_0900
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+Adds the indexes declared in app/models for keyset pagination, leaderboard
+and membership lookups, and enforces one membership per (season, user).
+Tables are created by `init_db()` on first start, so indexes on tables that
+do not exist yet are skipped: `create_all` will create them with the table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_0900'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, unique)
+INDEXES = [
+    ("ix_seasons_created_at_id", "seasons", ["created_at", "id"], False),
+    ("ix_seasons_created_by", "seasons", ["created_by"], False),
+    ("uq_season_members_season_user", "season_members", ["season_id", "user_id"], True),
+    ("ix_season_members_user_id", "season_members", ["user_id"], False),
+    ("ix_challenges_season_created_at_id", "challenges", ["season_id", "created_at", "id"], False),
+    ("ix_challenges_season_challenge_date", "challenges", ["season_id", "challenge_date"], False),
+    ("ix_challenge_submissions_challenge_created_at_id", "challenge_submissions", ["challenge_id", "created_at", "id"], False),
+    ("ix_challenge_submissions_user_challenge", "challenge_submissions", ["user_id", "challenge_id"], False),
+    ("ix_scores_user_season_created_at_id", "scores", ["user_id", "season_id", "created_at", "id"], False),
+    ("ix_scores_season_user_score_date", "scores", ["season_id", "user_id", "score_date"], False),
+    ("ix_user_badges_user_badge", "user_badges", ["user_id", "badge_id"], False),
+    ("ix_user_badges_season_id", "user_badges", ["season_id"], False),
+]
+
+
+def _existing_tables() -> set:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _partitioned_tables() -> set:
+    # CREATE INDEX CONCURRENTLY is not supported on partitioned tables
+    if op.get_bind().dialect.name != "postgresql":
+        return set()
+    result = op.get_bind().execute(sa.text("SELECT relname FROM pg_class WHERE relkind = 'p'"))
+    return {row[0] for row in result}
+
+
+def upgrade() -> None:
+    tables = _existing_tables()
+    partitioned = _partitioned_tables()
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    # Drop duplicate memberships left by the old check-then-insert join,
+    # keeping the earliest one, so the unique index can be built
+    if is_postgres and "season_members" in tables:
+        op.execute(
+            """
+            DELETE FROM season_members a
+            USING season_members b
+            WHERE a.season_id = b.season_id
+              AND a.user_id = b.user_id
+              AND (a.joined_at > b.joined_at OR (a.joined_at = b.joined_at AND a.id > b.id))
+            """
+        )
+
+    # Build indexes without blocking writes on live tables
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            if table not in tables:
+                continue
+            op.create_index(
+                name, table, columns,
+                unique=unique,
+                if_not_exists=True,
+                postgresql_concurrently=is_postgres and table not in partitioned,
+            )
+
+
+def downgrade() -> None:
+    tables = _existing_tables()
+    partitioned = _partitioned_tables()
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            if table not in tables:
+                continue
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=is_postgres and table not in partitioned,
+            )
@@ -0,0 +1,118 @@
+"""partition the score ledger by season
+
+Revision ID: 20261019_1000
+Revises: 20261019_0900
+Create Date: 2026-10-19 10:00:00
+
+On PostgreSQL, rebuilds `scores` as a LIST-partitioned table on season_id,
+with one partition per existing season and a default partition, and
+copies the ledger over. Other dialects keep a plain table (SQLite tests
+build the schema with `create_all`). Also adds `score_archives`, which
+records completed seasons moved to cold storage.
+"""
+from typing import Sequence, Union
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_1000'
+down_revision: Union[str, None] = '20261019_0900'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = (
+    "id, season_id, user_id, challenge_id, points, score_type, description, "
+    "score_date, model_metadata, created_at"
+)
+
+SCORE_INDEXES = [
+    ("ix_scores_user_season_created_at_id", ["user_id", "season_id", "created_at", "id"]),
+    ("ix_scores_season_user_score_date", ["season_id", "user_id", "score_date"]),
+]
+
+
+def _is_partitioned(bind) -> bool:
+    return bool(bind.execute(sa.text(
+        "SELECT 1 FROM pg_class WHERE relname = 'scores' AND relkind = 'p'"
+    )).scalar())
+
+
+def _create_scores_table(partitioned: bool) -> None:
+    op.create_table(
+        "scores",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("season_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("seasons.id"), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("challenge_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("challenges.id"), nullable=True),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("score_type", sa.String(30), nullable=False),
+        sa.Column("description", sa.String(200), nullable=False),
+        sa.Column("score_date", sa.Date(), nullable=False),
+        sa.Column("model_metadata", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", "season_id", name="scores_pkey"),
+        postgresql_partition_by="LIST (season_id)" if partitioned else None,
+    )
+    for name, columns in SCORE_INDEXES:
+        op.create_index(name, "scores", columns)
+
+
+def _move_aside(old_name: str) -> None:
+    # Free the table, primary key and index names for the rebuilt table
+    op.rename_table("scores", old_name)
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT scores_pkey TO {old_name}_pkey")
+    for name, _ in SCORE_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+
+    if "score_archives" not in tables and "seasons" in tables:
+        op.create_table(
+            "score_archives",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("season_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("seasons.id"), nullable=False, unique=True),
+            sa.Column("location", sa.String(500), nullable=False),
+            sa.Column("checksum", sa.String(64), nullable=False),
+            sa.Column("row_count", sa.Integer(), nullable=False),
+            sa.Column("points_total", sa.Integer(), nullable=False),
+            sa.Column("archived_at", sa.DateTime(), nullable=False),
+        )
+
+    if bind.dialect.name != "postgresql" or "scores" not in tables or _is_partitioned(bind):
+        return
+
+    _move_aside("scores_unpartitioned")
+    _create_scores_table(partitioned=True)
+    op.execute("CREATE TABLE scores_default PARTITION OF scores DEFAULT")
+
+    for (season_id,) in bind.execute(sa.text("SELECT id FROM seasons")):
+        season_uuid = uuid.UUID(str(season_id))
+        op.execute(
+            f"CREATE TABLE scores_s_{season_uuid.hex} PARTITION OF scores "
+            f"FOR VALUES IN ('{season_uuid}')"
+        )
+
+    op.execute(f"INSERT INTO scores ({COLUMNS}) SELECT {COLUMNS} FROM scores_unpartitioned")
+    op.drop_table("scores_unpartitioned")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == "postgresql" and _is_partitioned(bind):
+        _move_aside("scores_partitioned")
+        _create_scores_table(partitioned=False)
+        op.execute(f"INSERT INTO scores ({COLUMNS}) SELECT {COLUMNS} FROM scores_partitioned")
+        # Dropping the parent drops every season partition with it
+        op.drop_table("scores_partitioned")
+
+    if "score_archives" in sa.inspect(bind).get_table_names():
+        op.drop_table("score_archives")
@@ -0,0 +1,43 @@
+"""add per-season user streaks
+
+Revision ID: 20261019_1100
+Revises: 20261019_1000
+Create Date: 2026-10-19 11:00:00
+
+Adds `user_streaks`, the incrementally maintained streak state per
+(user, season). Existing ledgers are replayed into it with
+`python -m app.cli rebuild-streaks`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_1100'
+down_revision: Union[str, None] = '20261019_1000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    # Without users and seasons yet, `init_db()` creates the table with them
+    if "user_streaks" in tables or not {"users", "seasons"} <= tables:
+        return
+    op.create_table(
+        "user_streaks",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("season_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("seasons.id"), primary_key=True),
+        sa.Column("current_streak", sa.Integer(), nullable=False),
+        sa.Column("longest_streak", sa.Integer(), nullable=False),
+        sa.Column("last_active_date", sa.Date(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    if "user_streaks" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table("user_streaks")
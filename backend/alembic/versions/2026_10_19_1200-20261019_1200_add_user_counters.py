@@ -0,0 +1,41 @@
+"""add badge counters
+
+Revision ID: 20261019_1200
+Revises: 20261019_1100
+Create Date: 2026-10-19 12:00:00
+
+Adds `user_counters`, the per-(user, season) totals badge criteria are
+evaluated against. Existing ledgers are replayed into it, and badges
+already deserved are awarded, with `python -m app.cli rebuild-badges`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_1200'
+down_revision: Union[str, None] = '20261019_1100'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    # Without users and seasons yet, `init_db()` creates the table with them
+    if "user_counters" in tables or not {"users", "seasons"} <= tables:
+        return
+    op.create_table(
+        "user_counters",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("season_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("seasons.id"), primary_key=True),
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("value", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    if "user_counters" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table("user_counters")
@@ -0,0 +1,68 @@
+"""add stats rollups and rank indexes
+
+Revision ID: 20261019_1300
+Revises: 20261019_1200
+Create Date: 2026-10-19 13:00:00
+
+Adds the remaining per-season stats to `season_members` (attempted
+challenges, rare badges, last activity), the cross-season `user_stats`
+rollup, and the indexes used to count a member's season and global rank.
+Existing data is filled in with `python -m app.cli reconcile-counters`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_1300'
+down_revision: Union[str, None] = '20261019_1200'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MEMBER_COLUMNS = [
+    sa.Column("challenges_attempted", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("rare_badges", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("last_activity_at", sa.DateTime(), nullable=True),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if "season_members" in tables:
+        existing = {column["name"] for column in inspector.get_columns("season_members")}
+        for column in MEMBER_COLUMNS:
+            if column.name not in existing:
+                op.add_column("season_members", column)
+        op.create_index(
+            "ix_season_members_season_total_points", "season_members", ["season_id", "total_points"],
+            if_not_exists=True,
+        )
+
+    if "user_stats" not in tables and "users" in tables:
+        op.create_table(
+            "user_stats",
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("total_points", sa.Integer(), nullable=False),
+            sa.Column("challenges_completed", sa.Integer(), nullable=False),
+            sa.Column("challenges_attempted", sa.Integer(), nullable=False),
+            sa.Column("badges_earned", sa.Integer(), nullable=False),
+            sa.Column("rare_badges", sa.Integer(), nullable=False),
+            sa.Column("last_activity_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_user_stats_total_points", "user_stats", ["total_points"])
+
+
+def downgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "user_stats" in tables:
+        op.drop_table("user_stats")
+    if "season_members" in tables:
+        op.drop_index("ix_season_members_season_total_points", table_name="season_members", if_exists=True)
+        for column in reversed(MEMBER_COLUMNS):
+            op.drop_column("season_members", column.name)
@@ -0,0 +1,50 @@
+"""add daily leaderboard snapshots
+
+Revision ID: 20261019_1400
+Revises: 20261019_1300
+Create Date: 2026-10-19 14:00:00
+
+Adds `seasons.timezone`, whose midnight closes a season's day, and
+`leaderboard_snapshots`, the end-of-day standings stored as compact rank
+vectors by `python -m app.cli snapshot-leaderboards`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_1400'
+down_revision: Union[str, None] = '20261019_1300'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    # Without seasons yet, `init_db()` creates both with it
+    if "seasons" not in tables:
+        return
+    if "timezone" not in {column["name"] for column in inspector.get_columns("seasons")}:
+        op.add_column("seasons", sa.Column("timezone", sa.String(length=50), nullable=True))
+    if "leaderboard_snapshots" in tables:
+        return
+    op.create_table(
+        "leaderboard_snapshots",
+        sa.Column("season_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("seasons.id"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("user_ids", sa.LargeBinary(), nullable=False),
+        sa.Column("points", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "leaderboard_snapshots" in tables:
+        op.drop_table("leaderboard_snapshots")
+    if "seasons" in tables:
+        op.drop_column("seasons", "timezone")
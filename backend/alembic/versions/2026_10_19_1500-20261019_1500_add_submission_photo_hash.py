@@ -0,0 +1,34 @@
+"""add photo hashes to submissions
+
+Revision ID: 20261019_1500
+Revises: 20261019_1400
+Create Date: 2026-10-19 15:00:00
+
+Adds `challenge_submissions.photo_hash`, the perceptual hash of an
+uploaded photo, against which later photos of the season are checked
+for near-duplicates. Earlier submissions are left without one.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_1500'
+down_revision: Union[str, None] = '20261019_1400'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "challenge_submissions" not in inspector.get_table_names():
+        return
+    if "photo_hash" not in {column["name"] for column in inspector.get_columns("challenge_submissions")}:
+        op.add_column("challenge_submissions", sa.Column("photo_hash", sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    if "challenge_submissions" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_column("challenge_submissions", "photo_hash")
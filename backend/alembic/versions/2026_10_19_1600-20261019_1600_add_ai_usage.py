@@ -0,0 +1,40 @@
+"""add daily AI usage
+
+Revision ID: 20261019_1600
+Revises: 20261019_1500
+Create Date: 2026-10-19 16:00:00
+
+Adds `ai_usage`, the tokens and estimated cost of AI calls per season
+and per user each day, checked against the daily AI quotas.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_1600'
+down_revision: Union[str, None] = '20261019_1500'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if "ai_usage" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "ai_usage",
+        sa.Column("scope", sa.String(length=10), primary_key=True),
+        sa.Column("owner_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("tokens", sa.BigInteger(), nullable=False),
+        sa.Column("cost", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    if "ai_usage" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table("ai_usage")
@@ -0,0 +1,73 @@
+"""enforce one active submission per user and challenge
+
+Revision ID: 20261019_1700
+Revises: 20261019_1600
+Create Date: 2026-10-19 17:00:00
+
+Adds a partial unique index on `challenge_submissions (user_id,
+challenge_id)` over pending and accepted submissions, so concurrent
+submits can't both record one. Duplicates left by the old
+check-then-insert are rejected first, keeping the earliest; their
+scores, if any, are left in the ledger.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_1700'
+down_revision: Union[str, None] = '20261019_1600'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = "uq_challenge_submissions_active_user_challenge"
+STATUSES = "('PENDING', 'APPROVED', 'NEEDS_REVIEW')"
+ACTIVE = f"status IN {STATUSES}"
+
+
+def upgrade() -> None:
+    if "challenge_submissions" not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    op.execute(
+        f"""
+        UPDATE challenge_submissions
+        SET status = 'REJECTED', validation_notes = 'Duplicate submission'
+        WHERE {ACTIVE}
+          AND EXISTS (
+            SELECT 1 FROM challenge_submissions earlier
+            WHERE earlier.user_id = challenge_submissions.user_id
+              AND earlier.challenge_id = challenge_submissions.challenge_id
+              AND earlier.status IN {STATUSES}
+              AND (earlier.created_at < challenge_submissions.created_at
+                   OR (earlier.created_at = challenge_submissions.created_at
+                       AND earlier.id < challenge_submissions.id))
+          )
+        """
+    )
+
+    # Build the index without blocking writes on a live table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDEX, "challenge_submissions", ["user_id", "challenge_id"],
+            unique=True,
+            if_not_exists=True,
+            postgresql_where=sa.text(ACTIVE),
+            sqlite_where=sa.text(ACTIVE),
+            postgresql_concurrently=is_postgres,
+        )
+
+
+def downgrade() -> None:
+    if "challenge_submissions" not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX, table_name="challenge_submissions",
+            if_exists=True,
+            postgresql_concurrently=op.get_bind().dialect.name == "postgresql",
+        )
@@ -0,0 +1,154 @@
+"""
+Maintenance commands for Lake Holidays Challenge
+Usage: python -m app.cli <command> [options]
+"""
+
+import argparse
+import asyncio
+import sys
+
+import structlog
+
+from app.database import AsyncSessionLocal, close_db
+
+logger = structlog.get_logger()
+
+
+async def archive_scores(args: argparse.Namespace) -> int:
+    """Move completed seasons' scores to cold storage."""
+    from app.services.score_ledger_service import ScoreLedgerService
+    
+    async with AsyncSessionLocal() as db:
+        ledger = ScoreLedgerService(db)
+        if args.season_id:
+            archive = await ledger.archive_season(args.season_id)
+            archives = [archive] if archive else []
+        else:
+            archives = await ledger.archive_completed_seasons()
+    
+    for archive in archives:
+        print(f"{archive.season_id}: {archive.row_count} scores -> {archive.location}")
+    print(f"{len(archives)} season(s) archived")
+    return 0
+
+
+async def rebuild_streaks(args: argparse.Namespace) -> int:
+    """Recompute streaks from the score ledger and award missing streak bonuses."""
+    from app.services.streak_service import StreakService
+    
+    async with AsyncSessionLocal() as db:
+        counts = await StreakService(db).rebuild(args.season_id)
+    
+    print(f"{counts['streaks']} streak(s) rebuilt, {counts['bonuses']} missing bonus(es) awarded")
+    return 0
+
+
+async def rebuild_badges(args: argparse.Namespace) -> int:
+    """Recompute badge counters from the ledger and award badges already deserved."""
+    from app.services.badge_service import BadgeEngine
+    
+    async with AsyncSessionLocal() as db:
+        counts = await BadgeEngine(db).rebuild(args.season_id)
+    
+    print(f"{counts['counters']} counter(s) rebuilt, {counts['badges']} missing badge(s) awarded")
+    return 0
+
+
+async def reconcile_counters(args: argparse.Namespace) -> int:
+    """Check the stats rollups against the ledger and report drift."""
+    from app.services.member_counters import MemberCounters, COUNTERS
+    
+    async with AsyncSessionLocal() as db:
+        drift = await MemberCounters(db).reconcile(args.season_id, fix=not args.dry_run)
+    
+    for row in drift:
+        print(
+            f"{row['season_id'] or 'global'} {row['user_id']}: "
+            + ", ".join(f"{name} {row[name]:+d}" for name in COUNTERS)
+        )
+    print(f"{len(drift)} row(s) drifted" + ("" if args.dry_run or not drift else ", corrected"))
+    return 1 if drift and args.dry_run else 0
+
+
+async def snapshot_leaderboards(args: argparse.Namespace) -> int:
+    """Snapshot the final standings of seasons whose day ended at local midnight."""
+    from app.services.leaderboard_snapshots import LeaderboardSnapshots
+    
+    async with AsyncSessionLocal() as db:
+        taken = await LeaderboardSnapshots(db).take_due()
+    
+    for snapshot in taken:
+        print(f"{snapshot['season_id']} {snapshot['day']}: {snapshot['members']} member(s)")
+    print(f"{len(taken)} snapshot(s) taken")
+    return 0
+
+
+async def generate_challenges(args: argparse.Namespace) -> int:
+    """Pre-generate tomorrow's daily challenges for every running season."""
+    from app.services.challenge_generation import ChallengeGenerator
+    from app.services.ai_budget import ai_budget
+    from app.services.ai_client import ai_client
+    
+    try:
+        async with AsyncSessionLocal() as db:
+            summary = await ChallengeGenerator(db).generate_due()
+    finally:
+        # Each season's usage, counted in memory until now
+        await ai_budget.flush()
+        await ai_client.aclose()
+    
+    print(
+        f"{summary['challenges']} challenge(s) for {summary['seasons']} season(s) "
+        f"from {summary['generations']} generation(s), {summary['failed']} failed"
+    )
+    return 1 if summary["failed"] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    archive = commands.add_parser("archive-scores", help=archive_scores.__doc__)
+    archive.add_argument("--season-id", help="Archive a single completed season")
+    archive.set_defaults(handler=archive_scores)
+    
+    streaks = commands.add_parser("rebuild-streaks", help=rebuild_streaks.__doc__)
+    streaks.add_argument("--season-id", help="Rebuild a single season")
+    streaks.set_defaults(handler=rebuild_streaks)
+    
+    badges = commands.add_parser("rebuild-badges", help=rebuild_badges.__doc__)
+    badges.add_argument("--season-id", help="Rebuild a single season")
+    badges.set_defaults(handler=rebuild_badges)
+    
+    reconcile = commands.add_parser("reconcile-counters", help=reconcile_counters.__doc__)
+    reconcile.add_argument("--season-id", help="Reconcile a single season")
+    reconcile.add_argument("--dry-run", action="store_true", help="Report drift without correcting it")
+    reconcile.set_defaults(handler=reconcile_counters)
+    
+    snapshots = commands.add_parser("snapshot-leaderboards", help=snapshot_leaderboards.__doc__)
+    snapshots.set_defaults(handler=snapshot_leaderboards)
+    
+    generate = commands.add_parser("generate-challenges", help=generate_challenges.__doc__)
+    generate.set_defaults(handler=generate_challenges)
+    
+    return parser
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        return await args.handler(args)
+    finally:
+        await close_db()
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
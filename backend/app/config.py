@@ -51,6 +51,30 @@ class Settings(BaseSettings):
     azure_openai_endpoint: Optional[str] = None
     azure_openai_api_key: Optional[str] = None
     azure_openai_api_version: str = "2023-12-01-preview"
+    ai_model: str = "gpt-4o-mini"  # Deployment name on Azure OpenAI
+    ai_embedding_model: str = "text-embedding-3-small"
+    ai_base_url: Optional[str] = None  # OpenAI-compatible endpoint, e.g. the local fake provider
+    ai_max_concurrency: int = 8  # In-flight calls per provider
+    ai_max_connections: int = 20
+    ai_timeout: float = 30.0  # Deadline per call, retries included (seconds)
+    ai_max_retries: int = 3
+    
+    # Generated challenge content cache
+    ai_cache_size: int = 1024  # Entries kept in memory
+    ai_cache_ttl: float = 7 * 24 * 3600.0  # Seconds
+    ai_cache_path: Optional[str] = "./cache/ai_responses.sqlite3"  # Unset to keep the cache in memory only
+    ai_cache_similarity: float = 0.0  # Cosine similarity for near-identical themes, e.g. 0.92; 0 disables
+    
+    # AI budget: daily token quotas (0 disables) and price estimates
+    ai_season_daily_tokens: int = 200_000
+    ai_user_daily_tokens: int = 50_000
+    ai_prompt_token_cost: float = 0.15  # USD per million prompt tokens
+    ai_completion_token_cost: float = 0.60  # USD per million completion tokens
+    ai_usage_flush_interval: float = 30.0  # Seconds between writes of the usage counters
+    
+    # Daily challenges, pre-generated overnight
+    daily_challenge_hour: int = 8  # Local hour the day's challenges open
+    challenge_generation_concurrency: int = 4  # Generations in flight during the nightly run
     
     # Azure Storage
     azure_storage_connection_string: Optional[str] = None
@@ -77,6 +101,29 @@ class Settings(BaseSettings):
     # Geography
     default_timezone: str = "UTC"
     
+    # Score ledger archival (mount cold storage, e.g. Azure Files, here)
+    score_archive_directory: str = "./archives/scores"
+    
+    # Background submission validation
+    submission_workers: int = 8  # As many as photo_batch_size, so a batch can fill up
+    submission_queue_size: int = 1000
+    submission_max_attempts: int = 3
+    photo_batch_size: int = 8  # Photos analyzed per provider request
+    photo_batch_wait: float = 0.2  # Seconds a photo waits for others to batch with
+    photo_screen_model_path: Optional[str] = None  # ONNX classifier settling clear-cut photos locally
+    photo_screen_approve_above: float = 0.95
+    photo_screen_reject_below: float = 0.05
+    photo_screen_threads: int = 2
+    photo_duplicate_distance: int = 8  # Perceptual hash bits (of 64) within which two photos are the same
+    
+    # Live quiz rounds (seconds)
+    quiz_question_seconds: float = 20.0
+    quiz_lobby_seconds: float = 3.0
+    quiz_pause_seconds: float = 3.0
+    
+    # Live leaderboard: at most one push per season per interval (seconds)
+    leaderboard_push_interval: float = 1.0
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -6,7 +6,9 @@ Handles SQLAlchemy async engine and session creation
 import os
 import sys
 from typing import AsyncGenerator
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.pool import StaticPool
@@ -19,6 +21,12 @@ class Base(DeclarativeBase):
     pass
 
 
+@compiles(UUID, "sqlite")
+def compile_uuid_sqlite(type_, compiler, **kw):
+    """Render PostgreSQL UUID columns as CHAR(32) on SQLite (used by tests)."""
+    return "CHAR(32)"
+
+
 def get_database_url():
     """Get the database URL with proper async driver selection."""
     # Check for explicit test environment
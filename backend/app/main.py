@@ -4,15 +4,21 @@ Entry point for the gamified family vacation API
 """
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 import structlog
 import time
 
 from app.config import settings
 from app.database import init_db, close_db
+from app.services.ai_budget import ai_budget
+from app.services.ai_client import ai_client
+from app.services.photo_screening import photo_screener
+from app.services.submission_pipeline import submission_pipeline
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.responses import FastJSONResponse
 from app.routers import (
     auth,
     profiles,
@@ -63,10 +69,17 @@ async def lifespan(app: FastAPI):
         logger.error("Failed to initialize database", error=str(e))
         raise
     
+    await submission_pipeline.start()
+    await ai_budget.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Lake Holidays Challenge API")
+    await submission_pipeline.stop()
+    await ai_budget.stop()
+    await ai_client.aclose()
+    photo_screener.close()
     await close_db()
     logger.info("Application shutdown complete")
 
@@ -80,6 +93,7 @@ app = FastAPI(
     redoc_url="/redoc" if settings.environment != "production" else None,
     openapi_url="/openapi.json" if settings.environment != "production" else None,
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Add middleware
@@ -89,6 +103,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Trust proxy headers in production
@@ -163,7 +178,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
     
     if settings.environment == "development":
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "detail": "Internal server error",
@@ -172,7 +187,7 @@ async def global_exception_handler(request: Request, exc: Exception):
             }
         )
     else:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"detail": "Internal server error"}
         )
@@ -188,6 +203,12 @@ app.include_router(scoring.router, prefix="/scoring", tags=["Scoring & Leaderboa
 app.include_router(ai_content.router, prefix="/ai", tags=["AI Content Generation"])
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics, scraped as annotated on the backend pods."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/", include_in_schema=False)
 async def root():
     """Root endpoint - API information."""
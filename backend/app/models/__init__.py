@@ -5,7 +5,8 @@ Database models for Lake Holidays Challenge
 from app.models.user import User, UserProfile
 from app.models.season import Season, SeasonMember  
 from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType
-from app.models.scoring import Score, Badge, UserBadge
+from app.models.scoring import Score, ScoreArchive, LeaderboardSnapshot, UserStreak, UserCounter, UserStatsRollup, Badge, UserBadge
+from app.models.ai import AIUsage
 
 __all__ = [
     "User",
@@ -16,6 +17,12 @@ __all__ = [
     "ChallengeSubmission",
     "ChallengeType",
     "Score",
+    "ScoreArchive",
+    "LeaderboardSnapshot",
+    "UserStreak",
+    "UserCounter",
+    "UserStatsRollup",
     "Badge",
     "UserBadge",
+    "AIUsage",
 ]
@@ -0,0 +1,34 @@
+"""
+AI usage accounting model
+Tracks tokens and estimated cost against daily quotas
+"""
+
+from datetime import datetime, date
+from sqlalchemy import Column, String, DateTime, Date, Float, BigInteger
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped
+
+from app.database import Base
+
+
+class AIUsage(Base):
+    """
+    AI tokens used by a season or a user over one UTC day, and their
+    estimated cost. Accumulated from each process's in-memory counters
+    by AIBudget.
+    """
+    __tablename__ = "ai_usage"
+    
+    scope: Mapped[str] = Column(String(10), primary_key=True)  # "season" or "user"
+    owner_id: Mapped[str] = Column(UUID(as_uuid=True), primary_key=True)  # The season's or the user's id
+    day: Mapped[date] = Column(Date, primary_key=True)
+    
+    # Usage
+    tokens: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    cost: Mapped[float] = Column(Float, default=0.0, nullable=False)  # Estimated, in USD
+    
+    # Timestamps
+    updated_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<AIUsage {self.scope} {self.owner_id} {self.day} {self.tokens} tokens>"
@@ -7,7 +7,7 @@ import uuid
 from datetime import datetime, date
 from enum import Enum
 from typing import List, Optional
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Integer, Float, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Integer, Float, JSON, Index, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped
 
@@ -40,12 +40,23 @@ class SubmissionStatus(str, Enum):
     NEEDS_REVIEW = "needs_review"
 
 
+# Submissions a user may only have one of per challenge: pending or accepted
+# (statuses are stored by name)
+ACTIVE_SUBMISSION = "status IN ('PENDING', 'APPROVED', 'NEEDS_REVIEW')"
+
+
 class Challenge(Base):
     """
     Daily challenge model.
     Generated by AI or manually created.
     """
     __tablename__ = "challenges"
+    __table_args__ = (
+        # Keyset pagination of a season's challenges
+        Index("ix_challenges_season_created_at_id", "season_id", "created_at", "id"),
+        # Daily challenge lookups
+        Index("ix_challenges_season_challenge_date", "season_id", "challenge_date"),
+    )
 
     id: Mapped[str] = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
@@ -112,6 +123,19 @@ class ChallengeSubmission(Base):
     Contains answers, photos, or other response data.
     """
     __tablename__ = "challenge_submissions"
+    __table_args__ = (
+        # Keyset pagination of a challenge's submissions
+        Index("ix_challenge_submissions_challenge_created_at_id", "challenge_id", "created_at", "id"),
+        # "Has this user already submitted?" and per-user history
+        Index("ix_challenge_submissions_user_challenge", "user_id", "challenge_id"),
+        # Concurrent submits can't both record an active submission
+        Index(
+            "uq_challenge_submissions_active_user_challenge", "user_id", "challenge_id",
+            unique=True,
+            postgresql_where=text(ACTIVE_SUBMISSION),
+            sqlite_where=text(ACTIVE_SUBMISSION),
+        ),
+    )
 
     id: Mapped[str] = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
@@ -139,6 +163,9 @@ class ChallengeSubmission(Base):
     validated_at: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
     validation_notes: Mapped[Optional[str]] = Column(Text, nullable=True)
     
+    # Perceptual hash (16 hex digits) of an uploaded photo, for duplicate checks
+    photo_hash: Mapped[Optional[str]] = Column(String(16), nullable=True)
+    
     # Auto-validation for quiz/sport challenges
     auto_validated: Mapped[bool] = Column(Boolean, default=False, nullable=False)
     validation_score: Mapped[Optional[float]] = Column(Float, nullable=True)  # 0.0-1.0 confidence
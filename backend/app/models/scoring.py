@@ -7,7 +7,7 @@ import uuid
 from datetime import datetime, date
 from enum import Enum
 from typing import List, Optional
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Integer, Date, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Integer, Date, JSON, LargeBinary, Index, DDL, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped
 
@@ -37,14 +37,27 @@ class Score(Base):
     """
     Individual scoring event.
     Tracks all point attributions and deductions.
+
+    Append-only ledger, list-partitioned by season on PostgreSQL so that
+    season-scoped queries only touch that season's partition. Partitions
+    are managed by ScoreLedgerService; rows of seasons without a partition
+    land in the default partition.
     """
     __tablename__ = "scores"
+    __table_args__ = (
+        # Keyset pagination of a user's score history within a season
+        Index("ix_scores_user_season_created_at_id", "user_id", "season_id", "created_at", "id"),
+        # Leaderboard, streak and stats aggregations per season
+        Index("ix_scores_season_user_score_date", "season_id", "user_id", "score_date"),
+        {"postgresql_partition_by": "LIST (season_id)"},
+    )
 
+    # The partition key must be part of the primary key on PostgreSQL
     id: Mapped[str] = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    season_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("seasons.id"), primary_key=True)
     
     # Foreign keys
     user_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    season_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("seasons.id"), nullable=False)
     challenge_id: Mapped[Optional[str]] = Column(UUID(as_uuid=True), ForeignKey("challenges.id"), nullable=True)
     
     # Score details
@@ -68,6 +81,129 @@ class Score(Base):
         return f"<Score {self.points}pts for {self.user_id} ({self.score_type})>"
 
 
+# Catch-all partition so inserts never fail for seasons without a partition
+event.listen(
+    Score.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS scores_default PARTITION OF scores DEFAULT").execute_if(dialect="postgresql"),
+)
+
+
+class ScoreArchive(Base):
+    """
+    Archived score ledger of a completed season.
+    The season's rows are moved to a compressed file and dropped from `scores`.
+    """
+    __tablename__ = "score_archives"
+
+    id: Mapped[str] = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    season_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("seasons.id"), nullable=False, unique=True)
+    
+    # Archive location and integrity
+    location: Mapped[str] = Column(String(500), nullable=False)
+    checksum: Mapped[str] = Column(String(64), nullable=False)  # SHA-256 of the compressed file
+    
+    # Summary kept queryable after archival
+    row_count: Mapped[int] = Column(Integer, nullable=False)
+    points_total: Mapped[int] = Column(Integer, nullable=False)
+    
+    # Timestamps
+    archived_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ScoreArchive {self.season_id} ({self.row_count} rows)>"
+
+
+class LeaderboardSnapshot(Base):
+    """
+    A season's standings at the end of one local day, stored as compact
+    rank vectors (see `app.utils.rank_vectors`). Taken after midnight in
+    the season's timezone by `python -m app.cli snapshot-leaderboards`.
+    """
+    __tablename__ = "leaderboard_snapshots"
+
+    season_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("seasons.id"), primary_key=True)
+    day: Mapped[date] = Column(Date, primary_key=True)
+    
+    # Active members in leaderboard order and their point totals
+    user_ids: Mapped[bytes] = Column(LargeBinary, nullable=False)  # 16-byte UUIDs
+    points: Mapped[bytes] = Column(LargeBinary, nullable=False)  # little-endian int32
+    
+    # Timestamps
+    created_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<LeaderboardSnapshot {self.season_id} {self.day}>"
+
+
+class UserStreak(Base):
+    """
+    A user's run of consecutive active days within a season.
+    Updated in place as scores are recorded; rebuilt from the ledger by
+    `python -m app.cli rebuild-streaks`.
+    """
+    __tablename__ = "user_streaks"
+
+    user_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    season_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("seasons.id"), primary_key=True)
+    
+    # Streak state, days counted in the user's timezone
+    current_streak: Mapped[int] = Column(Integer, default=0, nullable=False)
+    longest_streak: Mapped[int] = Column(Integer, default=0, nullable=False)
+    last_active_date: Mapped[date] = Column(Date, nullable=False)
+    
+    # Timestamps
+    updated_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<UserStreak {self.user_id} {self.current_streak} days>"
+
+
+class UserCounter(Base):
+    """
+    Running per-(user, season) total a badge criterion depends on, e.g.
+    points earned or quiz challenges completed.
+    Incremented atomically as scores and submissions are recorded.
+    """
+    __tablename__ = "user_counters"
+
+    user_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    season_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("seasons.id"), primary_key=True)
+    name: Mapped[str] = Column(String(50), primary_key=True)  # "points", "challenges", "challenges:quiz", "perfect"
+    value: Mapped[int] = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<UserCounter {self.user_id} {self.name}={self.value}>"
+
+
+class UserStatsRollup(Base):
+    """
+    A user's totals across all seasons, for profile stats and the global
+    rank. Kept equal to the sum of the user's season memberships by
+    MemberCounters.
+    """
+    __tablename__ = "user_stats"
+    __table_args__ = (
+        # Global rank: users with more points than a given user
+        Index("ix_user_stats_total_points", "total_points"),
+    )
+
+    user_id: Mapped[str] = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    
+    # Totals
+    total_points: Mapped[int] = Column(Integer, default=0, nullable=False)
+    challenges_completed: Mapped[int] = Column(Integer, default=0, nullable=False)
+    challenges_attempted: Mapped[int] = Column(Integer, default=0, nullable=False)
+    badges_earned: Mapped[int] = Column(Integer, default=0, nullable=False)
+    rare_badges: Mapped[int] = Column(Integer, default=0, nullable=False)
+    
+    # Timestamps
+    last_activity_at: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<UserStatsRollup {self.user_id} {self.total_points}pts>"
+
+
 class Badge(Base):
     """
     Available badges/achievements.
@@ -117,6 +253,10 @@ class UserBadge(Base):
     Tracks when and how a user earned each badge.
     """
     __tablename__ = "user_badges"
+    __table_args__ = (
+        Index("ix_user_badges_user_badge", "user_id", "badge_id"),
+        Index("ix_user_badges_season_id", "season_id"),
+    )
 
     id: Mapped[str] = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
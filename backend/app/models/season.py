@@ -6,7 +6,7 @@ Handles vacation seasons and family group management
 import uuid
 from datetime import datetime, date
 from typing import List, Optional
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Date, Float, Boolean, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Date, Float, Boolean, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped
 
@@ -19,6 +19,11 @@ class Season(Base):
     Represents a vacation period with challenges and participants.
     """
     __tablename__ = "seasons"
+    __table_args__ = (
+        # Keyset pagination over (created_at, id)
+        Index("ix_seasons_created_at_id", "created_at", "id"),
+        Index("ix_seasons_created_by", "created_by"),
+    )
 
     id: Mapped[str] = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
@@ -34,6 +39,7 @@ class Season(Base):
     # Season dates
     start_date: Mapped[date] = Column(Date, nullable=False)
     end_date: Mapped[date] = Column(Date, nullable=False)
+    timezone: Mapped[Optional[str]] = Column(String(50), nullable=True)  # Days end at local midnight
     
     # Media
     cover_image_url: Mapped[Optional[str]] = Column(String(500), nullable=True)
@@ -84,6 +90,13 @@ class SeasonMember(Base):
     Tracks who participates in which seasons with roles and status.
     """
     __tablename__ = "season_members"
+    __table_args__ = (
+        # One membership per user and season; also serves season roster lookups
+        Index("uq_season_members_season_user", "season_id", "user_id", unique=True),
+        Index("ix_season_members_user_id", "user_id"),
+        # Season rank: members with more points than a given member
+        Index("ix_season_members_season_total_points", "season_id", "total_points"),
+    )
 
     id: Mapped[str] = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
@@ -98,10 +111,13 @@ class SeasonMember(Base):
     # Status
     is_active: Mapped[bool] = Column(Boolean, default=True, nullable=False)
     
-    # Participation stats
+    # Participation stats, maintained by MemberCounters
     total_points: Mapped[int] = Column(Integer, default=0, nullable=False)
     challenges_completed: Mapped[int] = Column(Integer, default=0, nullable=False)
+    challenges_attempted: Mapped[int] = Column(Integer, default=0, nullable=False)
     badges_earned: Mapped[int] = Column(Integer, default=0, nullable=False)
+    rare_badges: Mapped[int] = Column(Integer, default=0, nullable=False)
+    last_activity_at: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
     
     # Timestamps
     joined_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
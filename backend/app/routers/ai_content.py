@@ -2,22 +2,50 @@
 AI Content router for AI-powered features
 """
 
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+from typing import Dict, Any, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
 
 from app.database import get_db
 from app.models.user import User
-from app.services.ai_service import AIService
+from app.services.ai_budget import Spender
+from app.services.ai_client import AIProviderError
+from app.services.ai_service import ai_service
+from app.services.personalization import PersonalizationService
+from app.services.season_service import SeasonService
+from app.utils.responses import SSE_HEADERS
 from app.utils.security import get_current_user
 
+logger = structlog.get_logger()
 router = APIRouter()
 
+SEASON_QUERY = Query(None, description="Season charged for the call; defaults to the user's current season")
+
+
+async def _spender(db: AsyncSession, user: User, season_id: Optional[uuid.UUID]) -> Spender:
+    """Charge a call to the user and to their season's daily AI budget."""
+    seasons = SeasonService(db)
+    if season_id is None:
+        season_id = await seasons.get_current_season_id(user.id)
+    elif not await seasons.is_member(season_id, user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a member of this season"
+        )
+    return Spender(season_id=season_id, user_id=user.id)
+
 
 @router.post("/generate-challenge")
 async def generate_challenge_content(
     theme: str,
     difficulty: int,
+    location: Optional[str] = None,
+    language: str = "fr",
+    season_id: Optional[uuid.UUID] = SEASON_QUERY,
+    stream: bool = Query(False, description="Stream tokens and fields as Server-Sent Events"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
@@ -28,14 +56,28 @@ async def generate_challenge_content(
             detail="Difficulty must be between 1 and 5"
         )
     
-    ai_service = AIService()
-    content = await ai_service.generate_challenge_content(theme, difficulty)
-    return content
+    spender = await _spender(db, current_user, season_id)
+    if stream:
+        return StreamingResponse(
+            ai_service.stream_challenge_content(theme, difficulty, location, language, spender),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+    try:
+        return await ai_service.generate_challenge_content(theme, difficulty, location, language, spender)
+    except AIProviderError as e:
+        logger.warning("Challenge generation failed", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI provider unavailable, please retry later"
+        )
 
 
 @router.post("/analyze-submission")
 async def analyze_submission(
     submission_content: str,
+    season_id: Optional[uuid.UUID] = SEASON_QUERY,
+    stream: bool = Query(False, description="Stream tokens and fields as Server-Sent Events"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
@@ -46,9 +88,21 @@ async def analyze_submission(
             detail="Submission content cannot be empty"
         )
     
-    ai_service = AIService()
-    analysis = await ai_service.analyze_submission(submission_content)
-    return analysis
+    spender = await _spender(db, current_user, season_id)
+    if stream:
+        return StreamingResponse(
+            ai_service.stream_submission_analysis(submission_content, spender),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+    try:
+        return await ai_service.analyze_submission(submission_content, spender)
+    except AIProviderError as e:
+        logger.warning("Submission analysis failed", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI provider unavailable, please retry later"
+        )
 
 
 @router.get("/suggestions")
@@ -81,15 +135,12 @@ async def get_challenge_suggestions(
 
 @router.post("/personalized-content")
 async def get_personalized_content(
-    user_preferences: Dict[str, Any],
+    user_preferences: Optional[Dict[str, Any]] = Body(None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
-    """Get personalized content based on user preferences."""
-    # Placeholder implementation
-    return {
-        "personalized_challenges": [],
-        "recommended_themes": ["Nature", "Art", "Sport"],
-        "difficulty_recommendation": 2,
-        "motivational_message": f"Salut {current_user.first_name}, prêt pour de nouveaux défis ?"
-    }
+    """
+    Get personalized content based on the user's profile preferences and
+    history. Preferences sent in the body apply to this answer only.
+    """
+    return await PersonalizationService(db).get_content(current_user, user_preferences)
@@ -2,15 +2,23 @@
 Challenges router for daily challenges management
 """
 
+import asyncio
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.models.challenge import SubmissionStatus
 from app.models.user import User
 from app.schemas.challenge import ChallengeCreate, ChallengeUpdate, ChallengeResponse, ChallengeSubmissionCreate, ChallengeSubmissionResponse
-from app.services.challenge_service import ChallengeService
-from app.utils.security import get_current_user
+from app.services.challenge_service import ChallengeService, challenge_projection, submission_projection
+from app.services.quiz_round_service import quiz_rounds, answers_channel, events_channel
+from app.services.season_service import SeasonService
+from app.services.submission_pipeline import submission_pipeline
+from app.services.submission_service import SubmissionService
+from app.utils.pagination import CursorKey, get_cursor, set_next_cursor
+from app.utils.responses import FastJSONResponse
+from app.utils.security import get_current_user, get_websocket_user
 
 router = APIRouter()
 
@@ -24,7 +32,36 @@ async def create_challenge(
     """Create a new challenge."""
     challenge_service = ChallengeService(db)
     challenge = await challenge_service.create_challenge(challenge_data, current_user.id)
-    return challenge
+    return FastJSONResponse(challenge_projection.from_object(challenge))
+
+
+@router.get("/season/{season_id}", response_model=List[ChallengeResponse])
+async def get_season_challenges(
+    season_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    after: Optional[CursorKey] = Depends(get_cursor),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a season's challenges, newest first. Follow X-Next-Cursor for the next page."""
+    challenge_service = ChallengeService(db)
+    challenges, next_cursor = await challenge_service.get_season_challenges(
+        season_id, limit=limit, after=after
+    )
+    response = FastJSONResponse(challenges)
+    set_next_cursor(response, next_cursor)
+    return response
+
+
+@router.get("/season/{season_id}/today", response_model=List[ChallengeResponse])
+async def get_open_challenges(
+    season_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a season's challenges open right now, generated the night before."""
+    challenge_service = ChallengeService(db)
+    return FastJSONResponse(await challenge_service.get_open_challenges(season_id))
 
 
 @router.get("/{challenge_id}", response_model=ChallengeResponse)
@@ -35,7 +72,7 @@ async def get_challenge(
 ):
     """Get challenge by ID."""
     challenge_service = ChallengeService(db)
-    challenge = await challenge_service.get_challenge_by_id(challenge_id)
+    challenge = await challenge_service.get_challenge_response(challenge_id)
     
     if not challenge:
         raise HTTPException(
@@ -43,23 +80,156 @@ async def get_challenge(
             detail="Challenge not found"
         )
     
-    return challenge
+    return FastJSONResponse(challenge)
+
+
+@router.put("/{challenge_id}", response_model=ChallengeResponse)
+async def update_challenge(
+    challenge_id: str,
+    challenge_update: ChallengeUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update a challenge."""
+    challenge_service = ChallengeService(db)
+    challenge = await challenge_service.update_challenge(challenge_id, challenge_update)
+    
+    if not challenge:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Challenge not found"
+        )
+    
+    return FastJSONResponse(challenge_projection.from_object(challenge))
+
+
+@router.get("/{challenge_id}/submissions", response_model=List[ChallengeSubmissionResponse])
+async def get_challenge_submissions(
+    challenge_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    after: Optional[CursorKey] = Depends(get_cursor),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a challenge's submissions, newest first. Follow X-Next-Cursor for the next page."""
+    challenge_service = ChallengeService(db)
+    submissions, next_cursor = await challenge_service.get_challenge_submissions(
+        challenge_id, limit=limit, after=after
+    )
+    response = FastJSONResponse(submissions)
+    set_next_cursor(response, next_cursor)
+    return response
 
 
-@router.post("/{challenge_id}/submit", response_model=ChallengeSubmissionResponse)
+@router.post("/{challenge_id}/submit", response_model=ChallengeSubmissionResponse, status_code=status.HTTP_202_ACCEPTED)
 async def submit_challenge(
     challenge_id: str,
     submission_data: ChallengeSubmissionCreate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Submit a challenge response."""
-    # This would need to be implemented in ChallengeService
-    return {
-        "id": "placeholder",
-        "challenge_id": challenge_id,
-        "user_id": current_user.id,
-        "status": "pending",
-        "content": submission_data.content,
-        "submitted_at": "2025-07-04T12:00:00Z"
-    }
+    """
+    Submit a challenge response. It is validated in the background:
+    poll GET /challenges/submissions/{id} for the result.
+    """
+    if submission_pipeline.is_full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many submissions being validated, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    
+    submission_service = SubmissionService(db)
+    submission = await submission_service.submit(
+        challenge_id, current_user.id, submission_data.submission_data
+    )
+    
+    if not submission:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot submit (challenge not found, expired or not a season member)"
+        )
+    
+    # A full queue here leaves the submission PENDING until the next start
+    if submission.status == SubmissionStatus.PENDING:
+        submission_pipeline.enqueue(submission.id)
+    
+    return FastJSONResponse(
+        submission_projection.from_object(submission),
+        status_code=status.HTTP_202_ACCEPTED
+    )
+
+
+@router.get("/submissions/{submission_id}", response_model=ChallengeSubmissionResponse)
+async def get_submission_status(
+    submission_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the validation status of one of the current user's submissions."""
+    submission_service = SubmissionService(db)
+    submission = await submission_service.get_submission_response(submission_id, current_user.id)
+    
+    if not submission:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Submission not found"
+        )
+    
+    return FastJSONResponse(submission)
+
+
+@router.websocket("/season/{season_id}/quiz")
+async def quiz_round_socket(
+    websocket: WebSocket,
+    season_id: str,
+    token: str = Query(...)
+):
+    """
+    Live family quiz for a season's members.
+    
+    Client messages: {"type": "start", "challenge_id": ...} starts a round on
+    a quiz challenge, {"type": "answer", "question": i, "answer": k} answers
+    the open question. The server sends round events: round_started,
+    participants, question, answered, question_result, round_over.
+    """
+    # Short-lived session: a connection must not hold a pooled DB connection
+    async with quiz_rounds.session_factory() as db:
+        user = await get_websocket_user(token, db)
+        allowed = user is not None and await SeasonService(db).is_member(season_id, user.id)
+    if not allowed:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    broker = quiz_rounds.broker
+    answers = answers_channel(season_id)
+    join = {"type": "join", "user_id": str(user.id)}
+    
+    async def forward_events(events):
+        async for event in events:
+            # Players connected before a round starts join it when announced
+            if event.type == "round_started":
+                await broker.publish(answers, join)
+            await websocket.send_text(event.text)
+    
+    with broker.subscribe(events_channel(season_id)) as events:
+        await broker.publish(answers, join)
+        forwarder = asyncio.create_task(forward_events(events))
+        try:
+            while True:
+                message = await websocket.receive_json()
+                if message.get("type") == "start":
+                    if not await quiz_rounds.start_round(season_id, message.get("challenge_id")):
+                        await websocket.send_json({"type": "error", "detail": "Cannot start a quiz round"})
+                elif message.get("type") == "answer":
+                    await broker.publish(answers, {
+                        "type": "answer",
+                        "user_id": str(user.id),
+                        "question": message.get("question"),
+                        "answer": message.get("answer"),
+                    })
+        except WebSocketDisconnect:
+            pass
+        finally:
+            forwarder.cancel()
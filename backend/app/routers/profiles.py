@@ -9,7 +9,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserUpdate, UserProfileCreate, UserProfileUpdate, UserResponse, UserProfileResponse
-from app.services.user_service import UserService
+from app.services.user_service import UserService, profile_projection
+from app.utils.responses import FastJSONResponse
 from app.utils.security import get_current_user
 
 router = APIRouter()
@@ -58,7 +59,7 @@ async def create_user_profile(
             detail="Profile already exists or user not found"
         )
     
-    return profile
+    return FastJSONResponse(profile_projection.from_object(profile))
 
 
 @router.put("/me/profile", response_model=UserProfileResponse)
@@ -77,7 +78,7 @@ async def update_user_profile(
             detail="Profile not found"
         )
     
-    return profile
+    return FastJSONResponse(profile_projection.from_object(profile))
 
 
 @router.get("/{user_id}", response_model=UserResponse)
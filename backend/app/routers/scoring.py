@@ -2,15 +2,22 @@
 Scoring router for points and leaderboard management
 """
 
+import uuid
+from datetime import date
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.user import User
-from app.schemas.scoring import ScoreResponse, BadgeResponse, UserBadgeResponse, LeaderboardResponse, UserStats
+from app.schemas.scoring import ScoreResponse, BulkAwardRequest, BadgeResponse, UserBadgeResponse, LeaderboardResponse, DailyLeaderboardResponse, UserStats
+from app.services.leaderboard_feed import leaderboard_feed
 from app.services.scoring_service import ScoringService
-from app.utils.security import get_current_user
+from app.services.season_service import SeasonService
+from app.utils.pagination import CursorKey, RankCursorKey, get_cursor, get_rank_cursor, set_next_cursor
+from app.utils.responses import FastJSONResponse, SSE_HEADERS
+from app.utils.security import get_current_user, get_websocket_user
 
 router = APIRouter()
 
@@ -38,48 +45,133 @@ async def award_points(
     return score
 
 
+@router.post("/award-points/bulk", response_model=List[ScoreResponse])
+async def award_points_bulk(
+    award: BulkAwardRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Award the same points to several users at once, e.g. a team bonus (admin only)."""
+    # In a real implementation, you'd check if current_user is admin
+    scoring_service = ScoringService(db)
+    scores = await scoring_service.award_points_bulk(
+        user_ids=award.user_ids,
+        season_id=award.season_id,
+        points=award.points,
+        reason=award.reason,
+        challenge_id=award.challenge_id
+    )
+    return scores
+
+
+@router.get("/history/{season_id}", response_model=List[ScoreResponse])
+async def get_score_history(
+    season_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    after: Optional[CursorKey] = Depends(get_cursor),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the current user's score history in a season, newest first."""
+    scoring_service = ScoringService(db)
+    scores, next_cursor = await scoring_service.get_score_history(
+        current_user.id, season_id, limit=limit, after=after
+    )
+    set_next_cursor(response, next_cursor)
+    return scores
+
+
 @router.get("/leaderboard/{season_id}", response_model=LeaderboardResponse)
 async def get_season_leaderboard(
     season_id: str,
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    after: Optional[RankCursorKey] = Depends(get_rank_cursor),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get season leaderboard."""
-    # Placeholder implementation
-    return {
-        "season_id": season_id,
-        "season_name": "Season Example",
-        "total_participants": 0,
-        "entries": [],
-        "generated_at": "2025-07-04T12:00:00Z",
-        "limit": limit,
-        "offset": offset
-    }
+    """Get season leaderboard, best first."""
+    scoring_service = ScoringService(db)
+    leaderboard = await scoring_service.get_leaderboard(season_id, limit=limit, after=after)
+    if not leaderboard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Season not found"
+        )
+    response = FastJSONResponse(leaderboard)
+    set_next_cursor(response, leaderboard.next_cursor)
+    return response
+
+
+@router.get("/leaderboard/{season_id}/daily", response_model=DailyLeaderboardResponse)
+async def get_daily_leaderboard(
+    season_id: str,
+    day: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the standings for the points earned on one day of the season (default today)."""
+    leaderboard = await ScoringService(db).get_daily_leaderboard(season_id, day)
+    if not leaderboard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Season not found"
+        )
+    return FastJSONResponse(leaderboard)
+
+
+@router.get("/leaderboard/{season_id}/stream")
+async def stream_season_leaderboard(
+    season_id: str,
+    token: str = Query(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream live leaderboard updates as Server-Sent Events: a `snapshot`
+    event with the full leaderboard, then `leaderboard` events carrying
+    only rank and points changes. A `resync` event means updates were
+    dropped and the client should refetch the leaderboard.
+    """
+    user = await get_websocket_user(token, db)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    if not await SeasonService(db).is_member(season_id, user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a member of this season"
+        )
+    
+    leaderboard = await ScoringService(db).get_leaderboard(season_id, limit=None)
+    if not leaderboard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Season not found"
+        )
+    # The stream can stay open for hours; don't hold a pooled connection
+    await db.close()
+    return StreamingResponse(
+        leaderboard_feed.stream(season_id, leaderboard),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
 
 @router.get("/stats/{user_id}", response_model=UserStats)
 async def get_user_stats(
-    user_id: str,
-    season_id: Optional[str] = None,
+    user_id: uuid.UUID,
+    season_id: Optional[uuid.UUID] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get user statistics."""
-    # Placeholder implementation
-    return {
-        "user_id": user_id,
-        "season_id": season_id,
-        "total_points": 0,
-        "season_points": 0,
-        "challenges_completed": 0,
-        "challenges_attempted": 0,
-        "completion_rate": 0.0,
-        "badges_earned": 0,
-        "rare_badges": 0,
-        "current_streak": 0,
-        "longest_streak": 0
-    }
+    """Get a user's statistics, in one season or across all of them."""
+    stats = await ScoringService(db).get_user_stats(user_id, season_id)
+    if not stats:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found in this season" if season_id else "User not found"
+        )
+    return FastJSONResponse(stats)
 
 
 @router.get("/badges", response_model=List[BadgeResponse])
@@ -9,7 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.schemas.season import SeasonCreate, SeasonUpdate, SeasonResponse, SeasonJoinRequest, SeasonMemberResponse
-from app.services.season_service import SeasonService
+from app.services.season_service import SeasonService, season_projection
+from app.utils.pagination import CursorKey, get_cursor, set_next_cursor
+from app.utils.responses import FastJSONResponse
 from app.utils.security import get_current_user
 
 router = APIRouter()
@@ -17,39 +19,18 @@ router = APIRouter()
 
 @router.get("/", response_model=List[SeasonResponse])
 async def get_seasons(
-    skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    after: Optional[CursorKey] = Depends(get_cursor),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get list of seasons."""
+    """Get list of seasons, newest first. Follow X-Next-Cursor for the next page."""
     season_service = SeasonService(db)
-    seasons = await season_service.get_seasons(skip=skip, limit=limit)
+    seasons, next_cursor = await season_service.get_seasons(limit=limit, after=after)
     
-    # Convert Season models to SeasonResponse schemas
-    season_responses = []
-    for season in seasons:
-        season_response = SeasonResponse(
-            id=str(season.id),
-            title=season.title,
-            description=season.description,
-            location=season.location,
-            latitude=season.latitude,
-            longitude=season.longitude,
-            start_date=season.start_date,
-            end_date=season.end_date,
-            cover_image_url=season.cover_image_url,
-            is_active=season.is_active,
-            max_members=None,  # Temporairement None jusqu'à la migration
-            created_by=str(season.created_by),
-            invitation_code=season.invitation_code,
-            is_completed=season.is_completed,
-            member_count=season.member_count,  # Now safe because relations are loaded
-            created_at=season.created_at,
-            updated_at=season.updated_at
-        )
-        season_responses.append(season_response)
-    
-    return season_responses
+    # Projected without validation: render directly instead of validating against response_model
+    response = FastJSONResponse(seasons)
+    set_next_cursor(response, next_cursor)
+    return response
 
 
 @router.post("/", response_model=SeasonResponse)
@@ -62,26 +43,8 @@ async def create_season(
     season_service = SeasonService(db)
     season = await season_service.create_season(season_data, current_user.id)
     
-    # Convert to response schema
-    return SeasonResponse(
-        id=str(season.id),
-        title=season.title,
-        description=season.description,
-        location=season.location,
-        latitude=season.latitude,
-        longitude=season.longitude,
-        start_date=season.start_date,
-        end_date=season.end_date,
-        cover_image_url=season.cover_image_url,
-        is_active=season.is_active,
-        max_members=None,  # Temporairement None jusqu'à la migration
-        created_by=str(season.created_by),
-        invitation_code=season.invitation_code,
-        is_completed=season.is_completed,
-        member_count=season.member_count,
-        created_at=season.created_at,
-        updated_at=season.updated_at
-    )
+    # The creator is the season's only member so far
+    return FastJSONResponse(season_projection.from_object(season, member_count=1))
 
 
 @router.get("/{season_id}", response_model=SeasonResponse)
@@ -91,7 +54,7 @@ async def get_season(
 ):
     """Get season by ID."""
     season_service = SeasonService(db)
-    season = await season_service.get_season_by_id(season_id)
+    season = await season_service.get_season_response(season_id)
     
     if not season:
         raise HTTPException(
@@ -99,26 +62,7 @@ async def get_season(
             detail="Season not found"
         )
     
-    # Convert to response schema
-    return SeasonResponse(
-        id=str(season.id),
-        title=season.title,
-        description=season.description,
-        location=season.location,
-        latitude=season.latitude,
-        longitude=season.longitude,
-        start_date=season.start_date,
-        end_date=season.end_date,
-        cover_image_url=season.cover_image_url,
-        is_active=season.is_active,
-        max_members=None,  # Temporairement None jusqu'à la migration
-        created_by=str(season.created_by),
-        invitation_code=season.invitation_code,
-        is_completed=season.is_completed,
-        member_count=season.member_count,
-        created_at=season.created_at,
-        updated_at=season.updated_at
-    )
+    return FastJSONResponse(season)
 
 
 @router.post("/{season_id}/join", response_model=SeasonMemberResponse)
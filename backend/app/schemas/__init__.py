@@ -16,7 +16,8 @@ from app.schemas.challenge import (
 )
 from app.schemas.scoring import (
     ScoreResponse, BadgeResponse, UserBadgeResponse,
-    LeaderboardResponse, LeaderboardEntry
+    LeaderboardResponse, LeaderboardEntry,
+    DailyLeaderboardResponse, DailyLeaderboardEntry
 )
 from app.schemas.auth import (
     Token, TokenResponse, LoginRequest, RegisterRequest
@@ -38,6 +39,7 @@ __all__ = [
     # Scoring schemas
     "ScoreResponse", "BadgeResponse", "UserBadgeResponse",
     "LeaderboardResponse", "LeaderboardEntry",
+    "DailyLeaderboardResponse", "DailyLeaderboardEntry",
     
     # Auth schemas
     "Token", "TokenResponse", "LoginRequest", "RegisterRequest",
@@ -2,82 +2,79 @@
 Challenge schemas for challenge management and submissions
 """
 
+import uuid
 from typing import Optional, List, Any, Dict
 from datetime import datetime
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field
 from enum import Enum
 
 
 class ChallengeType(str, Enum):
-    PHOTO = "photo"
-    VIDEO = "video"
-    TEXT = "text"
     QUIZ = "quiz"
-    LOCATION = "location"
-    DRAWING = "drawing"
+    PHOTO = "photo"
+    SPORT = "sport"
+    CREATIVE = "creative"
+    EXPLORATION = "exploration"
+    TEAM = "team"
 
 
 class ChallengeStatus(str, Enum):
     DRAFT = "draft"
-    PUBLISHED = "published"
     ACTIVE = "active"
     COMPLETED = "completed"
-    CANCELLED = "cancelled"
+    EXPIRED = "expired"
 
 
 class SubmissionStatus(str, Enum):
     PENDING = "pending"
     APPROVED = "approved"
     REJECTED = "rejected"
-    NEEDS_REVISION = "needs_revision"
+    NEEDS_REVIEW = "needs_review"
 
 
 # Challenge Schemas
 class ChallengeBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     description: str = Field(..., min_length=1, max_length=1000)
-    challenge_type: ChallengeType
-    points: int = Field(..., ge=1, le=1000)
-    instructions: Optional[str] = Field(None, max_length=2000)
-    hints: Optional[List[str]] = None
-    media_url: Optional[HttpUrl] = None
-    difficulty_level: int = Field(1, ge=1, le=5)
-    estimated_duration: Optional[int] = Field(None, ge=1, description="Estimated duration in minutes")
+    type: ChallengeType
+    content: Optional[Dict[str, Any]] = None
+    difficulty: str = Field("medium", pattern="^(easy|medium|hard)$")
+    base_points: int = Field(10, ge=0, le=1000)
+    bonus_points: int = Field(0, ge=0, le=1000)
+    challenge_date: datetime
+    expires_at: Optional[datetime] = None
+    location_hint: Optional[str] = Field(None, max_length=200)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    is_team_challenge: bool = False
 
 
 class ChallengeCreate(ChallengeBase):
     season_id: str = Field(..., description="Season ID this challenge belongs to")
-    scheduled_date: Optional[datetime] = None
 
 
 class ChallengeUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = Field(None, min_length=1, max_length=1000)
-    challenge_type: Optional[ChallengeType] = None
-    points: Optional[int] = Field(None, ge=1, le=1000)
-    instructions: Optional[str] = Field(None, max_length=2000)
-    hints: Optional[List[str]] = None
-    media_url: Optional[HttpUrl] = None
-    difficulty_level: Optional[int] = Field(None, ge=1, le=5)
-    estimated_duration: Optional[int] = Field(None, ge=1)
+    content: Optional[Dict[str, Any]] = None
+    difficulty: Optional[str] = Field(None, pattern="^(easy|medium|hard)$")
+    base_points: Optional[int] = Field(None, ge=0, le=1000)
+    bonus_points: Optional[int] = Field(None, ge=0, le=1000)
+    challenge_date: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    location_hint: Optional[str] = Field(None, max_length=200)
     status: Optional[ChallengeStatus] = None
-    scheduled_date: Optional[datetime] = None
 
 
 class ChallengeResponse(ChallengeBase):
-    id: str
-    season_id: str
-    created_by: str
+    id: uuid.UUID
+    season_id: uuid.UUID
+    created_by: Optional[uuid.UUID] = None
     status: ChallengeStatus
-    order_index: int
-    scheduled_date: Optional[datetime] = None
+    ai_generated: bool = False
     created_at: datetime
     updated_at: Optional[datetime] = None
-    
-    # Statistics
-    submissions_count: int = 0
-    average_rating: Optional[float] = None
-    
+
     class Config:
         from_attributes = True
 
@@ -88,37 +85,31 @@ class ChallengeWithSubmissions(ChallengeResponse):
 
 # Challenge Submission Schemas
 class ChallengeSubmissionBase(BaseModel):
-    content: Optional[str] = Field(None, max_length=2000)
-    media_urls: Optional[List[HttpUrl]] = None
-    metadata: Optional[Dict[str, Any]] = None
+    submission_data: Dict[str, Any] = Field(..., description="Answers, photo URL or activity data")
 
 
 class ChallengeSubmissionCreate(ChallengeSubmissionBase):
-    challenge_id: str = Field(..., description="Challenge ID for this submission")
+    pass
 
 
 class ChallengeSubmissionUpdate(BaseModel):
-    content: Optional[str] = Field(None, max_length=2000)
-    media_urls: Optional[List[HttpUrl]] = None
-    metadata: Optional[Dict[str, Any]] = None
+    submission_data: Optional[Dict[str, Any]] = None
 
 
 class ChallengeSubmissionResponse(ChallengeSubmissionBase):
-    id: str
-    challenge_id: str
-    user_id: str
+    id: uuid.UUID
+    challenge_id: uuid.UUID
+    user_id: uuid.UUID
     status: SubmissionStatus
-    points_awarded: Optional[int] = None
-    feedback: Optional[str] = None
+    points_awarded: int = 0
     submitted_at: datetime
-    reviewed_at: Optional[datetime] = None
-    reviewed_by: Optional[str] = None
-    
-    # User details (from join)
-    user_email: Optional[str] = None
-    user_first_name: Optional[str] = None
-    user_last_name: Optional[str] = None
-    
+    auto_validated: bool = False
+    validation_score: Optional[float] = None
+    validation_notes: Optional[str] = None
+    validated_at: Optional[datetime] = None
+    validated_by: Optional[uuid.UUID] = None
+    created_at: datetime
+
     class Config:
         from_attributes = True
 
@@ -127,7 +118,7 @@ class SubmissionReview(BaseModel):
     submission_id: str
     status: SubmissionStatus
     points_awarded: Optional[int] = Field(None, ge=0)
-    feedback: Optional[str] = Field(None, max_length=1000)
+    validation_notes: Optional[str] = Field(None, max_length=1000)
 
 
 class ChallengeStats(BaseModel):
@@ -2,8 +2,9 @@
 Scoring and leaderboard schemas for points, badges, and rankings
 """
 
+import uuid
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -25,16 +26,17 @@ class BadgeRarity(str, Enum):
 
 # Score Schemas
 class ScoreBase(BaseModel):
-    points: int = Field(..., ge=0)
-    reason: str = Field(..., min_length=1, max_length=200)
+    points: int = Field(..., description="Negative for penalties")
+    description: str = Field(..., min_length=1, max_length=200)
 
 
 class ScoreResponse(ScoreBase):
-    id: str
-    user_id: str
-    season_id: str
-    challenge_id: Optional[str] = None
-    submission_id: Optional[str] = None
+    id: uuid.UUID
+    user_id: uuid.UUID
+    season_id: uuid.UUID
+    challenge_id: Optional[uuid.UUID] = None
+    score_type: str
+    score_date: date
     created_at: datetime
     
     # Additional context
@@ -45,6 +47,14 @@ class ScoreResponse(ScoreBase):
         from_attributes = True
 
 
+class BulkAwardRequest(BaseModel):
+    season_id: uuid.UUID
+    user_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=100)
+    points: int = Field(..., description="Negative for penalties")
+    reason: str = Field(..., min_length=1, max_length=200)
+    challenge_id: Optional[uuid.UUID] = None
+
+
 # Badge Schemas
 class BadgeBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -94,16 +104,20 @@ class UserBadgeResponse(UserBadgeBase):
 class LeaderboardEntry(BaseModel):
     rank: int = Field(..., ge=1)
     user_id: str
-    total_points: int = Field(..., ge=0)
+    total_points: int = Field(..., description="Negative if penalties outweigh points")
     challenges_completed: int = Field(..., ge=0)
     badges_earned: int = Field(..., ge=0)
     
     # User details
     user_email: str
-    user_first_name: str
-    user_last_name: str
+    user_display_name: Optional[str] = None
+    user_first_name: Optional[str] = None
+    user_last_name: Optional[str] = None
     user_avatar_url: Optional[str] = None
     
+    # Places gained since yesterday's final standings, None if not ranked then
+    rank_change: Optional[int] = None
+    
     # Recent activity
     last_activity: Optional[datetime] = None
     recent_badges: List[UserBadgeResponse] = []
@@ -118,7 +132,30 @@ class LeaderboardResponse(BaseModel):
     
     # Filters applied
     limit: int = 50
-    offset: int = 0
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, also in the X-Next-Cursor header")
+
+
+class DailyLeaderboardEntry(BaseModel):
+    rank: int = Field(..., ge=1)
+    user_id: str
+    points: int = Field(..., description="Points earned that day, negative after penalties")
+    
+    # User details
+    user_email: str
+    user_display_name: Optional[str] = None
+    user_avatar_url: Optional[str] = None
+
+
+class DailyLeaderboardResponse(BaseModel):
+    season_id: str
+    season_name: str
+    day: date
+    entries: List[DailyLeaderboardEntry]
+    generated_at: datetime
+    
+    # False when the previous day's closing standings are missing, so the
+    # day's points can't be told apart from earlier ones (entries is empty)
+    available: bool = True
 
 
 class UserStats(BaseModel):
@@ -30,6 +30,7 @@ class SeasonBase(BaseModel):
     longitude: Optional[float] = Field(None, ge=-180, le=180)
     start_date: datetime
     end_date: datetime
+    timezone: Optional[str] = Field(None, max_length=50)
     cover_image_url: Optional[str] = Field(None, max_length=500)
     is_active: bool = False
     max_members: Optional[int] = Field(None, gt=0)
@@ -47,6 +48,7 @@ class SeasonUpdate(BaseModel):
     longitude: Optional[float] = Field(None, ge=-180, le=180)
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
+    timezone: Optional[str] = Field(None, max_length=50)
     cover_image_url: Optional[str] = Field(None, max_length=500)
     is_active: Optional[bool] = None
     max_members: Optional[int] = Field(None, gt=0)
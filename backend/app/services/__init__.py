@@ -7,6 +7,11 @@ from app.services.user_service import UserService
 from app.services.season_service import SeasonService
 from app.services.challenge_service import ChallengeService
 from app.services.scoring_service import ScoringService
+from app.services.score_ledger_service import ScoreLedgerService
+from app.services.streak_service import StreakService
+from app.services.badge_service import BadgeEngine
+from app.services.member_counters import MemberCounters
+from app.services.submission_service import SubmissionService
 from app.services.ai_service import AIService
 
 __all__ = [
@@ -15,5 +20,10 @@ __all__ = [
     "SeasonService",
     "ChallengeService",
     "ScoringService",
+    "ScoreLedgerService",
+    "StreakService",
+    "BadgeEngine",
+    "MemberCounters",
+    "SubmissionService",
     "AIService",
 ]
@@ -0,0 +1,217 @@
+"""
+AI budget: token and cost accounting with per-season and per-user daily quotas
+"""
+
+import asyncio
+import math
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from prometheus_client import Counter
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+import structlog
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.ai import AIUsage
+from app.utils.ids import as_uuid
+
+logger = structlog.get_logger()
+
+AI_TOKENS = Counter(
+    "ai_tokens_total",
+    "Tokens used by AI calls, by feature and kind (prompt or completion)",
+    ["feature", "kind"],
+)
+AI_COST = Counter(
+    "ai_estimated_cost_usd_total",
+    "Estimated cost of AI calls in USD, by feature",
+    ["feature"],
+)
+AI_BUDGET_DENIALS = Counter(
+    "ai_budget_denials_total",
+    "AI calls replaced by fallback content because a daily quota was reached, by scope (season or user)",
+    ["scope"],
+)
+
+SEASON = "season"
+USER = "user"
+
+# (scope, season or user id, UTC day)
+Account = Tuple[str, uuid.UUID, date]
+
+
+@dataclass(frozen=True)
+class Spender:
+    """Who an AI call is charged to: a season, a user, both or neither."""
+    season_id: Optional[Any] = None
+    user_id: Optional[Any] = None
+    
+    def accounts(self, day: date) -> List[Account]:
+        accounts = []
+        if self.season_id is not None:
+            accounts.append((SEASON, as_uuid(self.season_id), day))
+        if self.user_id is not None:
+            accounts.append((USER, as_uuid(self.user_id), day))
+        return accounts
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of `text`, for calls whose usage the provider doesn't report."""
+    return math.ceil(len(text) / 4)
+
+
+class AIBudget:
+    """
+    Daily AI usage of each season and user, checked against quotas.
+    
+    Calls are counted in memory as they complete, and the counts are
+    written to `ai_usage` every `flush_interval` seconds with one upsert,
+    which also brings back the totals of the other processes. Quota
+    checks only read memory after an account's first lookup of the day,
+    so they can lag the other processes by one interval. A quota of 0
+    disables it.
+    """
+    
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        season_daily_tokens: int = settings.ai_season_daily_tokens,
+        user_daily_tokens: int = settings.ai_user_daily_tokens,
+        prompt_token_cost: float = settings.ai_prompt_token_cost,
+        completion_token_cost: float = settings.ai_completion_token_cost,
+        flush_interval: float = settings.ai_usage_flush_interval,
+    ):
+        self.session_factory = session_factory
+        self.quotas = {SEASON: season_daily_tokens, USER: user_daily_tokens}
+        self.prompt_token_cost = prompt_token_cost
+        self.completion_token_cost = completion_token_cost
+        self.flush_interval = flush_interval
+        self._flushed: Dict[Account, int] = {}  # Tokens in the database as of the last flush or lookup
+        self._pending: Dict[Account, List[float]] = {}  # [tokens, cost] not flushed yet
+        self._task: Optional[asyncio.Task] = None
+    
+    async def allows(self, spender: Optional[Spender], now: Optional[datetime] = None) -> bool:
+        """Whether `spender` may make another AI call today."""
+        if spender is None:
+            return True
+        accounts = [
+            account for account in spender.accounts((now or datetime.utcnow()).date()) if self.quotas[account[0]]
+        ]
+        await self._load([account for account in accounts if account not in self._flushed])
+        for account in accounts:
+            if self.used(account) >= self.quotas[account[0]]:
+                AI_BUDGET_DENIALS.labels(account[0]).inc()
+                logger.info("AI quota reached", scope=account[0], owner_id=str(account[1]))
+                return False
+        return True
+    
+    def used(self, account: Account) -> int:
+        """Tokens `account` is known to have used."""
+        pending = self._pending.get(account)
+        return self._flushed.get(account, 0) + (int(pending[0]) if pending else 0)
+    
+    def record(
+        self,
+        spender: Optional[Spender],
+        feature: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        now: Optional[datetime] = None,
+    ) -> float:
+        """Count a completed call against `spender`; returns its estimated cost."""
+        cost = (prompt_tokens * self.prompt_token_cost + completion_tokens * self.completion_token_cost) / 1e6
+        AI_TOKENS.labels(feature, "prompt").inc(prompt_tokens)
+        AI_TOKENS.labels(feature, "completion").inc(completion_tokens)
+        AI_COST.labels(feature).inc(cost)
+        if spender is not None:
+            for account in spender.accounts((now or datetime.utcnow()).date()):
+                pending = self._pending.setdefault(account, [0, 0.0])
+                pending[0] += prompt_tokens + completion_tokens
+                pending[1] += cost
+        return cost
+    
+    async def flush(self) -> None:
+        """Add the usage counted since the last flush to the database."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            async with self.session_factory() as db:
+                insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+                stmt = insert(AIUsage).values([
+                    {
+                        "scope": scope, "owner_id": owner_id, "day": day,
+                        "tokens": int(tokens), "cost": cost, "updated_at": datetime.utcnow(),
+                    }
+                    for (scope, owner_id, day), (tokens, cost) in pending.items()
+                ])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[AIUsage.scope, AIUsage.owner_id, AIUsage.day],
+                    set_={
+                        "tokens": AIUsage.tokens + stmt.excluded.tokens,
+                        "cost": AIUsage.cost + stmt.excluded.cost,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                ).returning(AIUsage.scope, AIUsage.owner_id, AIUsage.day, AIUsage.tokens)
+                totals = (await db.execute(stmt)).all()
+                await db.commit()
+        except Exception:
+            # Counted again on the next flush
+            for account, (tokens, cost) in pending.items():
+                merged = self._pending.setdefault(account, [0, 0.0])
+                merged[0] += tokens
+                merged[1] += cost
+            raise
+        
+        today = datetime.utcnow().date()
+        self._flushed = {account: tokens for account, tokens in self._flushed.items() if account[2] >= today}
+        for scope, owner_id, day, tokens in totals:
+            self._flushed[(scope, owner_id, day)] = tokens
+    
+    async def start(self) -> None:
+        """Flush the counters every `flush_interval` seconds until stopped."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically(), name="ai-budget-flush")
+    
+    async def stop(self) -> None:
+        """Stop flushing periodically and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error("AI usage lost on shutdown", error=str(e))
+    
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("AI usage flush failed", error=str(e))
+    
+    async def _load(self, accounts: List[Account]) -> None:
+        if not accounts:
+            return
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(AIUsage.scope, AIUsage.owner_id, AIUsage.day, AIUsage.tokens)
+                    .where(tuple_(AIUsage.scope, AIUsage.owner_id, AIUsage.day).in_(accounts))
+                )
+                found = {(scope, owner_id, day): tokens for scope, owner_id, day, tokens in result}
+        except Exception as e:
+            # Don't hold AI features hostage to accounting: the next flush brings the totals
+            logger.warning("AI usage lookup failed", error=str(e))
+            found = {}
+        for account in accounts:
+            self._flushed[account] = found.get(account, 0)
+
+
+# Process-wide counters, flushed from the application lifespan
+ai_budget = AIBudget()
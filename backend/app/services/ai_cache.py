@@ -0,0 +1,219 @@
+"""
+Response cache for AI-generated challenge content
+"""
+
+import asyncio
+import json
+import math
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from prometheus_client import Counter
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+AI_CACHE_LOOKUPS = Counter(
+    "ai_cache_lookups_total",
+    "Generated content cache lookups, by result (exact, similar or miss)",
+    ["result"],
+)
+
+Embed = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+@dataclass(frozen=True)
+class PromptKey:
+    """Normalized inputs of a generation request."""
+    theme: str
+    difficulty: int
+    location: str
+    language: str
+    
+    @classmethod
+    def build(cls, theme: str, difficulty: int, location: Optional[str] = None, language: str = "fr") -> "PromptKey":
+        return cls(normalize(theme), difficulty, normalize(location), normalize(language))
+    
+    @property
+    def exact(self) -> str:
+        return f"{self.bucket}|{self.theme}"
+    
+    @property
+    def bucket(self) -> str:
+        """Everything but the theme: similar themes only match within a bucket."""
+        return f"{self.difficulty}|{self.location}|{self.language}"
+
+
+@dataclass
+class _Entry:
+    content: Dict[str, Any]
+    expires_at: float
+    bucket: str
+    embedding: Optional[List[float]] = None
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    norms = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norms if norms else 0.0
+
+
+class AIResponseCache:
+    """
+    Two-tier cache of generated content.
+    
+    The exact tier is an LRU keyed on the normalized (theme, difficulty,
+    location, language), so "Coucher de soleil" and "coucher de soleil !"
+    share one entry. When a similarity threshold is set and an `embed`
+    function is given, a miss then compares the theme's embedding with
+    cached themes of the same difficulty, location and language, and
+    reuses content whose cosine similarity reaches the threshold.
+    
+    Entries expire after `ttl` seconds. With a `path`, entries are also
+    written to a SQLite file and reloaded on first use, so a restart does
+    not pay for the same generations again.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = settings.ai_cache_size,
+        ttl: float = settings.ai_cache_ttl,
+        path: Optional[str] = settings.ai_cache_path,
+        similarity: float = settings.ai_cache_similarity,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.similarity = similarity
+        self.clock = clock
+        self.lookups = {"exact": 0, "similar": 0, "miss": 0}
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._embeddings: Dict[str, List[float]] = {}
+        self._loaded = self.path is None
+    
+    @property
+    def hit_rate(self) -> float:
+        total = sum(self.lookups.values())
+        return (self.lookups["exact"] + self.lookups["similar"]) / total if total else 0.0
+    
+    async def get(self, key: PromptKey, embed: Optional[Embed] = None) -> Optional[Dict[str, Any]]:
+        """Cached content for `key` or a similar theme, None on a miss."""
+        await self._load()
+        now = self.clock()
+        
+        entry = self._entries.get(key.exact)
+        if entry is not None and entry.expires_at > now:
+            self._entries.move_to_end(key.exact)
+            return self._count("exact", entry.content)
+        
+        if self.similarity > 0 and embed is not None:
+            match = await self._similar(key, embed, now)
+            if match is not None:
+                return self._count("similar", match.content)
+        return self._count("miss", None)
+    
+    async def put(self, key: PromptKey, content: Dict[str, Any]) -> None:
+        """Cache content generated for `key`."""
+        entry = _Entry(content, self.clock() + self.ttl, key.bucket, self._embeddings.pop(key.exact, None))
+        self._store(key.exact, entry)
+        if self.path is not None:
+            await asyncio.to_thread(self._write, key.exact, entry)
+    
+    def _count(self, result: str, content: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        self.lookups[result] += 1
+        AI_CACHE_LOOKUPS.labels(result=result).inc()
+        return content
+    
+    async def _similar(self, key: PromptKey, embed: Embed, now: float) -> Optional[_Entry]:
+        candidates = [
+            entry for entry in self._entries.values()
+            if entry.bucket == key.bucket and entry.embedding is not None and entry.expires_at > now
+        ]
+        try:
+            vector = (await embed([key.theme]))[0]
+        except Exception as e:
+            logger.warning("Theme embedding failed, similarity lookup skipped", error=str(e))
+            return None
+        # Kept for `put`, so a miss doesn't embed the theme twice
+        self._embeddings[key.exact] = vector
+        if len(self._embeddings) > self.maxsize:
+            self._embeddings.pop(next(iter(self._embeddings)))
+        
+        best: Tuple[float, Optional[_Entry]] = (self.similarity, None)
+        for entry in candidates:
+            score = _cosine(vector, entry.embedding)
+            if score >= best[0]:
+                best = (score, entry)
+        return best[1]
+    
+    def _store(self, exact: str, entry: _Entry) -> None:
+        self._entries[exact] = entry
+        self._entries.move_to_end(exact)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    async def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            rows = await asyncio.to_thread(self._read, self.clock())
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("AI cache file unreadable, starting empty", path=str(self.path), error=str(e))
+            return
+        for exact, content, expires_at, bucket, embedding in rows:
+            self._store(exact, _Entry(
+                json.loads(content), expires_at, bucket, json.loads(embedding) if embedding else None
+            ))
+        logger.info("AI cache loaded", entries=len(self._entries))
+    
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, content TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "bucket TEXT NOT NULL, embedding TEXT)"
+        )
+        return conn
+    
+    def _read(self, now: float) -> List[Tuple[str, str, float, str, Optional[str]]]:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            # Oldest first, so the LRU keeps the freshest entries
+            return conn.execute(
+                "SELECT key, content, expires_at, bucket, embedding FROM responses "
+                "ORDER BY expires_at DESC LIMIT ?", (self.maxsize,)
+            ).fetchall()[::-1]
+    
+    def _write(self, exact: str, entry: _Entry) -> None:
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (
+                        exact, json.dumps(entry.content), entry.expires_at, entry.bucket,
+                        json.dumps(entry.embedding) if entry.embedding is not None else None,
+                    ),
+                )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("AI cache write failed", path=str(self.path), error=str(e))
+
+
+# Process-wide cache for generated challenge content
+ai_response_cache = AIResponseCache()
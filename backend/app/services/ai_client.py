@@ -0,0 +1,355 @@
+"""
+AI provider client: pooled, concurrency-limited chat completion calls
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+# Provider answers worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class AIProviderError(Exception):
+    """The provider could not answer before the call's deadline, or answered something unreadable."""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class Completion:
+    """A chat completion's text and token usage."""
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class AIProvider:
+    """
+    An OpenAI-compatible API. Subclasses only say where to send requests
+    and how to authenticate.
+    """
+    
+    name = "openai"
+    
+    def __init__(
+        self, api_key: str, model: str, base_url: str = "https://api.openai.com/v1",
+        embedding_model: str = "text-embedding-3-small",
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.embedding_model = embedding_model
+        self.base_url = base_url.rstrip("/")
+    
+    def request(
+        self, operation: str, model: str, body: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """URL, headers and JSON body of a request, e.g. to "chat/completions"."""
+        return (
+            f"{self.base_url}/{operation}",
+            {"Authorization": f"Bearer {self.api_key}"},
+            {"model": model, **body},
+        )
+
+
+class AzureOpenAIProvider(AIProvider):
+    """An Azure OpenAI resource; models are deployment names."""
+    
+    name = "azure"
+    
+    def __init__(
+        self, api_key: str, model: str, endpoint: str, api_version: str,
+        embedding_model: str = "text-embedding-3-small",
+    ):
+        super().__init__(api_key, model, endpoint, embedding_model)
+        self.api_version = api_version
+    
+    def request(
+        self, operation: str, model: str, body: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        return (
+            f"{self.base_url}/openai/deployments/{model}/{operation}?api-version={self.api_version}",
+            {"api-key": self.api_key},
+            body,
+        )
+
+
+def provider_from_settings() -> Optional[AIProvider]:
+    """The configured provider: Azure OpenAI first, then OpenAI, else None."""
+    if settings.azure_openai_endpoint and settings.azure_openai_api_key:
+        return AzureOpenAIProvider(
+            settings.azure_openai_api_key, settings.ai_model,
+            settings.azure_openai_endpoint, settings.azure_openai_api_version,
+            settings.ai_embedding_model,
+        )
+    if settings.openai_api_key:
+        return AIProvider(
+            settings.openai_api_key, settings.ai_model,
+            settings.ai_base_url or "https://api.openai.com/v1", settings.ai_embedding_model,
+        )
+    return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[str] = None) -> float:
+    """
+    Delay before retry `attempt` (1-based): the provider's Retry-After
+    when it sends one, else full jitter, a random delay up to
+    `base * 2 ** (attempt - 1)`, so throttled workers don't retry in step.
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), cap)
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class AIClient:
+    """
+    One pooled HTTP client for all AI calls in the process.
+    
+    Connections to the provider are kept alive and shared instead of
+    opened per request, and at most `max_concurrency` calls are in flight
+    per provider: extra callers wait for a slot rather than piling up
+    429s. Calls retry throttling and server errors with jittered backoff,
+    all within a single deadline covering the wait, every attempt and the
+    pauses between them.
+    """
+    
+    def __init__(
+        self,
+        provider: Optional[AIProvider] = None,
+        max_concurrency: int = settings.ai_max_concurrency,
+        max_connections: int = settings.ai_max_connections,
+        timeout: float = settings.ai_timeout,
+        max_retries: int = settings.ai_max_retries,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+    
+    @property
+    def enabled(self) -> bool:
+        return self.provider is not None
+    
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                timeout=self.timeout,
+                transport=self.transport,
+            )
+        return self._http
+    
+    def _slot(self, provider: AIProvider) -> asyncio.Semaphore:
+        if provider.name not in self._slots:
+            self._slots[provider.name] = asyncio.Semaphore(self.max_concurrency)
+        return self._slots[provider.name]
+    
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        json_output: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Completion:
+        """
+        Run a chat completion. Raises AIProviderError once retries or the
+        deadline (`timeout`, default the client's) are exhausted, or if no
+        provider is configured.
+        """
+        provider = self._provider()
+        body = self._chat_body(messages, max_tokens, temperature, json_output)
+        data = await self._call(provider, "chat/completions", provider.model, body, timeout)
+        try:
+            usage = data.get("usage") or {}
+            return Completion(
+                text=data["choices"][0]["message"]["content"] or "",
+                model=data.get("model", provider.model),
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+            )
+        except (AttributeError, KeyError, IndexError, TypeError):
+            raise self._malformed(provider, "chat/completions") from None
+    
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        json_output: bool = False,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Run a chat completion, yielding its text as the provider generates
+        it. Failures before the first chunk are retried as in `chat`; a
+        stream cut short or outliving the deadline raises AIProviderError.
+        """
+        provider = self._provider()
+        body = self._chat_body(messages, max_tokens, temperature, json_output)
+        body["stream"] = True
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        
+        slot = self._slot(provider)
+        try:
+            async with asyncio.timeout(timeout):
+                await slot.acquire()
+        except TimeoutError:
+            raise self._timed_out(provider, "chat/completions", timeout) from None
+        try:
+            try:
+                async with asyncio.timeout(deadline - time.monotonic()):
+                    response = await self._send(
+                        provider, provider.request("chat/completions", provider.model, body), deadline, stream=True
+                    )
+            except TimeoutError:
+                raise self._timed_out(provider, "chat/completions", timeout) from None
+            
+            try:
+                lines = response.aiter_lines()
+                while True:
+                    try:
+                        line = await asyncio.wait_for(anext(lines), deadline - time.monotonic())
+                    except StopAsyncIteration:
+                        break
+                    except TimeoutError:
+                        raise self._timed_out(provider, "chat/completions", timeout) from None
+                    except httpx.HTTPError as e:
+                        raise AIProviderError(f"{provider.name} stream interrupted: {e.__class__.__name__}") from None
+                    
+                    # Server-Sent Events: one `data:` line per chunk, then [DONE]
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        choices = json.loads(data).get("choices") or []
+                        texts = [(choice.get("delta") or {}).get("content") for choice in choices]
+                    except (AttributeError, TypeError, ValueError):
+                        raise self._malformed(provider, "chat/completions") from None
+                    for text in texts:
+                        if text:
+                            yield text
+            finally:
+                await response.aclose()
+        finally:
+            slot.release()
+    
+    async def embed(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """Embedding vectors of `texts`, in order. Same limits and errors as `chat`."""
+        provider = self._provider()
+        data = await self._call(provider, "embeddings", provider.embedding_model, {"input": texts}, timeout)
+        try:
+            return [item["embedding"] for item in sorted(data["data"], key=lambda item: item["index"])]
+        except (KeyError, TypeError):
+            raise self._malformed(provider, "embeddings") from None
+    
+    def _provider(self) -> AIProvider:
+        if self.provider is None:
+            raise AIProviderError("No AI provider configured")
+        return self.provider
+    
+    @staticmethod
+    def _chat_body(
+        messages: List[Dict[str, str]], max_tokens: int, temperature: float, json_output: bool
+    ) -> Dict[str, Any]:
+        body: Dict[str, Any] = {"messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+        if json_output:
+            body["response_format"] = {"type": "json_object"}
+        return body
+    
+    @staticmethod
+    def _timed_out(provider: AIProvider, operation: str, timeout: float) -> AIProviderError:
+        logger.warning("AI call timed out", provider=provider.name, operation=operation, timeout=timeout)
+        return AIProviderError(f"No answer from {provider.name} within {timeout:.0f}s")
+    
+    @staticmethod
+    def _malformed(provider: AIProvider, operation: str) -> AIProviderError:
+        logger.warning("Malformed AI response", provider=provider.name, operation=operation)
+        return AIProviderError(f"{provider.name} sent a malformed {operation} response")
+    
+    async def _call(
+        self, provider: AIProvider, operation: str, model: str, body: Dict[str, Any], timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        try:
+            async with asyncio.timeout(timeout):
+                async with self._slot(provider):
+                    response = await self._send(provider, provider.request(operation, model, body), deadline)
+        except TimeoutError:
+            raise self._timed_out(provider, operation, timeout) from None
+        try:
+            return response.json()
+        except ValueError:
+            raise self._malformed(provider, operation) from None
+    
+    async def _send(
+        self,
+        provider: AIProvider,
+        request: Tuple[str, Dict[str, str], Dict[str, Any]],
+        deadline: float,
+        stream: bool = False,
+    ) -> httpx.Response:
+        url, headers, payload = request
+        client = self._client()
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_after = None
+            try:
+                response = await client.send(client.build_request("POST", url, headers=headers, json=payload), stream=stream)
+                if response.status_code < 400:
+                    return response
+                await response.aclose()
+                if response.status_code not in RETRY_STATUSES:
+                    raise AIProviderError(
+                        f"{provider.name} rejected the request: {response.status_code}", response.status_code
+                    )
+                error = AIProviderError(f"{provider.name} answered {response.status_code}", response.status_code)
+                retry_after = response.headers.get("Retry-After")
+            except httpx.TransportError as e:
+                error = AIProviderError(f"{provider.name} unreachable: {e.__class__.__name__}")
+            
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap, retry_after)
+            if attempt > self.max_retries or time.monotonic() + delay >= deadline:
+                raise error
+            logger.info("Retrying AI call", provider=provider.name, attempt=attempt, delay=round(delay, 2), error=str(error))
+            await asyncio.sleep(delay)
+    
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+# Process-wide client, closed on application shutdown
+ai_client = AIClient(provider_from_settings())
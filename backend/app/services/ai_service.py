@@ -2,33 +2,358 @@
 AI service for content generation and intelligent features
 """
 
-from typing import Optional, Dict, Any, List
+import json
+import re
+from typing import Optional, Dict, Any, List, AsyncIterator, Awaitable, Callable, Set
 import structlog
 
+from app.services.ai_budget import AIBudget, Spender, ai_budget, estimate_tokens
+from app.services.ai_cache import AIResponseCache, PromptKey, ai_response_cache
+from app.services.ai_client import AIClient, AIProviderError, ai_client
+from app.services.photo_screening import PhotoScreener, photo_screener
+from app.utils.responses import sse_message
+from app.utils.singleflight import SingleFlight
+
 logger = structlog.get_logger()
 
+CHALLENGE_PROMPT = (
+    "Tu crées des défis pour des familles en vacances au bord d'un lac. "
+    "Réponds en JSON avec les clés title, description, instructions et hints (liste)."
+)
+ANALYSIS_PROMPT = (
+    "Tu évalues la participation d'une famille à un défi de vacances. "
+    "Réponds en JSON avec les clés score (0 à 100), feedback et suggestions (liste)."
+)
+BATCH_ANALYSIS_PROMPT = (
+    "Tu évalues plusieurs participations de familles à des défis de vacances, "
+    "données en JSON dans la liste submissions. Réponds en JSON avec la clé results : "
+    "une liste dans le même ordre, chaque élément ayant les clés score (0 à 100), "
+    "feedback et suggestions (liste)."
+)
+
+
+# A string or number field, once its value is complete
+FIELD = re.compile(r'"(\w+)"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?)\s*[,}]')
+
+GENERATION_FAILED = {"detail": "AI provider unavailable, please retry later"}
+
+
+def _parse(completion_text: str, required: List[str]) -> Dict[str, Any]:
+    try:
+        content = json.loads(completion_text)
+    except ValueError:
+        raise AIProviderError("Provider returned invalid JSON") from None
+    if not isinstance(content, dict) or any(key not in content for key in required):
+        raise AIProviderError("Provider returned incomplete content")
+    return content
+
+
+def partial_fields(text: str) -> Dict[str, Any]:
+    """Scalar fields already complete in a JSON object still being written."""
+    return {name: json.loads(value) for name, value in FIELD.findall(text)}
+
+
+def _challenge_template(theme: str, difficulty: int) -> Dict[str, Any]:
+    return {
+        "title": f"Crée un challenge à propos de {theme}",
+        "description": f"Un challenge {difficulty} étoiles lié à {theme}",
+        "instructions": "Complète ce challenge par les instructions suivantes.",
+        "hints": ["Prends ton temps", "Sois créatif"]
+    }
+
+
+def _challenge_messages(theme: str, difficulty: int, location: Optional[str], language: str) -> List[Dict[str, str]]:
+    request = f"Thème : {theme}. Difficulté : {difficulty}/5. Langue : {language}."
+    if location:
+        request += f" Lieu : {location}."
+    return [
+        {"role": "system", "content": CHALLENGE_PROMPT},
+        {"role": "user", "content": request},
+    ]
+
+
+def _challenge(completion_text: str) -> Dict[str, Any]:
+    content = _parse(completion_text, ["title", "description"])
+    content.setdefault("instructions", "")
+    content.setdefault("hints", [])
+    return content
+
+
+def _analysis_template() -> Dict[str, Any]:
+    return {
+        "score": 85,
+        "feedback": "Joli travail !",
+        "suggestions": ["Continue comme ça"]
+    }
+
+
+def _screened_analysis(probability: float, approved: bool) -> Dict[str, Any]:
+    return {
+        "score": round(probability * 100),
+        "feedback": "Photo validée automatiquement" if approved else "Cette photo ne semble pas correspondre au défi",
+        "suggestions": [],
+        "screening": "approved" if approved else "rejected",
+    }
+
+
+def _shares(total: int, count: int) -> List[int]:
+    """`total` split into `count` near-equal whole parts."""
+    share, extra = divmod(total, count)
+    return [share + (1 if i < extra else 0) for i in range(count)]
+
+
+def _analysis_messages(submission_content: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": ANALYSIS_PROMPT},
+        {"role": "user", "content": submission_content},
+    ]
+
+
+def _analysis(completion_text: str) -> Dict[str, Any]:
+    return _checked_analysis(_parse(completion_text, ["score"]))
+
+
+def _analyses(completion_text: str, count: int) -> List[Dict[str, Any]]:
+    results = _parse(completion_text, ["results"])["results"]
+    if not isinstance(results, list) or len(results) != count:
+        raise AIProviderError("Provider returned the wrong number of analyses")
+    if not all(isinstance(content, dict) and "score" in content for content in results):
+        raise AIProviderError("Provider returned incomplete content")
+    return [_checked_analysis(content) for content in results]
+
+
+def _checked_analysis(content: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        content["score"] = max(0, min(100, int(content["score"])))
+    except (TypeError, ValueError):
+        raise AIProviderError("Provider returned an invalid score") from None
+    content.setdefault("feedback", None)
+    content.setdefault("suggestions", [])
+    return content
+
 
 class AIService:
-    """Service for AI-powered features."""
-    
-    def __init__(self):
-        pass
-    
-    async def generate_challenge_content(self, theme: str, difficulty: int) -> Dict[str, Any]:
-        """Generate challenge content using AI."""
-        # Placeholder implementation
-        return {
-            "title": f"Crée un challenge à propos de {theme}",
-            "description": f"Un challenge {difficulty} étoiles lié à {theme}",
-            "instructions": "Complète ce challenge par les instructions suivantes.",
-            "hints": ["Prends ton temps", "Sois créatif"]
-        }
-    
-    async def analyze_submission(self, submission_content: str) -> Dict[str, Any]:
+    """
+    Service for AI-powered features.
+    
+    Calls go through the process-wide `AIClient`, which pools connections
+    and bounds concurrency, and generated challenges are cached, so many
+    seasons asking for the same theme on the same lake pay for it once.
+    Identical generations requested while one is in flight, e.g. a whole
+    family opening the app together, wait for that one instead of
+    calling the provider again.
+    Without a configured provider (local development, tests), built-in
+    template content is returned instead. Provider failures raise
+    AIProviderError.
+    
+    Calls made for a `Spender` are counted against its daily quotas;
+    once one is reached, cached content is still served but fresh
+    content is replaced by templates.
+    """
+    
+    def __init__(
+        self,
+        client: AIClient = ai_client,
+        cache: AIResponseCache = ai_response_cache,
+        screener: PhotoScreener = photo_screener,
+        budget: AIBudget = ai_budget,
+    ):
+        self.client = client
+        self.cache = cache
+        self.screener = screener
+        self.budget = budget
+        self._generations: SingleFlight[Dict[str, Any]] = SingleFlight()
+    
+    async def generate_challenge_content(
+        self,
+        theme: str,
+        difficulty: int,
+        location: Optional[str] = None,
+        language: str = "fr",
+        spender: Optional[Spender] = None,
+    ) -> Dict[str, Any]:
+        """Generate challenge content using AI, or reuse a cached generation."""
+        if not self.client.enabled:
+            return _challenge_template(theme, difficulty)
+        
+        key = PromptKey.build(theme, difficulty, location, language)
+        cached = await self.cache.get(key, self.client.embed)
+        if cached is not None:
+            return dict(cached)
+        if not await self.budget.allows(spender):
+            return _challenge_template(theme, difficulty)
+        
+        # Charged to the caller starting the generation, shared with those joining it
+        content = await self._generations.do(
+            key.exact, lambda: self._generate(key, theme, difficulty, location, language, spender)
+        )
+        return dict(content)
+    
+    async def _generate(
+        self,
+        key: PromptKey,
+        theme: str,
+        difficulty: int,
+        location: Optional[str],
+        language: str,
+        spender: Optional[Spender],
+    ) -> Dict[str, Any]:
+        completion = await self.client.chat(
+            _challenge_messages(theme, difficulty, location, language), json_output=True
+        )
+        self.budget.record(spender, "generation", completion.prompt_tokens, completion.completion_tokens)
+        content = _challenge(completion.text)
+        await self.cache.put(key, content)
+        return content
+    
+    async def stream_challenge_content(
+        self,
+        theme: str,
+        difficulty: int,
+        location: Optional[str] = None,
+        language: str = "fr",
+        spender: Optional[Spender] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Server-Sent Events for a generation: `token` events as the model
+        writes, a `field` event as each text or number field completes,
+        then the validated content as `result`, cached once at the end.
+        Cached and template content come as a lone `result`; a failure
+        ends the stream with an `error` event.
+        """
+        if not self.client.enabled:
+            yield sse_message("result", _challenge_template(theme, difficulty))
+            return
+        
+        key = PromptKey.build(theme, difficulty, location, language)
+        cached = await self.cache.get(key, self.client.embed)
+        if cached is not None:
+            yield sse_message("result", cached)
+            return
+        if not await self.budget.allows(spender):
+            yield sse_message("result", _challenge_template(theme, difficulty))
+            return
+        
+        async def finish(text: str) -> Dict[str, Any]:
+            content = _challenge(text)
+            await self.cache.put(key, content)
+            return content
+        
+        messages = _challenge_messages(theme, difficulty, location, language)
+        async for event in self._stream(messages, 0.7, finish, spender, "generation"):
+            yield event
+    
+    async def analyze_submission(self, submission_content: str, spender: Optional[Spender] = None) -> Dict[str, Any]:
         """Analyze submission content using AI."""
-        # Placeholder implementation
-        return {
-            "score": 85,
-            "feedback": "Joli travail !",
-            "suggestions": ["Continue comme ça"]
-        }
+        if not self.client.enabled or not await self.budget.allows(spender):
+            return _analysis_template()
+        
+        completion = await self.client.chat(
+            _analysis_messages(submission_content), temperature=0.2, json_output=True
+        )
+        self.budget.record(spender, "analysis", completion.prompt_tokens, completion.completion_tokens)
+        return _analysis(completion.text)
+    
+    async def analyze_submissions(
+        self, submission_contents: List[str], spenders: Optional[List[Optional[Spender]]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Analyze several photo submissions, results in order. Photos the
+        local screener is confident about are settled without the
+        provider (their analysis says which way under `screening`); the
+        rest go to the provider in one call, except those whose spender
+        is over quota: their result is None, for a moderator to judge.
+        """
+        spenders = spenders or [None] * len(submission_contents)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(submission_contents)
+        for i, probability in enumerate(await self.screener.screen(submission_contents)):
+            verdict = self.screener.verdict(probability)
+            if verdict is not None:
+                results[i] = _screened_analysis(probability, verdict)
+        
+        escalated = [
+            i for i, result in enumerate(results)
+            if result is None and await self.budget.allows(spenders[i])
+        ]
+        if escalated:
+            analyses = await self._analyze_remote(
+                [submission_contents[i] for i in escalated], [spenders[i] for i in escalated]
+            )
+            for i, analysis in zip(escalated, analyses):
+                results[i] = analysis
+        return results
+    
+    async def _analyze_remote(
+        self, submission_contents: List[str], spenders: List[Optional[Spender]]
+    ) -> List[Dict[str, Any]]:
+        if not self.client.enabled:
+            return [_analysis_template() for _ in submission_contents]
+        
+        completion = await self.client.chat(
+            [
+                {"role": "system", "content": BATCH_ANALYSIS_PROMPT},
+                {"role": "user", "content": json.dumps({"submissions": submission_contents}, ensure_ascii=False)},
+            ],
+            # Room for every item's answer
+            max_tokens=300 * len(submission_contents),
+            temperature=0.2,
+            json_output=True,
+        )
+        # Each photo bears an equal share of the batch
+        for spender, prompt_tokens, completion_tokens in zip(
+            spenders,
+            _shares(completion.prompt_tokens, len(spenders)),
+            _shares(completion.completion_tokens, len(spenders)),
+        ):
+            self.budget.record(spender, "photos", prompt_tokens, completion_tokens)
+        return _analyses(completion.text, len(submission_contents))
+    
+    async def stream_submission_analysis(
+        self, submission_content: str, spender: Optional[Spender] = None
+    ) -> AsyncIterator[bytes]:
+        """Server-Sent Events for an analysis, as for `stream_challenge_content`."""
+        if not self.client.enabled or not await self.budget.allows(spender):
+            yield sse_message("result", _analysis_template())
+            return
+        
+        async def finish(text: str) -> Dict[str, Any]:
+            return _analysis(text)
+        
+        async for event in self._stream(_analysis_messages(submission_content), 0.2, finish, spender, "analysis"):
+            yield event
+    
+    async def _stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        finish: Callable[[str], Awaitable[Dict[str, Any]]],
+        spender: Optional[Spender],
+        feature: str,
+    ) -> AsyncIterator[bytes]:
+        text = ""
+        sent: Set[str] = set()
+        try:
+            async for delta in self.client.chat_stream(messages, temperature=temperature, json_output=True):
+                text += delta
+                yield sse_message("token", {"text": delta})
+                for name, value in partial_fields(text).items():
+                    if name not in sent:
+                        sent.add(name)
+                        yield sse_message("field", {"name": name, "value": value})
+            content = await finish(text)
+        except AIProviderError as e:
+            logger.warning("Streamed AI call failed", error=str(e))
+            yield sse_message("error", GENERATION_FAILED)
+            return
+        finally:
+            # Streamed completions don't report their usage
+            if text:
+                self.budget.record(
+                    spender, feature,
+                    sum(estimate_tokens(message["content"]) for message in messages), estimate_tokens(text),
+                )
+        yield sse_message("result", content)
+
+
+# Shared instance for routers and background validation
+ai_service = AIService()
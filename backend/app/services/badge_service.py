@@ -0,0 +1,289 @@
+"""
+Badge engine: compiled badge criteria evaluated against running counters
+"""
+
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, case
+from sqlalchemy.dialects import postgresql, sqlite
+import structlog
+
+from app.models.challenge import Challenge, ChallengeSubmission, SubmissionStatus
+from app.models.scoring import Score, UserStreak, UserCounter, Badge, UserBadge
+from app.services.member_counters import MemberCounters, MemberDelta, RARE_RARITIES
+from app.utils.ids import as_uuid
+
+logger = structlog.get_logger()
+
+# Counters badge criteria are compiled to
+COUNTER_POINTS = "points"
+COUNTER_CHALLENGES = "challenges"
+COUNTER_PERFECT = "perfect"
+# Streak lengths come from StreakService rather than a stored counter
+COUNTER_STREAK = "streak"
+
+
+def challenge_counter(challenge_type: Any = None) -> str:
+    """Counter of approved submissions, overall or for one challenge type."""
+    if challenge_type is None:
+        return COUNTER_CHALLENGES
+    return f"{COUNTER_CHALLENGES}:{getattr(challenge_type, 'value', challenge_type)}"
+
+
+@dataclass(frozen=True)
+class BadgeRule:
+    """A badge earned once `counter` reaches `threshold`."""
+    badge_id: uuid.UUID
+    counter: str
+    threshold: int
+    rare: bool = False
+    
+    def crossed(self, before: int, after: int) -> bool:
+        return before < self.threshold <= after
+
+
+def compile_criteria(
+    badge_id: uuid.UUID, criteria: Optional[Dict[str, Any]], rare: bool = False
+) -> Optional[BadgeRule]:
+    """
+    Compile a badge's JSON criteria, e.g. `{"type": "challenge_count",
+    "challenge_type": "quiz", "count": 10}`, `{"type": "points_total",
+    "points": 1000}`, `{"type": "streak_days", "days": 6}` or
+    `{"type": "perfect_score", "count": 3}`. Returns None if unsupported.
+    """
+    criteria = criteria or {}
+    kind = criteria.get("type")
+    if kind == "challenge_count":
+        counter, threshold = challenge_counter(criteria.get("challenge_type")), criteria.get("count")
+    elif kind == "points_total":
+        counter, threshold = COUNTER_POINTS, criteria.get("points")
+    elif kind == "streak_days":
+        counter, threshold = COUNTER_STREAK, criteria.get("days")
+    elif kind == "perfect_score":
+        counter, threshold = COUNTER_PERFECT, criteria.get("count", 1)
+    else:
+        return None
+    if not isinstance(threshold, int) or threshold < 1:
+        return None
+    return BadgeRule(badge_id=badge_id, counter=counter, threshold=threshold, rare=rare)
+
+
+class BadgeRules:
+    """
+    Active badges compiled into rules and indexed by the counter they
+    depend on. Reloaded every `ttl` seconds, or after `invalidate()`.
+    """
+    
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._by_counter: Dict[str, List[BadgeRule]] = {}
+        self._loaded_at: Optional[float] = None
+    
+    async def load(self, db: AsyncSession) -> Dict[str, List[BadgeRule]]:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return self._by_counter
+        
+        result = await db.execute(
+            select(Badge.id, Badge.name, Badge.criteria, Badge.rarity).where(Badge.is_active.is_(True))
+        )
+        by_counter: Dict[str, List[BadgeRule]] = defaultdict(list)
+        for badge in result:
+            rule = compile_criteria(badge.id, badge.criteria, rare=badge.rarity in RARE_RARITIES)
+            if rule is None:
+                logger.warning("Unsupported badge criteria", badge=badge.name, criteria=badge.criteria)
+                continue
+            by_counter[rule.counter].append(rule)
+        
+        self._by_counter = dict(by_counter)
+        self._loaded_at = time.monotonic()
+        return self._by_counter
+    
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+
+# Process-wide rule index
+badge_rules = BadgeRules()
+
+
+class BadgeEngine:
+    """
+    Award badges as scores and submissions are recorded.
+    
+    Each event increments a few counters with one upsert that returns
+    their new values; only the rules indexed under those counters are
+    evaluated, and only those whose threshold was just crossed can award
+    anything, so most events cost no badge query at all. Awards are added
+    to the caller's session as one batch; the caller commits.
+    """
+    
+    def __init__(self, db: AsyncSession, rules: BadgeRules = badge_rules):
+        self.db = db
+        self.rules = rules
+    
+    async def record_points(self, season_id: Any, points: Dict[Any, int]) -> List[UserBadge]:
+        """Count points earned per user."""
+        return await self._increment(season_id, {
+            (as_uuid(user_id), COUNTER_POINTS): amount for user_id, amount in points.items() if amount
+        })
+    
+    async def record_submissions(
+        self, season_id: Any, submissions: Iterable[Tuple[Any, Any, Optional[float]]]
+    ) -> List[UserBadge]:
+        """Count approved submissions, given as (user_id, challenge_type, validation_score)."""
+        increments: Dict[Tuple[uuid.UUID, str], int] = defaultdict(int)
+        for user_id, challenge_type, score in submissions:
+            user_id = as_uuid(user_id)
+            increments[(user_id, challenge_counter())] += 1
+            increments[(user_id, challenge_counter(challenge_type))] += 1
+            if score is not None and score >= 1.0:
+                increments[(user_id, COUNTER_PERFECT)] += 1
+        return await self._increment(season_id, increments)
+    
+    async def record_streaks(self, season_id: Any, streaks: Dict[Any, int]) -> List[UserBadge]:
+        """Evaluate streak badges for users whose streak just grew to the given length."""
+        return await self._award(as_uuid(season_id), {
+            (as_uuid(user_id), COUNTER_STREAK): (current - 1, current) for user_id, current in streaks.items()
+        })
+    
+    def _upsert(self):
+        if self.db.get_bind().dialect.name == "postgresql":
+            return postgresql.insert(UserCounter)
+        return sqlite.insert(UserCounter)
+    
+    async def _increment(
+        self, season_id: Any, increments: Dict[Tuple[uuid.UUID, str], int]
+    ) -> List[UserBadge]:
+        if not increments:
+            return []
+        season_id = as_uuid(season_id)
+        
+        stmt = self._upsert().values([
+            {"user_id": user_id, "season_id": season_id, "name": name, "value": amount}
+            for (user_id, name), amount in increments.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserCounter.user_id, UserCounter.season_id, UserCounter.name],
+            set_={"value": UserCounter.value + stmt.excluded.value},
+        ).returning(UserCounter.user_id, UserCounter.name, UserCounter.value)
+        result = await self.db.execute(stmt)
+        
+        changes = {
+            (row.user_id, row.name): (row.value - increments[(row.user_id, row.name)], row.value)
+            for row in result
+        }
+        return await self._award(season_id, changes)
+    
+    async def _award(
+        self, season_id: uuid.UUID, changes: Dict[Tuple[uuid.UUID, str], Tuple[int, int]]
+    ) -> List[UserBadge]:
+        """Award the badges whose threshold a counter change crossed."""
+        rules = await self.rules.load(self.db)
+        crossed = [
+            (user_id, rule, after)
+            for (user_id, name), (before, after) in changes.items()
+            for rule in rules.get(name, ())
+            if rule.crossed(before, after)
+        ]
+        if not crossed:
+            return []
+        return await self._add_badges(season_id, crossed)
+    
+    async def _add_badges(
+        self, season_id: uuid.UUID, earned: List[Tuple[uuid.UUID, BadgeRule, int]]
+    ) -> List[UserBadge]:
+        existing = await self.db.execute(
+            select(UserBadge.user_id, UserBadge.badge_id).where(
+                UserBadge.season_id == season_id,
+                UserBadge.user_id.in_({user_id for user_id, _, _ in earned}),
+                UserBadge.badge_id.in_({rule.badge_id for _, rule, _ in earned}),
+            )
+        )
+        already_earned = {tuple(row) for row in existing}
+        
+        badges = []
+        counts: Dict[uuid.UUID, MemberDelta] = defaultdict(MemberDelta)
+        for user_id, rule, value in earned:
+            if (user_id, rule.badge_id) in already_earned:
+                continue
+            already_earned.add((user_id, rule.badge_id))
+            badges.append(UserBadge(
+                user_id=user_id,
+                badge_id=rule.badge_id,
+                season_id=season_id,
+                progress_when_earned={rule.counter: value},
+            ))
+            count = counts[user_id]
+            counts[user_id] = count._replace(badges=count.badges + 1, rare_badges=count.rare_badges + int(rule.rare))
+        self.db.add_all(badges)
+        await MemberCounters(self.db).add(season_id, counts)
+        return badges
+    
+    async def rebuild(self, season_id: Optional[Any] = None) -> Dict[str, int]:
+        """
+        Recompute counters from the score ledger and submissions, for one
+        season or all of them, and award badges already deserved but
+        missing. Streak badges use the longest streaks, so rebuild streaks
+        first.
+        """
+        season_filter = (lambda column: [column == as_uuid(season_id)]) if season_id else (lambda column: [])
+        await self.db.execute(delete(UserCounter).where(*season_filter(UserCounter.season_id)))
+        
+        counters: Dict[Tuple[uuid.UUID, uuid.UUID, str], int] = defaultdict(int)
+        points = await self.db.execute(
+            select(Score.season_id, Score.user_id, func.sum(Score.points))
+            .where(*season_filter(Score.season_id))
+            .group_by(Score.season_id, Score.user_id)
+        )
+        for season, user_id, total in points:
+            counters[(season, user_id, COUNTER_POINTS)] = total
+        
+        submissions = await self.db.execute(
+            select(
+                Challenge.season_id,
+                ChallengeSubmission.user_id,
+                Challenge.type,
+                func.count(),
+                func.sum(case((ChallengeSubmission.validation_score >= 1.0, 1), else_=0)),
+            )
+            .join(Challenge, Challenge.id == ChallengeSubmission.challenge_id)
+            .where(ChallengeSubmission.status == SubmissionStatus.APPROVED, *season_filter(Challenge.season_id))
+            .group_by(Challenge.season_id, ChallengeSubmission.user_id, Challenge.type)
+        )
+        for season, user_id, challenge_type, approved, perfect in submissions:
+            counters[(season, user_id, challenge_counter())] += approved
+            counters[(season, user_id, challenge_counter(challenge_type))] += approved
+            counters[(season, user_id, COUNTER_PERFECT)] += perfect or 0
+        
+        self.db.add_all([
+            UserCounter(season_id=season, user_id=user_id, name=name, value=value)
+            for (season, user_id, name), value in counters.items()
+        ])
+        
+        streaks = await self.db.execute(
+            select(UserStreak.season_id, UserStreak.user_id, UserStreak.longest_streak)
+            .where(*season_filter(UserStreak.season_id))
+        )
+        values = dict(counters)
+        for season, user_id, longest in streaks:
+            values[(season, user_id, COUNTER_STREAK)] = longest
+        
+        self.rules.invalidate()
+        rules = await self.rules.load(self.db)
+        deserved: Dict[uuid.UUID, List[Tuple[uuid.UUID, BadgeRule, int]]] = defaultdict(list)
+        for (season, user_id, name), value in values.items():
+            for rule in rules.get(name, ()):
+                if value >= rule.threshold:
+                    deserved[season].append((user_id, rule, value))
+        
+        awarded = 0
+        for season, earned in deserved.items():
+            awarded += len(await self._add_badges(season, earned))
+        await self.db.commit()
+        
+        logger.info("Badge counters rebuilt", counters=len(counters), badges=awarded)
+        return {"counters": len(counters), "badges": awarded}
@@ -0,0 +1,171 @@
+"""
+Nightly pre-generation of each season's daily challenges
+"""
+
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert
+import structlog
+
+from app.config import settings
+from app.models.challenge import Challenge, ChallengeStatus, ChallengeType
+from app.models.season import Season
+from app.services.ai_budget import Spender
+from app.services.ai_cache import PromptKey
+from app.services.ai_client import AIProviderError
+from app.services.ai_service import AIService, ai_service
+from app.services.streak_service import local_date, local_midnight, zone
+
+logger = structlog.get_logger()
+
+DAILY_CHALLENGES = 3
+
+# (type, theme, difficulty out of 5); each day takes the next three slots
+DAILY_ROTATION: Tuple[Tuple[ChallengeType, str, int], ...] = (
+    (ChallengeType.PHOTO, "faune et flore du lac", 2),
+    (ChallengeType.SPORT, "activité nautique sur le lac", 3),
+    (ChallengeType.EXPLORATION, "sentiers autour du lac", 2),
+    (ChallengeType.CREATIVE, "création avec des éléments naturels", 2),
+    (ChallengeType.PHOTO, "coucher de soleil sur le lac", 1),
+    (ChallengeType.SPORT, "randonnée en famille", 3),
+    (ChallengeType.EXPLORATION, "patrimoine et histoire locale", 2),
+)
+
+DIFFICULTY_LEVELS = {1: "easy", 2: "easy", 3: "medium", 4: "hard", 5: "hard"}
+
+
+def daily_slots(day: date) -> List[Tuple[ChallengeType, str, int]]:
+    """The challenges planned for `day`, the same for every season."""
+    start = day.toordinal() * DAILY_CHALLENGES
+    return [DAILY_ROTATION[(start + i) % len(DAILY_ROTATION)] for i in range(DAILY_CHALLENGES)]
+
+
+def local_time(day: date, hour: int, timezone_name: Optional[str]) -> datetime:
+    """A local time of day as a naive UTC timestamp."""
+    moment = datetime.combine(day, time(hour), tzinfo=zone(timezone_name))
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ChallengeGenerator:
+    """
+    Pre-generate tomorrow's challenges for every running season.
+    
+    Meant to run overnight: the morning path then only reads `Challenge`
+    rows. Seasons on the same lake get the same themes on the same day,
+    so each distinct (theme, difficulty, location) is generated once and
+    its content shared through the AI cache. Each season asks for its
+    own themes on its own AI budget: a generation is charged to the
+    season that starts it, and a season over quota gets template
+    content. Generations run with bounded parallelism and all
+    rows are inserted in a single statement. Themes a season already has
+    for the day are skipped, so a rerun only fills in failed generations.
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        ai: AIService = ai_service,
+        concurrency: int = settings.challenge_generation_concurrency,
+    ):
+        self.db = db
+        self.ai = ai
+        self.concurrency = concurrency
+    
+    async def _planned(self, now: datetime) -> List[Tuple[Any, date, ChallengeType, str, int]]:
+        """(season, day, type, theme, difficulty) still missing for tomorrow."""
+        seasons = (await self.db.execute(
+            select(Season.id, Season.location, Season.timezone, Season.start_date, Season.end_date)
+            .where(Season.is_active.is_(True), Season.is_completed.is_(False))
+        )).all()
+        if not seasons:
+            return []
+        
+        existing = await self.db.execute(
+            select(Challenge.season_id, Challenge.challenge_date, Challenge.ai_prompt)
+            .where(
+                Challenge.season_id.in_([season.id for season in seasons]),
+                Challenge.ai_generated.is_(True),
+                Challenge.challenge_date >= now,
+            )
+        )
+        timezones = {season.id: season.timezone for season in seasons}
+        done: Set[Tuple[Any, date, Optional[str]]] = {
+            (season_id, local_date(challenge_date, timezones[season_id]), theme)
+            for season_id, challenge_date, theme in existing
+        }
+        
+        planned = []
+        for season in seasons:
+            day = local_date(now, season.timezone) + timedelta(days=1)
+            if not season.start_date <= day <= season.end_date:
+                continue
+            planned.extend(
+                (season, day, kind, theme, difficulty)
+                for kind, theme, difficulty in daily_slots(day)
+                if (season.id, day, theme) not in done
+            )
+        return planned
+    
+    async def generate_due(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Generate and insert tomorrow's missing challenges for all seasons."""
+        now = now or datetime.utcnow()
+        planned = await self._planned(now)
+        
+        prompts: Dict[Tuple[Any, str], Tuple[str, int, str]] = {}
+        for season, _, _, theme, difficulty in planned:
+            key = (season.id, PromptKey.build(theme, difficulty, season.location).exact)
+            prompts.setdefault(key, (theme, difficulty, season.location))
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def generate(season_id: Any, theme: str, difficulty: int, location: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self.ai.generate_challenge_content(
+                        theme, difficulty, location, spender=Spender(season_id=season_id)
+                    )
+                except AIProviderError as e:
+                    logger.warning("Challenge generation failed", theme=theme, location=location, error=str(e))
+                    return None
+        
+        results = await asyncio.gather(
+            *(generate(season_id, *prompt) for (season_id, _), prompt in prompts.items())
+        )
+        contents = dict(zip(prompts, results))
+        
+        rows = []
+        for season, day, kind, theme, difficulty in planned:
+            content = contents[season.id, PromptKey.build(theme, difficulty, season.location).exact]
+            if content is None:
+                continue
+            rows.append({
+                "season_id": season.id,
+                "title": content["title"][:200],
+                "description": content["description"],
+                "type": kind,
+                "content": {"instructions": content.get("instructions", ""), "hints": content.get("hints", [])},
+                "difficulty": DIFFICULTY_LEVELS[difficulty],
+                "challenge_date": local_time(day, settings.daily_challenge_hour, season.timezone),
+                "expires_at": local_midnight(day + timedelta(days=1), season.timezone),
+                "location_hint": season.location,
+                "ai_generated": True,
+                "ai_prompt": theme,
+                "generation_context": {
+                    "theme": theme, "difficulty": difficulty, "location": season.location, "day": day.isoformat(),
+                },
+                "status": ChallengeStatus.ACTIVE,
+            })
+        if rows:
+            await self.db.execute(insert(Challenge), rows)
+        await self.db.commit()
+        
+        summary = {
+            "seasons": len({season.id for season, *_ in planned}),
+            "generations": sum(content is not None for content in results),
+            "failed": sum(content is None for content in results),
+            "challenges": len(rows),
+        }
+        logger.info("Daily challenges generated", **summary)
+        return summary
@@ -2,16 +2,23 @@
 Challenge service for challenge management operations
 """
 
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Tuple, Dict, Any, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_
 import structlog
 
-from app.models.challenge import Challenge, ChallengeSubmission
-from app.schemas.challenge import ChallengeCreate, ChallengeUpdate
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeStatus
+from app.schemas.challenge import ChallengeCreate, ChallengeUpdate, ChallengeResponse, ChallengeSubmissionResponse
+from app.utils.pagination import CursorKey, keyset_paginate, build_page
+from app.utils.projection import Projection
+from app.utils.quiz_keys import AnswerKey, answer_keys
 
 logger = structlog.get_logger()
 
+challenge_projection = Projection(ChallengeResponse, Challenge)
+submission_projection = Projection(ChallengeSubmissionResponse, ChallengeSubmission)
+
 
 class ChallengeService:
     """Service for challenge management operations."""
@@ -37,3 +44,106 @@ class ChallengeService:
             select(Challenge).where(Challenge.id == challenge_id)
         )
         return result.scalar_one_or_none()
+    
+    async def update_challenge(
+        self, challenge_id: str, challenge_update: ChallengeUpdate
+    ) -> Optional[Challenge]:
+        """Update a challenge and drop its compiled answer key."""
+        challenge = await self.get_challenge_by_id(challenge_id)
+        if not challenge:
+            return None
+        
+        update_data = challenge_update.model_dump(exclude_unset=True)
+        if update_data.get("status") is not None:
+            update_data["status"] = ChallengeStatus(update_data["status"].value)
+        for field, value in update_data.items():
+            setattr(challenge, field, value)
+        
+        await self.db.commit()
+        await self.db.refresh(challenge)
+        answer_keys.invalidate(challenge.id)
+        return challenge
+    
+    async def get_answer_key(
+        self, challenge_id: Any, updated_at: Optional[datetime] = None
+    ) -> Optional[AnswerKey]:
+        """
+        Get a quiz's compiled answer key. The content JSON is only loaded
+        and parsed when the cached key is missing or stale; pass the
+        challenge's `updated_at` when already known to skip that lookup.
+        """
+        if updated_at is None:
+            result = await self.db.execute(
+                select(Challenge.updated_at).where(Challenge.id == challenge_id)
+            )
+            updated_at = result.scalar_one_or_none()
+            if updated_at is None:
+                return None
+        
+        key = answer_keys.get(challenge_id, updated_at)
+        if key is None:
+            result = await self.db.execute(
+                select(Challenge.content, Challenge.updated_at).where(Challenge.id == challenge_id)
+            )
+            row = result.one_or_none()
+            if row is None:
+                return None
+            key = AnswerKey.compile(row.content)
+            answer_keys.put(challenge_id, row.updated_at, key)
+        return key
+    
+    async def grade_quiz_batch(
+        self, challenge_id: Any, answers: Dict[Any, Sequence[Any]]
+    ) -> Optional[Dict[Any, int]]:
+        """Grade everyone's answers to a quiz at once, e.g. a family round."""
+        key = await self.get_answer_key(challenge_id)
+        if key is None:
+            return None
+        return dict(zip(answers, key.grade_many(answers.values())))
+    
+    async def get_challenge_response(self, challenge_id: str) -> Optional[ChallengeResponse]:
+        """Get a challenge's response projection by ID."""
+        result = await self.db.execute(
+            challenge_projection.select().where(Challenge.id == challenge_id)
+        )
+        row = result.one_or_none()
+        return challenge_projection.from_row(row) if row else None
+    
+    async def get_season_challenges(
+        self, season_id: str, limit: int = 50, after: Optional[CursorKey] = None
+    ) -> Tuple[List[ChallengeResponse], Optional[str]]:
+        """Get a page of a season's challenge projections, newest first."""
+        stmt = keyset_paginate(
+            challenge_projection.select().where(Challenge.season_id == season_id),
+            Challenge.created_at, Challenge.id, after, limit
+        )
+        result = await self.db.execute(stmt)
+        rows, next_cursor = build_page(result.all(), limit)
+        return challenge_projection.from_rows(rows), next_cursor
+    
+    async def get_open_challenges(self, season_id: str, now: Optional[datetime] = None) -> List[ChallengeResponse]:
+        """Get a season's active challenges that are open now, e.g. the pre-generated daily ones."""
+        now = now or datetime.utcnow()
+        result = await self.db.execute(
+            challenge_projection.select()
+            .where(
+                Challenge.season_id == season_id,
+                Challenge.status == ChallengeStatus.ACTIVE,
+                Challenge.challenge_date <= now,
+                or_(Challenge.expires_at.is_(None), Challenge.expires_at > now),
+            )
+            .order_by(Challenge.challenge_date, Challenge.id)
+        )
+        return challenge_projection.from_rows(result.all())
+    
+    async def get_challenge_submissions(
+        self, challenge_id: str, limit: int = 50, after: Optional[CursorKey] = None
+    ) -> Tuple[List[ChallengeSubmissionResponse], Optional[str]]:
+        """Get a page of a challenge's submission projections, newest first."""
+        stmt = keyset_paginate(
+            submission_projection.select().where(ChallengeSubmission.challenge_id == challenge_id),
+            ChallengeSubmission.created_at, ChallengeSubmission.id, after, limit
+        )
+        result = await self.db.execute(stmt)
+        rows, next_cursor = build_page(result.all(), limit)
+        return submission_projection.from_rows(rows), next_cursor
@@ -0,0 +1,148 @@
+"""
+Live leaderboard push: coalesced rank-delta events per season
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+import structlog
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.utils.pubsub import Broker, broker
+from app.utils.responses import SSE_KEEPALIVE, sse_message
+
+logger = structlog.get_logger()
+
+
+def leaderboard_channel(season_id: Any) -> str:
+    return f"leaderboard:{season_id}"
+
+
+class LeaderboardFeed:
+    """
+    Pushes leaderboard changes to a season's connected clients.
+    
+    `notify` is called whenever points are committed. Bursts are coalesced:
+    the first notification schedules a flush at most once per `interval`
+    per season, and later ones before it runs are absorbed, since the
+    flush reads the standings as of that moment. A flush queries the
+    leaderboard once, diffs it against the last broadcast and publishes
+    only the rank/points changes, serialized once for all subscribers.
+    Nothing is computed for seasons nobody is watching.
+    
+    Each subscriber has a small bounded inbox; a client too slow to keep
+    up loses the oldest deltas and is told to resync from
+    GET /scoring/leaderboard/{season_id} instead of buffering without end.
+    """
+    
+    def __init__(
+        self,
+        broker: Broker = broker,
+        session_factory=AsyncSessionLocal,
+        interval: float = settings.leaderboard_push_interval,
+        inbox_size: int = 16,
+        keepalive: float = 15.0,
+    ):
+        self.broker = broker
+        self.session_factory = session_factory
+        self.interval = interval
+        self.inbox_size = inbox_size
+        self.keepalive = keepalive
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._standings: Dict[str, Dict[str, Tuple[int, int]]] = {}
+    
+    def notify(self, season_id: Any) -> None:
+        """Note that a season's scores changed."""
+        key = str(season_id)
+        if key in self._pending or not self.broker.subscriber_count(leaderboard_channel(key)):
+            return
+        delay = max(0.0, self._last_flush.get(key, float("-inf")) + self.interval - time.monotonic())
+        self._pending[key] = asyncio.create_task(self._flush_later(season_id, delay))
+    
+    async def _flush_later(self, season_id: Any, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+            await self.flush(season_id)
+        except Exception as e:
+            logger.error("Leaderboard push failed", season_id=str(season_id), error=str(e))
+        finally:
+            self._pending.pop(str(season_id), None)
+    
+    async def flush(self, season_id: Any) -> Optional[Dict[str, Any]]:
+        """Broadcast the changes since the last broadcast, if any."""
+        from app.services.scoring_service import ScoringService
+        
+        key = str(season_id)
+        self._last_flush[key] = time.monotonic()
+        async with self.session_factory() as db:
+            leaderboard = await ScoringService(db).get_leaderboard(season_id, limit=None)
+        if leaderboard is None:
+            return None
+        
+        previous = self._standings.get(key, {})
+        current = {entry.user_id: (entry.rank, entry.total_points) for entry in leaderboard.entries}
+        self._standings[key] = current
+        
+        changes = [
+            {
+                "user_id": user_id,
+                "rank": rank,
+                "previous_rank": previous.get(user_id, (None, 0))[0],
+                "total_points": points,
+                "points_delta": points - previous.get(user_id, (None, 0))[1],
+            }
+            for user_id, (rank, points) in current.items()
+            if previous.get(user_id) != (rank, points)
+        ]
+        removed: Set[str] = set(previous) - set(current)
+        if not changes and not removed:
+            return None
+        
+        event = {
+            "season_id": key,
+            "generated_at": leaderboard.generated_at,
+            "total_participants": leaderboard.total_participants,
+            "changes": changes,
+            "removed": sorted(removed),
+        }
+        await self.broker.publish(leaderboard_channel(key), sse_message("leaderboard", event))
+        return event
+    
+    async def stream(self, season_id: Any, initial: Any) -> AsyncIterator[bytes]:
+        """
+        Server-Sent Events for one client: the full `initial` leaderboard,
+        then rank deltas, keep-alive comments while idle, and a `resync`
+        event whenever deltas were dropped because the client lagged.
+        """
+        key = str(season_id)
+        try:
+            with self.broker.subscribe(leaderboard_channel(key), maxsize=self.inbox_size) as subscription:
+                # Deltas are relative to what this worker broadcast last
+                if key not in self._standings:
+                    self._standings[key] = {
+                        entry.user_id: (entry.rank, entry.total_points) for entry in initial.entries
+                    }
+                yield sse_message("snapshot", initial)
+                
+                dropped = 0
+                while True:
+                    try:
+                        message = await subscription.get(timeout=self.keepalive)
+                    except asyncio.TimeoutError:
+                        yield SSE_KEEPALIVE
+                        continue
+                    if subscription.dropped != dropped:
+                        dropped = subscription.dropped
+                        yield sse_message("resync", {"season_id": key})
+                    yield message
+        finally:
+            if not self.broker.subscriber_count(leaderboard_channel(key)):
+                # Nobody left watching: forget the season until someone reconnects
+                self._last_flush.pop(key, None)
+                self._standings.pop(key, None)
+
+
+# Shared by ScoringService and the leaderboard stream endpoint
+leaderboard_feed = LeaderboardFeed()
@@ -0,0 +1,111 @@
+"""
+Daily leaderboard snapshots: end-of-day standings as compact rank vectors
+"""
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+import structlog
+
+from app.models.scoring import Score, LeaderboardSnapshot
+from app.models.season import Season, SeasonMember
+from app.services.streak_service import local_date, local_midnight
+from app.utils.ids import as_uuid
+from app.utils.rank_vectors import RankVector, RankVectorCache
+
+logger = structlog.get_logger()
+
+# Process-wide cache of snapshots already read
+snapshot_cache = RankVectorCache()
+
+
+class LeaderboardSnapshots:
+    """
+    Take and read each season's end-of-day standings.
+    
+    Shortly after midnight in a season's timezone, `take_due` stores the
+    day's final standings as a rank vector. "Change since yesterday" and
+    the daily standings then compare the live standings with one or two
+    cached vectors instead of ranking the whole ledger again.
+    """
+    
+    def __init__(self, db: AsyncSession, cache: RankVectorCache = snapshot_cache):
+        self.db = db
+        self.cache = cache
+    
+    async def get(self, season_id: Any, day: Any) -> Optional[RankVector]:
+        """A season's standings at the end of `day`, if they were snapshotted."""
+        vector = self.cache.get(season_id, day)
+        if vector is not None:
+            return vector
+        
+        snapshot = await self.db.get(LeaderboardSnapshot, (as_uuid(season_id), day))
+        if snapshot is None:
+            return None
+        vector = RankVector(snapshot.user_ids, snapshot.points)
+        self.cache.put(season_id, day, vector)
+        return vector
+    
+    async def standings(self, season_id: Any, until: Optional[datetime] = None) -> RankVector:
+        """
+        Active members' standings from their counters, in leaderboard
+        order. With `until`, points scored since then are taken back out,
+        so a snapshot taken a few minutes after midnight still closes the
+        day exactly.
+        """
+        season_id = as_uuid(season_id)
+        members = await self.db.execute(
+            select(SeasonMember.user_id, SeasonMember.total_points, SeasonMember.joined_at)
+            .where(SeasonMember.season_id == season_id, SeasonMember.is_active.is_(True))
+        )
+        late: Dict[uuid.UUID, int] = defaultdict(int)
+        if until is not None:
+            scored = await self.db.execute(
+                select(Score.user_id, func.sum(Score.points))
+                .where(Score.season_id == season_id, Score.created_at >= until)
+                .group_by(Score.user_id)
+            )
+            late.update({user_id: points for user_id, points in scored})
+        
+        rows = sorted(
+            ((member.user_id, member.total_points - late[member.user_id], member.joined_at) for member in members),
+            key=lambda row: (-row[1], row[2]),
+        )
+        return RankVector.pack((user_id, points) for user_id, points, _ in rows)
+    
+    async def take_due(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Snapshot every running season's local days that have ended but
+        were not snapshotted yet, from the day after its latest snapshot
+        (or its first day), so a missed run is caught up by the next one.
+        Safe to run as often as needed: meant to be scheduled hourly, so
+        each season is closed within the hour after its own midnight.
+        """
+        now = now or datetime.utcnow()
+        seasons = await self.db.execute(
+            select(Season.id, Season.timezone, Season.start_date, Season.end_date)
+            .where(Season.is_active.is_(True), Season.is_completed.is_(False))
+        )
+        
+        taken = []
+        for season in seasons.all():
+            last = min(local_date(now, season.timezone) - timedelta(days=1), season.end_date)
+            latest = await self.db.scalar(
+                select(func.max(LeaderboardSnapshot.day)).where(LeaderboardSnapshot.season_id == season.id)
+            )
+            day = season.start_date if latest is None else max(latest + timedelta(days=1), season.start_date)
+            while day <= last:
+                closed_at = local_midnight(day + timedelta(days=1), season.timezone)
+                vector = await self.standings(season.id, until=closed_at)
+                self.db.add(LeaderboardSnapshot(
+                    season_id=season.id, day=day, user_ids=vector.user_ids, points=vector.points
+                ))
+                taken.append({"season_id": season.id, "day": day, "members": len(vector)})
+                day += timedelta(days=1)
+        
+        await self.db.commit()
+        logger.info("Leaderboard snapshots taken", snapshots=len(taken))
+        return taken
@@ -0,0 +1,252 @@
+"""
+Season member counters: atomic increments and reconciliation
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_, or_, func, case, values, column, bindparam, Integer
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import UUID
+import structlog
+
+from app.models.challenge import Challenge, ChallengeSubmission
+from app.models.scoring import Score, ScoreType, ScoreArchive, Badge, UserBadge, UserStatsRollup
+from app.models.season import SeasonMember
+from app.utils.ids import as_uuid
+
+logger = structlog.get_logger()
+
+# Scores that count as completing a challenge, for the submitter or the team
+COMPLETION_TYPES = (ScoreType.CHALLENGE_COMPLETION, ScoreType.TEAM_BONUS)
+
+# Badge rarities counted as rare in user stats
+RARE_RARITIES = ("rare", "epic", "legendary")
+
+COUNTERS = ("total_points", "challenges_completed", "challenges_attempted", "badges_earned", "rare_badges")
+
+
+class MemberDelta(NamedTuple):
+    """Change to one member's counters."""
+    points: int = 0
+    completed: int = 0
+    attempted: int = 0
+    badges: int = 0
+    rare_badges: int = 0
+
+    def as_counters(self) -> Dict[str, int]:
+        return dict(zip(COUNTERS, self))
+
+
+def completes_challenge(score_type: ScoreType, challenge_id: Any) -> int:
+    """1 if a score of this type counts towards `challenges_completed`."""
+    return 1 if score_type in COMPLETION_TYPES and challenge_id else 0
+
+
+class MemberCounters:
+    """
+    Maintain the stats rollups: each `SeasonMember`'s points, completed
+    and attempted challenges, badges and last activity, and their sum
+    across seasons in `user_stats`.
+
+    Counters are only ever changed with `SET column = column + :delta` in
+    the transaction that records the score, submission or badge, so
+    concurrent validations for the same family never overwrite each
+    other. `reconcile` recomputes them from the ledger to catch any drift.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def _is_postgres(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    async def add(self, season_id: Any, deltas: Dict[Any, MemberDelta], at: Optional[datetime] = None) -> None:
+        """
+        Add to members' counters and mark them active at `at` (default
+        now): a single UPDATE ... FROM (VALUES ...) on PostgreSQL, the same
+        increment once per member elsewhere, then one upsert of the
+        users' cross-season totals.
+        """
+        deltas = {as_uuid(user_id): delta for user_id, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+        season_id = as_uuid(season_id)
+        at = at or datetime.utcnow()
+
+        if self._is_postgres:
+            delta = values(
+                column("user_id", UUID(as_uuid=True)),
+                *(column(name, Integer) for name in COUNTERS),
+                name="delta",
+            ).data([(user_id, *counts) for user_id, counts in deltas.items()])
+            await self.db.execute(
+                update(SeasonMember)
+                .where(SeasonMember.season_id == season_id, SeasonMember.user_id == delta.c.user_id)
+                .values(
+                    last_activity_at=at,
+                    **{name: getattr(SeasonMember, name) + delta.c[name] for name in COUNTERS},
+                )
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            members = SeasonMember.__table__
+            await self.db.execute(
+                update(members)
+                .where(members.c.season_id == season_id, members.c.user_id == bindparam("member_id"))
+                .values(
+                    last_activity_at=at,
+                    **{name: members.c[name] + bindparam(f"delta_{name}") for name in COUNTERS},
+                ),
+                [
+                    {"member_id": user_id, **{f"delta_{name}": count for name, count in delta.as_counters().items()}}
+                    for user_id, delta in deltas.items()
+                ],
+            )
+
+        await self._add_to_users({user_id: delta.as_counters() for user_id, delta in deltas.items()}, at)
+
+    async def _add_to_users(self, deltas: Dict[uuid.UUID, Dict[str, int]], at: Optional[datetime]) -> None:
+        dialect = postgresql if self._is_postgres else sqlite
+        stmt = dialect.insert(UserStatsRollup).values([
+            {"user_id": user_id, "last_activity_at": at, **counts} for user_id, counts in deltas.items()
+        ])
+        await self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[UserStatsRollup.user_id],
+            set_={
+                "last_activity_at": func.coalesce(stmt.excluded.last_activity_at, UserStatsRollup.last_activity_at),
+                **{name: getattr(UserStatsRollup, name) + stmt.excluded[name] for name in COUNTERS},
+            },
+        ))
+
+    async def reconcile(self, season_id: Optional[Any] = None, fix: bool = True) -> List[Dict[str, Any]]:
+        """
+        Consistency check of the stats rollups: recompute members' counters
+        from `scores`, `challenge_submissions` and `user_badges` in bulk,
+        then users' totals from their memberships, and report the rows
+        that drifted, correcting them unless `fix` is False. Global rows
+        are reported with `season_id` None and checked only when no season
+        is given. Archived seasons are skipped since their ledger was moved
+        to cold storage. Corrections are applied as increments, so awards
+        committed meanwhile are kept.
+        """
+        drift = await self._season_drift(season_id)
+        if fix and drift:
+            members = SeasonMember.__table__
+            await self.db.execute(
+                update(members)
+                .where(members.c.season_id == bindparam("member_season_id"), members.c.user_id == bindparam("member_id"))
+                .values(**{name: members.c[name] + bindparam(f"delta_{name}") for name in COUNTERS}),
+                [
+                    {
+                        "member_season_id": row["season_id"],
+                        "member_id": row["user_id"],
+                        **{f"delta_{name}": row[name] for name in COUNTERS},
+                    }
+                    for row in drift
+                ],
+            )
+
+        if season_id is None:
+            global_drift = await self._global_drift()
+            if fix and global_drift:
+                await self._add_to_users(
+                    {row["user_id"]: {name: row[name] for name in COUNTERS} for row in global_drift}, None
+                )
+            drift += global_drift
+
+        if fix and drift:
+            await self.db.commit()
+        if drift:
+            logger.warning("Stats rollups drifted", rows=len(drift), fixed=fix)
+        return drift
+
+    async def _season_drift(self, season_id: Optional[Any]) -> List[Dict[str, Any]]:
+        def scoped(column):
+            return [column == as_uuid(season_id)] if season_id else []
+
+        scores = (
+            select(
+                Score.season_id,
+                Score.user_id,
+                func.sum(Score.points).label("total_points"),
+                func.sum(case(
+                    (and_(
+                        Score.score_type.in_([score_type.value for score_type in COMPLETION_TYPES]),
+                        Score.challenge_id.is_not(None),
+                    ), 1),
+                    else_=0,
+                )).label("challenges_completed"),
+            )
+            .where(*scoped(Score.season_id))
+            .group_by(Score.season_id, Score.user_id)
+            .subquery()
+        )
+        submissions = (
+            select(Challenge.season_id, ChallengeSubmission.user_id, func.count().label("challenges_attempted"))
+            .join(Challenge, Challenge.id == ChallengeSubmission.challenge_id)
+            .where(*scoped(Challenge.season_id))
+            .group_by(Challenge.season_id, ChallengeSubmission.user_id)
+            .subquery()
+        )
+        badges = (
+            select(
+                UserBadge.season_id,
+                UserBadge.user_id,
+                func.count().label("badges_earned"),
+                func.sum(case((Badge.rarity.in_(RARE_RARITIES), 1), else_=0)).label("rare_badges"),
+            )
+            .join(Badge, Badge.id == UserBadge.badge_id)
+            .where(UserBadge.season_id.is_not(None), *scoped(UserBadge.season_id))
+            .group_by(UserBadge.season_id, UserBadge.user_id)
+            .subquery()
+        )
+        expected = {
+            "total_points": scores.c.total_points,
+            "challenges_completed": scores.c.challenges_completed,
+            "challenges_attempted": submissions.c.challenges_attempted,
+            "badges_earned": badges.c.badges_earned,
+            "rare_badges": badges.c.rare_badges,
+        }
+        differences = {
+            name: (func.coalesce(value, 0) - getattr(SeasonMember, name)).label(name)
+            for name, value in expected.items()
+        }
+
+        def joined(subquery):
+            return and_(subquery.c.season_id == SeasonMember.season_id, subquery.c.user_id == SeasonMember.user_id)
+
+        result = await self.db.execute(
+            select(SeasonMember.season_id, SeasonMember.user_id, *differences.values())
+            .outerjoin(scores, joined(scores))
+            .outerjoin(submissions, joined(submissions))
+            .outerjoin(badges, joined(badges))
+            .where(
+                SeasonMember.season_id.not_in(select(ScoreArchive.season_id)),
+                or_(*(difference != 0 for difference in differences.values())),
+                *scoped(SeasonMember.season_id),
+            )
+        )
+        return [dict(row._mapping) for row in result]
+
+    async def _global_drift(self) -> List[Dict[str, Any]]:
+        memberships = (
+            select(
+                SeasonMember.user_id,
+                *(func.sum(getattr(SeasonMember, name)).label(name) for name in COUNTERS),
+            )
+            .group_by(SeasonMember.user_id)
+            .subquery()
+        )
+        differences = {
+            name: (memberships.c[name] - func.coalesce(getattr(UserStatsRollup, name), 0)).label(name)
+            for name in COUNTERS
+        }
+        result = await self.db.execute(
+            select(memberships.c.user_id, *differences.values())
+            .outerjoin(UserStatsRollup, UserStatsRollup.user_id == memberships.c.user_id)
+            .where(or_(*(difference != 0 for difference in differences.values())))
+        )
+        return [{"season_id": None, **row._mapping} for row in result]
@@ -0,0 +1,201 @@
+"""
+Personalized challenge suggestions, precomputed per user
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+
+from app.models.challenge import ChallengeType
+from app.models.scoring import UserCounter
+from app.models.season import Season, SeasonMember
+from app.models.user import User, UserProfile
+from app.services.badge_service import challenge_counter
+
+logger = structlog.get_logger()
+
+# Preference keys of UserProfile.challenge_preferences, by the challenge type they ask for
+PREFERENCE_TYPES = {
+    "quiz": ChallengeType.QUIZ,
+    "culture": ChallengeType.QUIZ,
+    "photo": ChallengeType.PHOTO,
+    "sport": ChallengeType.SPORT,
+    "creative": ChallengeType.CREATIVE,
+    "art": ChallengeType.CREATIVE,
+    "exploration": ChallengeType.EXPLORATION,
+    "nature": ChallengeType.EXPLORATION,
+    "team": ChallengeType.TEAM,
+}
+
+# (theme label, generation theme) suggested for each challenge type
+TYPE_THEMES = {
+    ChallengeType.QUIZ: ("Culture", "histoire et légendes du lac"),
+    ChallengeType.PHOTO: ("Photo", "faune et flore du lac"),
+    ChallengeType.SPORT: ("Sport", "activité nautique sur le lac"),
+    ChallengeType.CREATIVE: ("Art", "création avec des éléments naturels"),
+    ChallengeType.EXPLORATION: ("Nature", "sentiers autour du lac"),
+    ChallengeType.TEAM: ("Famille", "défi à relever tous ensemble"),
+}
+
+# Difficulty out of 5 for each preferred level
+PREFERRED_DIFFICULTY = {"easy": 1, "medium": 2, "hard": 4}
+
+PREFERENCE_WEIGHT = 0.6  # Stated preferences vs. the share of challenges completed
+EXPERIENCED = 10  # Completed challenges after which suggestions get a notch harder
+SUGGESTIONS = 3
+
+
+@dataclass
+class ContentVector:
+    """
+    A user's affinity for each challenge type, with the content it
+    recommends. Recomputed in memory whenever its inputs change.
+    """
+    name: str
+    location: Optional[str] = None
+    preferences: Dict[str, Any] = field(default_factory=dict)
+    completed: Dict[ChallengeType, int] = field(default_factory=dict)
+    affinities: Dict[ChallengeType, float] = field(default_factory=dict)
+    content: Dict[str, Any] = field(default_factory=dict)
+    
+    def refresh(self) -> "ContentVector":
+        wanted = {kind for key, kind in PREFERENCE_TYPES.items() if self.preferences.get(key)}
+        total = sum(self.completed.values())
+        self.affinities = {
+            kind: PREFERENCE_WEIGHT * (1.0 if kind in wanted else 0.5 if not wanted else 0.0)
+            + (1 - PREFERENCE_WEIGHT) * (self.completed.get(kind, 0) / total if total else 0.0)
+            for kind in ChallengeType
+        }
+        # Stable: equal affinities keep the ChallengeType order
+        ranked = sorted(ChallengeType, key=lambda kind: -self.affinities[kind])[:SUGGESTIONS]
+        
+        difficulty = PREFERRED_DIFFICULTY.get(self.preferences.get("difficulty"), 2)
+        if total >= EXPERIENCED:
+            difficulty += 1
+        difficulty = min(difficulty, 5)
+        
+        self.content = {
+            "personalized_challenges": [
+                {"type": kind.value, "theme": TYPE_THEMES[kind][1], "difficulty": difficulty, "location": self.location}
+                for kind in ranked
+            ],
+            "recommended_themes": [TYPE_THEMES[kind][0] for kind in ranked],
+            "difficulty_recommendation": difficulty,
+            "motivational_message": f"Salut {self.name}, prêt pour de nouveaux défis ?",
+        }
+        return self
+
+
+class PersonalizationCache:
+    """
+    LRU cache of users' content vectors.
+    
+    Completed challenges and profile edits update a cached vector in
+    place, so the process handling them serves the change immediately;
+    other processes pick it up when their entry expires after `ttl`
+    seconds.
+    """
+    
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._vectors: "OrderedDict[Any, Tuple[float, ContentVector]]" = OrderedDict()
+    
+    def get(self, user_id: Any) -> Optional[ContentVector]:
+        entry = self._vectors.get(user_id)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            return None
+        self._vectors.move_to_end(user_id)
+        return entry[1]
+    
+    def put(self, user_id: Any, vector: ContentVector) -> None:
+        self._vectors[user_id] = (time.monotonic(), vector)
+        self._vectors.move_to_end(user_id)
+        while len(self._vectors) > self.maxsize:
+            self._vectors.popitem(last=False)
+    
+    def record_completion(self, user_id: Any, challenge_type: ChallengeType) -> None:
+        """Count an approved submission in the user's vector, if cached."""
+        vector = self.get(user_id)
+        if vector is not None:
+            vector.completed[challenge_type] = vector.completed.get(challenge_type, 0) + 1
+            vector.refresh()
+    
+    def update_profile(self, user_id: Any, name: Optional[str], preferences: Optional[Dict[str, Any]]) -> None:
+        """Apply an edited profile to the user's vector, if cached."""
+        vector = self.get(user_id)
+        if vector is not None:
+            vector.name = name or vector.name
+            vector.preferences = dict(preferences or {})
+            vector.refresh()
+    
+    def invalidate(self, user_id: Any) -> None:
+        self._vectors.pop(user_id, None)
+    
+    def clear(self) -> None:
+        self._vectors.clear()
+
+
+# Process-wide cache, kept current by profile edits and validated submissions
+personalization_cache = PersonalizationCache()
+
+
+class PersonalizationService:
+    """Service for personalized content."""
+    
+    def __init__(self, db: AsyncSession, cache: PersonalizationCache = personalization_cache):
+        self.db = db
+        self.cache = cache
+    
+    async def get_content(self, user: User, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        The user's recommended challenges, themes and difficulty, from
+        their profile preferences, the challenge types they have completed
+        and their current season. `overrides` replace stored preferences
+        for this answer only.
+        """
+        vector = self.cache.get(user.id)
+        if vector is None:
+            vector = await self._build(user)
+            self.cache.put(user.id, vector)
+        if not overrides:
+            return vector.content
+        return ContentVector(
+            name=vector.name,
+            location=vector.location,
+            preferences={**vector.preferences, **overrides},
+            completed=vector.completed,
+        ).refresh().content
+    
+    async def _build(self, user: User) -> ContentVector:
+        profile = (await self.db.execute(
+            select(UserProfile.display_name, UserProfile.challenge_preferences).where(UserProfile.user_id == user.id)
+        )).one_or_none()
+        
+        counters = {challenge_counter(kind): kind for kind in ChallengeType}
+        result = await self.db.execute(
+            select(UserCounter.name, func.sum(UserCounter.value))
+            .where(UserCounter.user_id == user.id, UserCounter.name.in_(counters))
+            .group_by(UserCounter.name)
+        )
+        completed = {counters[name]: int(total) for name, total in result}
+        
+        # The season the user joined last among those still running
+        location = await self.db.scalar(
+            select(Season.location)
+            .join(SeasonMember, SeasonMember.season_id == Season.id)
+            .where(SeasonMember.user_id == user.id, SeasonMember.is_active.is_(True), Season.is_active.is_(True))
+            .order_by(SeasonMember.joined_at.desc())
+            .limit(1)
+        )
+        
+        return ContentVector(
+            name=(profile.display_name if profile else None) or user.username or user.email.split("@")[0],
+            location=location,
+            preferences=dict((profile.challenge_preferences if profile else None) or {}),
+            completed=completed,
+        ).refresh()
@@ -0,0 +1,111 @@
+"""
+Photo submission analysis, batched across concurrent validations
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, update
+import structlog
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.challenge import ChallengeSubmission, SubmissionStatus
+from app.services.ai_budget import Spender
+from app.services.ai_service import AIService, ai_service
+from app.utils.micro_batch import MicroBatcher
+
+logger = structlog.get_logger()
+
+# AI confidence (0.0-1.0) above which a photo is approved without a moderator
+PHOTO_APPROVAL_THRESHOLD = 0.7
+
+# Outcome of a photo left unanalyzed because its season or user used up their AI quota
+OVER_BUDGET = {
+    "status": SubmissionStatus.NEEDS_REVIEW,
+    "score": None,
+    "notes": "Analyse automatique indisponible : quota IA du jour atteint",
+}
+
+_submissions = ChallengeSubmission.__table__
+
+
+def grade_photo(score: float, notes: Optional[str], rejected: bool = False) -> Dict[str, Any]:
+    """Outcome of a photo's AI confidence score; `rejected` when pre-screening turned it down."""
+    if rejected:
+        status = SubmissionStatus.REJECTED
+    elif score >= PHOTO_APPROVAL_THRESHOLD:
+        status = SubmissionStatus.APPROVED
+    else:
+        status = SubmissionStatus.NEEDS_REVIEW
+    return {"status": status, "score": score, "notes": notes}
+
+
+class PhotoAnalysis:
+    """
+    Analyze photo submissions in batches.
+    
+    Validation workers each ask for one photo; photos asked for within
+    `max_wait` seconds of each other, up to `max_size`, go to the provider
+    in one request. The batch's scores are then recorded on the pending
+    submissions in one bulk UPDATE before each worker gets its outcome,
+    so a validation retried after a later failure reuses its score
+    instead of paying for the analysis again.
+    """
+    
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        ai: AIService = ai_service,
+        max_size: int = settings.photo_batch_size,
+        max_wait: float = settings.photo_batch_wait,
+    ):
+        self.session_factory = session_factory
+        self.ai = ai
+        self.batcher: MicroBatcher[Tuple[Any, str, Optional[Spender]], Dict[str, Any]] = MicroBatcher(
+            self._analyze, max_size, max_wait
+        )
+    
+    async def analyze(self, submission_id: Any, image_url: str, spender: Optional[Spender] = None) -> Dict[str, Any]:
+        """A photo submission's outcome, analyzed with the photos submitted around it."""
+        return await self.batcher.submit((submission_id, image_url, spender))
+    
+    async def _analyze(self, items: List[Tuple[Any, str, Optional[Spender]]]) -> List[Dict[str, Any]]:
+        analyses = await self.ai.analyze_submissions(
+            [image_url for _, image_url, _ in items], [spender for _, _, spender in items]
+        )
+        outcomes = [
+            dict(OVER_BUDGET) if analysis is None else grade_photo(
+                analysis["score"] / 100, analysis.get("feedback"), analysis.get("screening") == "rejected"
+            )
+            for analysis in analyses
+        ]
+        
+        async with self.session_factory() as db:
+            await db.execute(
+                update(_submissions)
+                .where(
+                    _submissions.c.id == bindparam("submission_id"),
+                    _submissions.c.status == SubmissionStatus.PENDING,
+                )
+                .values(
+                    validation_score=bindparam("score"),
+                    auto_validated=bindparam("auto"),
+                    validation_notes=bindparam("notes"),
+                ),
+                [
+                    {
+                        "submission_id": submission_id,
+                        "score": outcome["score"],
+                        "auto": outcome["status"] != SubmissionStatus.NEEDS_REVIEW,
+                        "notes": outcome["notes"],
+                    }
+                    for (submission_id, _, _), outcome in zip(items, outcomes)
+                ],
+            )
+            await db.commit()
+        
+        logger.info("Photo submissions analyzed", batch=len(items))
+        return outcomes
+
+
+# Shared by the validation workers
+photo_analysis = PhotoAnalysis()
@@ -0,0 +1,84 @@
+"""
+Near-duplicate detection for photo submissions within a season
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.challenge import Challenge, ChallengeSubmission
+from app.utils.image_hash import BKTree
+
+# Submissions can commit a little after their created_at: look back this far
+_COMMIT_DELAY = timedelta(minutes=1)
+
+
+@dataclass
+class _SeasonPhotos:
+    tree: BKTree = field(default_factory=BKTree)  # Values: (created_at, submission id)
+    loaded: Set[Any] = field(default_factory=set)
+    loaded_until: Optional[datetime] = None
+
+
+class PhotoDuplicateIndex:
+    """
+    Find photos submitted earlier in a season that look the same.
+    
+    Each season's photo hashes, recorded at submit time, are kept in a
+    BK-tree so a lookup within `max_distance` bits compares against a
+    small part of the season's photos instead of all of them. The tree
+    is built on a season's first lookup, then topped up with the photos
+    submitted since, including those accepted by other processes. Only
+    the `max_seasons` most recently checked seasons are kept; an evicted
+    one is rebuilt on its next lookup.
+    """
+    
+    def __init__(self, max_distance: int = settings.photo_duplicate_distance, max_seasons: int = 64):
+        self.max_distance = max_distance
+        self.max_seasons = max_seasons
+        self._seasons: "OrderedDict[Any, _SeasonPhotos]" = OrderedDict()
+    
+    async def find_earlier(
+        self, db: AsyncSession, season_id: Any, submission: ChallengeSubmission
+    ) -> Optional[Tuple[int, Any]]:
+        """(distance, submission id) of the closest earlier look-alike of `submission`'s photo."""
+        if submission.photo_hash is None:
+            return None
+        photos = await self._sync(db, season_id)
+        own = (submission.created_at, str(submission.id))
+        for distance, (created_at, submission_id) in photos.tree.search(int(submission.photo_hash, 16), self.max_distance):
+            if (created_at, str(submission_id)) < own:
+                return distance, submission_id
+        return None
+    
+    async def _sync(self, db: AsyncSession, season_id: Any) -> _SeasonPhotos:
+        photos = self._seasons.setdefault(season_id, _SeasonPhotos())
+        self._seasons.move_to_end(season_id)
+        while len(self._seasons) > self.max_seasons:
+            self._seasons.popitem(last=False)
+        query = (
+            select(ChallengeSubmission.id, ChallengeSubmission.photo_hash, ChallengeSubmission.created_at)
+            .join(Challenge, Challenge.id == ChallengeSubmission.challenge_id)
+            .where(Challenge.season_id == season_id, ChallengeSubmission.photo_hash.is_not(None))
+        )
+        if photos.loaded_until is not None:
+            # `loaded` skips the rows seen by the previous lookups
+            query = query.where(ChallengeSubmission.created_at >= photos.loaded_until - _COMMIT_DELAY)
+        
+        for submission_id, photo_hash, created_at in await db.execute(query):
+            if submission_id in photos.loaded:
+                continue
+            photos.loaded.add(submission_id)
+            photos.tree.add(int(photo_hash, 16), (created_at, submission_id))
+            if photos.loaded_until is None or created_at > photos.loaded_until:
+                photos.loaded_until = created_at
+        return photos
+
+
+# Process-wide, so each season's tree is built once
+photo_duplicate_index = PhotoDuplicateIndex()
@@ -0,0 +1,166 @@
+"""
+Local, CPU-only pre-screening of photo submissions
+"""
+
+import asyncio
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Protocol, Sequence
+
+from PIL import Image, UnidentifiedImageError
+import structlog
+
+from app.config import settings
+from app.utils.file_upload import file_upload_handler
+
+logger = structlog.get_logger()
+
+# ImageNet statistics, which small pretrained classifiers expect
+MEAN = (0.485, 0.456, 0.406)
+STD = (0.229, 0.224, 0.225)
+
+
+class PhotoModel(Protocol):
+    """A classifier giving each image its probability of being a valid submission."""
+    
+    def predict(self, images: Sequence[Image.Image]) -> List[float]:
+        ...
+
+
+class OnnxPhotoModel:
+    """
+    An ONNX image classifier run with ONNX Runtime on the CPU.
+    
+    The model takes a float32 NCHW batch of ImageNet-normalized RGB
+    images and returns, per image, either one probability or logit of
+    the photo being valid, or two class scores (invalid, valid).
+    """
+    
+    def __init__(self, path: str, threads: int = 1):
+        # Optional dependencies: only needed when a model is configured
+        import numpy
+        import onnxruntime
+        
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.np = numpy
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        height, width = model_input.shape[2:4]
+        self.size = (width if isinstance(width, int) else 224, height if isinstance(height, int) else 224)
+    
+    def predict(self, images: Sequence[Image.Image]) -> List[float]:
+        np = self.np
+        batch = np.stack([
+            (np.asarray(image.convert("RGB").resize(self.size), dtype=np.float32) / 255.0 - MEAN) / STD
+            for image in images
+        ]).transpose(0, 3, 1, 2).astype(np.float32)
+        scores = np.asarray(self.session.run(None, {self.input_name: batch})[0], dtype=np.float64)
+        scores = scores.reshape(len(images), -1)
+        if scores.shape[1] >= 2:
+            exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+            return (exp[:, 1] / exp.sum(axis=1)).tolist()
+        return [value if 0.0 <= value <= 1.0 else 1 / (1 + math.exp(-value)) for value in scores[:, 0].tolist()]
+
+
+class PhotoScreener:
+    """
+    Pre-screen photos locally before any remote analysis.
+    
+    The classifier is loaded once per process, on first use, and runs in
+    a small thread pool so inference never blocks the event loop. Photos
+    it is confident about are settled here: at least `approve_above`
+    approves, at most `reject_below` rejects. Everything else, and every
+    photo when no model is configured or the file can't be read, is left
+    to the remote provider.
+    """
+    
+    def __init__(
+        self,
+        model_path: Optional[str] = settings.photo_screen_model_path,
+        approve_above: float = settings.photo_screen_approve_above,
+        reject_below: float = settings.photo_screen_reject_below,
+        threads: int = settings.photo_screen_threads,
+        model: Optional[PhotoModel] = None,
+        upload_dir: Path = file_upload_handler.upload_dir,
+    ):
+        self.model_path = model_path
+        self.approve_above = approve_above
+        self.reject_below = reject_below
+        self.threads = threads
+        self.upload_dir = upload_dir
+        self._model = model
+        self._load_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self._model is not None or bool(self.model_path)
+    
+    async def screen(self, image_urls: List[str]) -> List[Optional[float]]:
+        """
+        Probability that each photo is a valid submission, or None where
+        the remote provider has to decide.
+        """
+        if not self.enabled or not image_urls:
+            return [None] * len(image_urls)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="photo-screen")
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._screen, image_urls)
+        except Exception as e:
+            logger.warning("Photo pre-screening failed, escalating", error=str(e))
+            return [None] * len(image_urls)
+    
+    def verdict(self, probability: Optional[float]) -> Optional[bool]:
+        """True to approve, False to reject, None when uncertain."""
+        if probability is None:
+            return None
+        if probability >= self.approve_above:
+            return True
+        if probability <= self.reject_below:
+            return False
+        return None
+    
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _screen(self, image_urls: List[str]) -> List[Optional[float]]:
+        images = [self._open(url) for url in image_urls]
+        readable = [i for i, image in enumerate(images) if image is not None]
+        probabilities: List[Optional[float]] = [None] * len(image_urls)
+        if readable:
+            scores = self._load().predict([images[i] for i in readable])
+            for i, score in zip(readable, scores):
+                probabilities[i] = score
+        return probabilities
+    
+    def _load(self) -> PhotoModel:
+        with self._load_lock:
+            if self._model is None:
+                self._model = OnnxPhotoModel(self.model_path, threads=1)
+                logger.info("Photo screening model loaded", path=self.model_path)
+            return self._model
+    
+    def _open(self, image_url: str) -> Optional[Image.Image]:
+        # Only photos stored by FileUploadHandler are available locally
+        if not image_url.startswith("/uploads/"):
+            return None
+        path = (self.upload_dir / image_url[len("/uploads/"):]).resolve()
+        if self.upload_dir.resolve() not in path.parents:
+            return None
+        try:
+            with Image.open(path) as image:
+                image.load()
+                return image
+        except (OSError, UnidentifiedImageError):
+            return None
+
+
+# Process-wide screener: the model is loaded once and shared
+photo_screener = PhotoScreener()
@@ -0,0 +1,415 @@
+"""
+Live multiplayer quiz rounds with speed bonuses
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, List, Dict, Any, NamedTuple, Set, Tuple
+from sqlalchemy import select, insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+import structlog
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.challenge import ACTIVE_SUBMISSION, Challenge, ChallengeSubmission, ChallengeType, SubmissionStatus
+from app.models.scoring import Score, ScoreType
+from app.services.badge_service import BadgeEngine
+from app.services.challenge_service import ChallengeService
+from app.services.leaderboard_feed import leaderboard_feed
+from app.services.member_counters import MemberCounters, MemberDelta
+from app.services.streak_service import StreakService
+from app.services.submission_service import ACTIVE_STATUSES
+from app.utils.ids import as_uuid
+from app.utils.pubsub import Broker, Subscription, broker
+from app.utils.quiz_keys import AnswerKey
+from app.utils.responses import dumps
+
+logger = structlog.get_logger()
+
+# Bonus for the first, second, ... correct answer to a question, then LATER_SPEED_BONUS
+SPEED_BONUSES = (5, 3)
+LATER_SPEED_BONUS = 1
+
+
+def events_channel(season_id: Any) -> str:
+    """Round events (questions, results) fanned out to every connected player."""
+    return f"quiz:{season_id}:events"
+
+
+def answers_channel(season_id: Any) -> str:
+    """Player joins and answers, consumed by the worker running the round."""
+    return f"quiz:{season_id}:answers"
+
+
+class RoundEvent(NamedTuple):
+    """A broadcast round event: its type, and its payload serialized once."""
+    type: str
+    text: str
+
+
+def speed_bonus(rank: int) -> int:
+    """Bonus for the rank-th (1-based) correct answer to a question."""
+    return SPEED_BONUSES[rank - 1] if rank <= len(SPEED_BONUSES) else LATER_SPEED_BONUS
+
+
+class QuizRound:
+    """
+    State of one live round.
+    
+    Only the engine task running the round mutates it, one message at a
+    time, so the order in which correct answers are recorded is the
+    first-correct ordering: no lock or database round-trip is involved.
+    Times come from the server's monotonic clock, never from clients.
+    """
+    
+    def __init__(self, season_id: Any, challenge: Challenge, key: AnswerKey, question_seconds: float):
+        self.season_id = season_id
+        self.challenge_id = challenge.id
+        self.title = challenge.title
+        self.base_points = challenge.base_points
+        self.bonus_points = challenge.bonus_points
+        # Only what players may see: the answer key stays server-side
+        self.questions = [
+            {"question": question.get("question"), "options": question.get("options", [])}
+            for question in (challenge.content or {}).get("questions", [])
+        ][:key.size]
+        self.key = key
+        self.question_seconds = question_seconds
+        self.participants: Set[str] = set()
+        self.current = -1
+        self.opened_at = 0.0
+        self.answers: List[Dict[str, Any]] = []
+        self.correct_order: List[List[Tuple[str, float]]] = []
+    
+    def join(self, user_id: str) -> bool:
+        """Add a participant; returns False if already in the round."""
+        if user_id in self.participants:
+            return False
+        self.participants.add(user_id)
+        return True
+    
+    def open_next(self, now: float) -> Optional[Dict[str, Any]]:
+        """Move to the next question; returns its event, or None when done."""
+        if self.current + 1 >= len(self.questions):
+            return None
+        self.current += 1
+        self.opened_at = now
+        self.answers.append({})
+        self.correct_order.append([])
+        return {
+            "type": "question",
+            "index": self.current,
+            "total": len(self.questions),
+            "seconds": self.question_seconds,
+            **self.questions[self.current],
+        }
+    
+    def record_answer(self, user_id: str, question: int, answer: Any, now: float) -> bool:
+        """
+        Record a participant's answer to the open question. Only the first
+        answer counts; answers to another question or after the time limit
+        are ignored. Returns True if the answer was recorded.
+        """
+        if question != self.current or user_id not in self.participants:
+            return False
+        if user_id in self.answers[question]:
+            return False
+        elapsed = now - self.opened_at
+        if elapsed > self.question_seconds:
+            return False
+        
+        self.answers[question][user_id] = answer
+        if self.key.is_correct(question, answer):
+            self.correct_order[question].append((user_id, elapsed))
+        return True
+    
+    def all_answered(self) -> bool:
+        return bool(self.participants) and len(self.answers[self.current]) >= len(self.participants)
+    
+    def question_result(self) -> Dict[str, Any]:
+        """Correct option and first-correct ordering of the open question."""
+        return {
+            "type": "question_result",
+            "index": self.current,
+            "correct": self.key.correct[self.current],
+            "order": [
+                {
+                    "user_id": user_id,
+                    "rank": rank,
+                    "elapsed_ms": round(elapsed * 1000),
+                    "bonus": speed_bonus(rank),
+                }
+                for rank, (user_id, elapsed) in enumerate(self.correct_order[self.current], start=1)
+            ],
+        }
+    
+    def speed_bonuses(self) -> Dict[str, int]:
+        """Total speed bonus per participant over the round."""
+        bonuses: Dict[str, int] = {}
+        for order in self.correct_order:
+            for rank, (user_id, _) in enumerate(order, start=1):
+                bonuses[user_id] = bonuses.get(user_id, 0) + speed_bonus(rank)
+        return bonuses
+    
+    def answer_sets(self) -> Dict[str, List[Any]]:
+        """Each participant's answers in question order (None if unanswered)."""
+        return {
+            user_id: [answers.get(user_id) for answers in self.answers]
+            for user_id in self.participants
+        }
+
+
+class QuizRoundManager:
+    """
+    Runs the quiz rounds started on this worker.
+    
+    Players' WebSocket handlers, on any worker, publish joins and answers on
+    the season's answers channel and forward the season's events channel to
+    their clients; the worker that started the round consumes the answers
+    and publishes the events. Each broadcast is serialized once.
+    """
+    
+    def __init__(
+        self,
+        broker: Broker = broker,
+        session_factory=AsyncSessionLocal,
+        question_seconds: float = settings.quiz_question_seconds,
+        lobby_seconds: float = settings.quiz_lobby_seconds,
+        pause_seconds: float = settings.quiz_pause_seconds,
+    ):
+        self.broker = broker
+        self.session_factory = session_factory
+        self.question_seconds = question_seconds
+        self.lobby_seconds = lobby_seconds
+        self.pause_seconds = pause_seconds
+        self._rounds: Dict[str, Optional[asyncio.Task]] = {}  # None while a round starts
+    
+    def is_running(self, season_id: Any) -> bool:
+        return str(season_id) in self._rounds
+    
+    async def start_round(self, season_id: Any, challenge_id: Any) -> Optional[asyncio.Task]:
+        """Start a round on one of the season's quiz challenges."""
+        if self.is_running(season_id):
+            return None
+        # Claimed before the first await, so that concurrent starts can't both pass
+        self._rounds[str(season_id)] = None
+        task = None
+        try:
+            async with self.session_factory() as db:
+                challenge_service = ChallengeService(db)
+                challenge = await challenge_service.get_challenge_by_id(challenge_id)
+                if (
+                    challenge is None
+                    or str(challenge.season_id) != str(season_id)
+                    or challenge.type != ChallengeType.QUIZ
+                ):
+                    return None
+                key = await challenge_service.get_answer_key(challenge.id, challenge.updated_at)
+            if not key.size:
+                return None
+            
+            quiz_round = QuizRound(season_id, challenge, key, self.question_seconds)
+            # Subscribe before announcing the round so that no join is missed
+            subscription = self.broker.subscribe(answers_channel(season_id), maxsize=1000)
+            task = asyncio.create_task(self._run(quiz_round, subscription))
+            return task
+        finally:
+            if task is None:
+                self._rounds.pop(str(season_id), None)
+            else:
+                self._rounds[str(season_id)] = task
+    
+    async def _publish(self, season_id: Any, event: Dict[str, Any]) -> None:
+        await self.broker.publish(events_channel(season_id), RoundEvent(event["type"], dumps(event).decode()))
+    
+    def _handle(self, quiz_round: QuizRound, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply a player message; returns an event to broadcast, if any."""
+        user_id = str(message.get("user_id"))
+        if message.get("type") == "join" and quiz_round.join(user_id):
+            return {"type": "participants", "user_ids": sorted(quiz_round.participants)}
+        if message.get("type") == "answer" and quiz_round.current >= 0:
+            if quiz_round.record_answer(user_id, message.get("question"), message.get("answer"), time.monotonic()):
+                return {"type": "answered", "index": quiz_round.current, "user_id": user_id}
+        return None
+    
+    async def _collect(
+        self, quiz_round: QuizRound, subscription: Subscription, until: float, stop_when_all_answered: bool
+    ) -> None:
+        """Handle player messages until `until` (monotonic), or until everyone answered."""
+        while not (stop_when_all_answered and quiz_round.all_answered()):
+            remaining = until - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                message = await subscription.get(timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+            event = self._handle(quiz_round, message)
+            if event:
+                await self._publish(quiz_round.season_id, event)
+    
+    async def _run(self, quiz_round: QuizRound, subscription: Subscription) -> Dict[str, Dict[str, int]]:
+        season_id = quiz_round.season_id
+        try:
+            with subscription:
+                await self._publish(season_id, {
+                    "type": "round_started",
+                    "challenge_id": str(quiz_round.challenge_id),
+                    "title": quiz_round.title,
+                })
+                await self._collect(quiz_round, subscription, time.monotonic() + self.lobby_seconds, False)
+                
+                while True:
+                    event = quiz_round.open_next(time.monotonic())
+                    if event is None:
+                        break
+                    await self._publish(season_id, event)
+                    await self._collect(quiz_round, subscription, quiz_round.opened_at + self.question_seconds, True)
+                    await self._publish(season_id, quiz_round.question_result())
+                    await asyncio.sleep(self.pause_seconds)
+            
+            results = await self._award(quiz_round)
+            await self._publish(season_id, {"type": "round_over", "results": results})
+            return results
+        except Exception as e:
+            logger.error("Quiz round failed", season_id=str(season_id), error=str(e))
+            await self._publish(season_id, {"type": "round_aborted"})
+            raise
+        finally:
+            self._rounds.pop(str(season_id), None)
+    
+    async def _award(self, quiz_round: QuizRound) -> Dict[str, Dict[str, int]]:
+        """
+        Record every participant's result in one transaction: a submission,
+        completion score and speed bonus for those without a submission
+        yet, each table written with a single multi-row INSERT. Players
+        who already submitted the challenge, in an earlier round or over
+        REST, keep that result and earn nothing more.
+        """
+        answer_sets = quiz_round.answer_sets()
+        bonuses = quiz_round.speed_bonuses()
+        counts = dict(zip(answer_sets, quiz_round.key.grade_many(answer_sets.values())))
+        total = quiz_round.key.size
+        now = datetime.utcnow()
+        results = {
+            user_id: {"correct": counts[user_id], "points": 0, "speed_bonus": bonuses.get(user_id, 0)}
+            for user_id in answer_sets
+        }
+        
+        async with self.session_factory() as db:
+            existing = await db.execute(
+                select(ChallengeSubmission.user_id).where(
+                    ChallengeSubmission.challenge_id == quiz_round.challenge_id,
+                    ChallengeSubmission.status.in_(ACTIVE_STATUSES),
+                )
+            )
+            already_submitted = {str(user_id) for user_id in existing.scalars()}
+            
+            submissions = []
+            for user_id, answers in answer_sets.items():
+                if user_id in already_submitted:
+                    continue
+                correct = counts[user_id]
+                points = round(quiz_round.base_points * correct / total)
+                if correct == total:
+                    points += quiz_round.bonus_points
+                submissions.append({
+                    "challenge_id": quiz_round.challenge_id,
+                    "user_id": as_uuid(user_id),
+                    "submission_data": {"answers": answers, "round": True},
+                    "status": SubmissionStatus.APPROVED if correct else SubmissionStatus.REJECTED,
+                    "points_awarded": points,
+                    "auto_validated": True,
+                    "validation_score": correct / total,
+                    "validation_notes": f"{correct}/{total} correct answers",
+                    "validated_at": now,
+                })
+            recorded: Set[uuid.UUID] = set()
+            if submissions:
+                dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+                inserted = await db.execute(
+                    dialect_insert(ChallengeSubmission).values(submissions)
+                    .on_conflict_do_nothing(
+                        index_elements=[ChallengeSubmission.user_id, ChallengeSubmission.challenge_id],
+                        index_where=text(ACTIVE_SUBMISSION),
+                    )
+                    .returning(ChallengeSubmission.user_id)
+                )
+                recorded = set(inserted.scalars())
+            # Those who submitted over REST meanwhile were skipped: that submission stands
+            already_submitted.update(user_id for user_id in answer_sets if as_uuid(user_id) not in recorded)
+            submissions = [submission for submission in submissions if submission["user_id"] in recorded]
+            
+            # A challenge scores once per player: replayed rounds earn nothing
+            scores = []
+            for submission in submissions:
+                user_id, points = str(submission["user_id"]), submission["points_awarded"]
+                results[user_id]["points"] = points
+                if points:
+                    scores.append(self._score(quiz_round, user_id, points, ScoreType.CHALLENGE_COMPLETION, f"Défi réussi : {quiz_round.title}"))
+            for user_id, bonus in bonuses.items():
+                if user_id in already_submitted:
+                    results[user_id]["speed_bonus"] = 0
+                    continue
+                scores.append(self._score(quiz_round, user_id, bonus, ScoreType.SPEED_BONUS, f"Bonus rapidité : {quiz_round.title}"))
+            
+            if scores:
+                await db.execute(insert(Score), scores)
+            completed = [
+                score["user_id"] for score in scores
+                if score["score_type"] == ScoreType.CHALLENGE_COMPLETION.value
+            ]
+            streak_bonuses = []
+            if completed:
+                streak_bonuses = await StreakService(db).record_activity(quiz_round.season_id, completed, now)
+            
+            earned: Dict[uuid.UUID, int] = {}
+            for score in scores + [{"user_id": bonus.user_id, "points": bonus.points} for bonus in streak_bonuses]:
+                earned[score["user_id"]] = earned.get(score["user_id"], 0) + score["points"]
+            attempted = {submission["user_id"] for submission in submissions}
+            await MemberCounters(db).add(quiz_round.season_id, {
+                user_id: MemberDelta(
+                    points=earned.get(user_id, 0),
+                    completed=1 if user_id in completed else 0,
+                    attempted=1 if user_id in attempted else 0,
+                )
+                for user_id in attempted | set(earned)
+            }, now)
+            badges = BadgeEngine(db)
+            await badges.record_points(quiz_round.season_id, earned)
+            await badges.record_submissions(quiz_round.season_id, [
+                (submission["user_id"], ChallengeType.QUIZ, submission["validation_score"])
+                for submission in submissions
+                if submission["status"] == SubmissionStatus.APPROVED
+            ])
+            await db.commit()
+        if scores:
+            leaderboard_feed.notify(quiz_round.season_id)
+        
+        logger.info(
+            "Quiz round scored",
+            season_id=str(quiz_round.season_id),
+            participants=len(answer_sets),
+            speed_bonuses=sum(result["speed_bonus"] for result in results.values()),
+        )
+        return results
+    
+    @staticmethod
+    def _score(
+        quiz_round: QuizRound, user_id: str, points: int, score_type: ScoreType, description: str
+    ) -> Dict[str, Any]:
+        return {
+            "user_id": as_uuid(user_id),
+            "season_id": as_uuid(quiz_round.season_id),
+            "challenge_id": quiz_round.challenge_id,
+            "points": points,
+            "score_type": score_type.value,
+            "description": description[:200],
+            "model_metadata": {"challenge_type": "quiz", "round": True},
+        }
+
+
+# Rounds started on this worker
+quiz_rounds = QuizRoundManager()
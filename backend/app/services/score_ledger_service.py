@@ -0,0 +1,183 @@
+"""
+Score ledger service for season partitions and cold archival
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, text
+import structlog
+
+from app.config import settings
+from app.models.scoring import Score, ScoreArchive
+from app.models.season import Season
+
+logger = structlog.get_logger()
+
+# Rows written per compression chunk while archiving
+ARCHIVE_BATCH_SIZE = 5000
+
+
+def partition_name(season_id: Any) -> str:
+    """Name of the ledger partition holding a season's scores."""
+    return f"scores_s_{uuid.UUID(str(season_id)).hex}"
+
+
+class ScoreLedgerService:
+    """
+    Manage the append-only `scores` ledger.
+    
+    On PostgreSQL every season gets its own list partition, so season-scoped
+    queries are pruned to live data. Completed seasons are exported to
+    gzip-compressed JSON Lines files and their partition is dropped. On other
+    databases (SQLite in tests) partition management is a no-op and archival
+    deletes the season's rows instead.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.archive_dir = Path(settings.score_archive_directory)
+    
+    @property
+    def is_partitioned(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+    
+    async def ensure_partition(self, season_id: Any) -> None:
+        """Create the season's ledger partition if it does not exist yet."""
+        if not self.is_partitioned:
+            return
+        
+        season_uuid = uuid.UUID(str(season_id))
+        await self.db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(season_uuid)} "
+            f"PARTITION OF scores FOR VALUES IN ('{season_uuid}')"
+        ))
+        await self.db.commit()
+    
+    async def archive_season(self, season_id: Any) -> Optional[ScoreArchive]:
+        """
+        Move a completed season's scores to cold storage.
+        Returns None if the season is unknown, not completed or already archived.
+        """
+        season = await self.db.get(Season, season_id)
+        if not season or not season.is_completed:
+            return None
+        
+        existing = await self.db.execute(
+            select(ScoreArchive).where(ScoreArchive.season_id == season.id)
+        )
+        if existing.scalar_one_or_none():
+            return None
+        
+        path = self.archive_dir / f"{partition_name(season.id)}.jsonl.gz"
+        row_count, points_total = await self._export(season.id, path)
+        checksum = await asyncio.to_thread(self._sha256, path)
+        
+        archive = ScoreArchive(
+            season_id=season.id,
+            location=str(path),
+            checksum=checksum,
+            row_count=row_count,
+            points_total=points_total,
+        )
+        self.db.add(archive)
+        
+        if self.is_partitioned and await self._has_partition(season.id):
+            # Dropping the detached partition frees the space at once
+            name = partition_name(season.id)
+            await self.db.execute(text(f"ALTER TABLE scores DETACH PARTITION {name}"))
+            await self.db.execute(text(f"DROP TABLE {name}"))
+        else:
+            await self.db.execute(delete(Score).where(Score.season_id == season.id))
+        
+        await self.db.commit()
+        await self.db.refresh(archive)
+        
+        logger.info(
+            "Season scores archived",
+            season_id=str(season.id), rows=row_count, location=str(path)
+        )
+        return archive
+    
+    async def archive_completed_seasons(self) -> List[ScoreArchive]:
+        """Archive every completed season that still has live scores."""
+        result = await self.db.execute(
+            select(Season.id)
+            .outerjoin(ScoreArchive, ScoreArchive.season_id == Season.id)
+            .where(Season.is_completed.is_(True), ScoreArchive.id.is_(None))
+        )
+        archives = []
+        for season_id in result.scalars().all():
+            archive = await self.archive_season(season_id)
+            if archive:
+                archives.append(archive)
+        return archives
+    
+    async def iter_archived_scores(self, season_id: Any) -> AsyncIterator[Dict[str, Any]]:
+        """Replay an archived season's scores from cold storage."""
+        result = await self.db.execute(
+            select(ScoreArchive).where(ScoreArchive.season_id == season_id)
+        )
+        archive = result.scalar_one_or_none()
+        if not archive:
+            return
+        
+        lines = await asyncio.to_thread(self._read_lines, Path(archive.location))
+        for line in lines:
+            yield json.loads(line)
+    
+    async def _has_partition(self, season_id: Any) -> bool:
+        result = await self.db.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"),
+            {"name": partition_name(season_id)}
+        )
+        return bool(result.scalar())
+    
+    async def _export(self, season_id: Any, path: Path) -> tuple:
+        """Stream a season's rows into a compressed file; returns (rows, points)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        columns = [column.name for column in Score.__table__.columns]
+        
+        row_count = 0
+        points_total = 0
+        stream = await self.db.stream(
+            select(*Score.__table__.columns)
+            .where(Score.season_id == season_id)
+            .order_by(Score.created_at, Score.id)
+        )
+        
+        archive_file = await asyncio.to_thread(gzip.open, tmp_path, "wt", encoding="utf-8")
+        try:
+            async for partition in stream.partitions(ARCHIVE_BATCH_SIZE):
+                chunk = []
+                for row in partition:
+                    record = dict(zip(columns, row))
+                    chunk.append(json.dumps(record, default=str))
+                    points_total += record["points"]
+                row_count += len(chunk)
+                await asyncio.to_thread(archive_file.write, "\n".join(chunk) + "\n")
+        finally:
+            await asyncio.to_thread(archive_file.close)
+        
+        os.replace(tmp_path, path)
+        return row_count, points_total
+    
+    @staticmethod
+    def _sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _read_lines(path: Path) -> List[str]:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return [line for line in f if line.strip()]
@@ -2,12 +2,28 @@
 Scoring service for points and leaderboard operations
 """
 
-from typing import Optional, List
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert, and_, or_, func
+from sqlalchemy.orm import aliased
 import structlog
 
-from app.models.scoring import Score, Badge, UserBadge
+from app.models.scoring import Score, ScoreType, Badge, UserStatsRollup, UserStreak
+from app.models.season import Season, SeasonMember
+from app.models.user import User, UserProfile
+from app.schemas.scoring import (
+    LeaderboardEntry, LeaderboardResponse, DailyLeaderboardEntry, DailyLeaderboardResponse, UserStats
+)
+from app.services.badge_service import BadgeEngine
+from app.services.leaderboard_feed import leaderboard_feed
+from app.services.leaderboard_snapshots import LeaderboardSnapshots
+from app.services.member_counters import MemberCounters, MemberDelta, completes_challenge
+from app.services.streak_service import StreakService, STREAK_ACTIVITY_TYPES, current_streak, local_date
+from app.utils.ids import as_uuid
+from app.utils.pagination import CursorKey, RankCursorKey, keyset_paginate, build_page, encode_rank_cursor
+from app.utils.rank_vectors import RankVector
 
 logger = structlog.get_logger()
 
@@ -20,19 +36,365 @@ class ScoringService:
     
     async def award_points(
         self, user_id: str, season_id: str, points: int, reason: str,
-        challenge_id: Optional[str] = None, submission_id: Optional[str] = None
+        challenge_id: Optional[str] = None, submission_id: Optional[str] = None,
+        score_type: ScoreType = ScoreType.CHALLENGE_COMPLETION, commit: bool = True
     ) -> Score:
-        """Award points to a user."""
+        """
+        Award points to a user, along with any streak bonus and badges the
+        activity earns. With commit=False the caller owns the transaction.
+        """
         score = Score(
             user_id=user_id,
             season_id=season_id,
             challenge_id=challenge_id,
-            submission_id=submission_id,
             points=points,
-            reason=reason
+            score_type=score_type,
+            description=reason,
+            model_metadata={"submission_id": str(submission_id)} if submission_id else None
         )
         
         self.db.add(score)
+        earned = points
+        if score_type in STREAK_ACTIVITY_TYPES:
+            bonuses = await StreakService(self.db).record_activity(season_id, [user_id])
+            earned += sum(bonus.points for bonus in bonuses)
+        await BadgeEngine(self.db).record_points(season_id, {user_id: earned})
+        await MemberCounters(self.db).add(season_id, {
+            user_id: MemberDelta(points=earned, completed=completes_challenge(score_type, challenge_id))
+        })
+        if not commit:
+            await self.db.flush()
+            return score
+        
         await self.db.commit()
         await self.db.refresh(score)
+        leaderboard_feed.notify(season_id)
         return score
+    
+    async def award_points_bulk(
+        self, user_ids: Sequence[str], season_id: str, points: int, reason: str,
+        challenge_id: Optional[str] = None, submission_id: Optional[str] = None,
+        score_type: ScoreType = ScoreType.TEAM_BONUS, commit: bool = True
+    ) -> List[Score]:
+        """
+        Award the same points to several users, e.g. every member of a
+        family for a team challenge, in one transaction: one multi-row
+        INSERT ... RETURNING for the scores, one UPDATE for the members'
+        season counters and a single leaderboard push.
+        """
+        season_id = as_uuid(season_id)
+        user_ids = list(dict.fromkeys(as_uuid(user_id) for user_id in user_ids))
+        if not user_ids:
+            return []
+        
+        result = await self.db.scalars(
+            insert(Score).returning(Score),
+            [
+                {
+                    "user_id": user_id,
+                    "season_id": season_id,
+                    "challenge_id": challenge_id,
+                    "points": points,
+                    "score_type": score_type.value,
+                    "description": reason,
+                    "model_metadata": {"submission_id": str(submission_id)} if submission_id else None,
+                }
+                for user_id in user_ids
+            ],
+        )
+        scores = result.all()
+        
+        earned = {user_id: points for user_id in user_ids}
+        if score_type in STREAK_ACTIVITY_TYPES:
+            for bonus in await StreakService(self.db).record_activity(season_id, user_ids):
+                earned[bonus.user_id] += bonus.points
+        await BadgeEngine(self.db).record_points(season_id, earned)
+        completed = completes_challenge(score_type, challenge_id)
+        await MemberCounters(self.db).add(season_id, {
+            user_id: MemberDelta(points=amount, completed=completed) for user_id, amount in earned.items()
+        })
+        if not commit:
+            await self.db.flush()
+            return scores
+        
+        await self.db.commit()
+        leaderboard_feed.notify(season_id)
+        logger.info("Points awarded in bulk", season_id=str(season_id), users=len(scores), points=points)
+        return scores
+    
+    async def get_score_history(
+        self, user_id: str, season_id: str, limit: int = 50, after: Optional[CursorKey] = None
+    ) -> Tuple[List[Score], Optional[str]]:
+        """Get a page of a user's score history in a season, newest first."""
+        stmt = keyset_paginate(
+            select(Score).where(and_(Score.user_id == user_id, Score.season_id == season_id)),
+            Score.created_at, Score.id, after, limit
+        )
+        result = await self.db.execute(stmt)
+        return build_page(result.scalars().all(), limit)
+    
+    async def get_user_stats(
+        self, user_id: str, season_id: Optional[str] = None, now: Optional[datetime] = None
+    ) -> Optional[UserStats]:
+        """
+        Get a user's stats, in one season or across all of them, from the
+        rollups MemberCounters maintains: one primary-key lookup joined to
+        the user's totals and streak, with ranks counted on the points
+        indexes. Returns None if the user is not a member of the season
+        (or does not exist).
+        """
+        user_id = as_uuid(user_id)
+        ahead = aliased(UserStatsRollup)
+        global_rank = (
+            select(func.count() + 1)
+            .where(ahead.total_points > func.coalesce(UserStatsRollup.total_points, 0))
+            .scalar_subquery()
+        )
+        columns = [
+            func.coalesce(UserStatsRollup.total_points, 0).label("total_points"),
+            global_rank.label("global_rank"),
+        ]
+        
+        if season_id is None:
+            stmt = (
+                select(
+                    *columns,
+                    func.coalesce(UserStatsRollup.challenges_completed, 0).label("challenges_completed"),
+                    func.coalesce(UserStatsRollup.challenges_attempted, 0).label("challenges_attempted"),
+                    func.coalesce(UserStatsRollup.badges_earned, 0).label("badges_earned"),
+                    func.coalesce(UserStatsRollup.rare_badges, 0).label("rare_badges"),
+                    UserStatsRollup.last_activity_at,
+                )
+                .select_from(User)
+                .outerjoin(UserStatsRollup, UserStatsRollup.user_id == User.id)
+                .where(User.id == user_id)
+            )
+        else:
+            season_id = as_uuid(season_id)
+            rivals = aliased(SeasonMember)
+            season_rank = (
+                select(func.count() + 1)
+                .where(
+                    rivals.season_id == SeasonMember.season_id,
+                    rivals.is_active.is_(True),
+                    rivals.total_points > SeasonMember.total_points,
+                )
+                .scalar_subquery()
+            )
+            stmt = (
+                select(
+                    *columns,
+                    SeasonMember.total_points.label("season_points"),
+                    SeasonMember.challenges_completed,
+                    SeasonMember.challenges_attempted,
+                    SeasonMember.badges_earned,
+                    SeasonMember.rare_badges,
+                    SeasonMember.last_activity_at,
+                    season_rank.label("season_rank"),
+                    UserStreak.current_streak,
+                    UserStreak.longest_streak,
+                    UserStreak.last_active_date,
+                    UserProfile.timezone,
+                )
+                .outerjoin(UserStatsRollup, UserStatsRollup.user_id == SeasonMember.user_id)
+                .outerjoin(UserStreak, and_(
+                    UserStreak.user_id == SeasonMember.user_id, UserStreak.season_id == SeasonMember.season_id
+                ))
+                .outerjoin(UserProfile, UserProfile.user_id == SeasonMember.user_id)
+                .where(SeasonMember.season_id == season_id, SeasonMember.user_id == user_id)
+            )
+        
+        row = (await self.db.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+        stats = row._mapping
+        points = stats.get("season_points", stats["total_points"])
+        return UserStats.model_construct(
+            user_id=str(user_id),
+            season_id=str(season_id) if season_id else None,
+            total_points=stats["total_points"],
+            season_points=stats.get("season_points", 0),
+            average_points_per_challenge=(
+                points / stats["challenges_completed"] if stats["challenges_completed"] else None
+            ),
+            challenges_completed=stats["challenges_completed"],
+            challenges_attempted=stats["challenges_attempted"],
+            completion_rate=(
+                min(stats["challenges_completed"] / stats["challenges_attempted"], 1.0)
+                if stats["challenges_attempted"] else 0.0
+            ),
+            badges_earned=stats["badges_earned"],
+            rare_badges=stats["rare_badges"],
+            global_rank=stats["global_rank"],
+            season_rank=stats.get("season_rank"),
+            current_streak=current_streak(
+                stats.get("current_streak") or 0, stats.get("last_active_date"), stats.get("timezone"), now
+            ),
+            longest_streak=stats.get("longest_streak") or 0,
+            last_activity=stats["last_activity_at"],
+        )
+    
+    async def get_leaderboard(
+        self, season_id: str, limit: Optional[int] = 50, after: Optional[RankCursorKey] = None
+    ) -> Optional[LeaderboardResponse]:
+        """
+        Get a season's leaderboard: active members ranked by points, ties
+        sharing a rank. Read from the members' counters along the
+        (season_id, total_points) index, so neither the ledger nor
+        archived seasons' missing rows come into it. Pages follow the
+        keyset (total_points, joined_at, user_id) after the `after`
+        position, and each rank counts the members with more points, so
+        a page costs the same wherever it starts. Each entry's rank
+        change comes from yesterday's snapshot.
+        """
+        season = (await self.db.execute(
+            select(Season.title, Season.timezone).where(Season.id == season_id)
+        )).one_or_none()
+        if season is None:
+            return None
+        yesterday = local_date(datetime.utcnow(), season.timezone) - timedelta(days=1)
+        previous = await LeaderboardSnapshots(self.db).get(season_id, yesterday)
+        previous_ranks = previous.index() if previous else {}
+        
+        active = and_(SeasonMember.season_id == season_id, SeasonMember.is_active.is_(True))
+        total_participants = await self.db.scalar(select(func.count(SeasonMember.id)).where(active))
+        
+        ahead = aliased(SeasonMember)
+        rank = select(func.count(ahead.id)).where(
+            ahead.season_id == SeasonMember.season_id,
+            ahead.is_active.is_(True),
+            ahead.total_points > SeasonMember.total_points,
+        ).correlate(SeasonMember).scalar_subquery() + 1
+        stmt = (
+            select(
+                rank.label("rank"),
+                SeasonMember.user_id,
+                SeasonMember.total_points,
+                SeasonMember.challenges_completed,
+                SeasonMember.badges_earned,
+                SeasonMember.last_activity_at,
+                SeasonMember.joined_at,
+                User.email,
+                UserProfile.display_name,
+                UserProfile.avatar_url,
+            )
+            .join(User, User.id == SeasonMember.user_id)
+            .outerjoin(UserProfile, UserProfile.user_id == SeasonMember.user_id)
+            .where(active)
+            .order_by(SeasonMember.total_points.desc(), SeasonMember.joined_at, SeasonMember.user_id)
+        )
+        if after is not None:
+            points, joined_at, user_id = after
+            stmt = stmt.where(or_(
+                SeasonMember.total_points < points,
+                and_(SeasonMember.total_points == points, SeasonMember.joined_at > joined_at),
+                and_(
+                    SeasonMember.total_points == points,
+                    SeasonMember.joined_at == joined_at,
+                    SeasonMember.user_id > user_id,
+                ),
+            ))
+        if limit is not None:
+            # One extra row tells whether another page follows
+            stmt = stmt.limit(limit + 1)
+        rows = (await self.db.execute(stmt)).all()
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_rank_cursor(rows[-1].total_points, rows[-1].joined_at, rows[-1].user_id)
+        
+        return LeaderboardResponse.model_construct(
+            season_id=str(season_id),
+            season_name=season.title,
+            total_participants=total_participants,
+            entries=[
+                LeaderboardEntry.model_construct(
+                    rank=row.rank,
+                    user_id=str(row.user_id),
+                    total_points=row.total_points,
+                    challenges_completed=row.challenges_completed,
+                    badges_earned=row.badges_earned,
+                    user_email=row.email,
+                    user_display_name=row.display_name,
+                    user_first_name=None,
+                    user_last_name=None,
+                    user_avatar_url=row.avatar_url,
+                    rank_change=(
+                        previous_ranks[row.user_id][0] - row.rank if row.user_id in previous_ranks else None
+                    ),
+                    last_activity=row.last_activity_at,
+                    recent_badges=[],
+                )
+                for row in rows
+            ],
+            generated_at=datetime.utcnow(),
+            limit=limit or len(rows),
+            next_cursor=next_cursor,
+        )
+    
+    async def get_daily_leaderboard(
+        self, season_id: str, day: Optional[date] = None
+    ) -> Optional[DailyLeaderboardResponse]:
+        """
+        Get a season's standings for the points earned on one local day
+        (default today): the day's closing snapshot, or the live standings
+        for today, minus the previous day's snapshot. Without that
+        snapshot the response is marked unavailable rather than passing
+        season totals off as the day's points.
+        """
+        season = (await self.db.execute(
+            select(Season.title, Season.timezone, Season.start_date).where(Season.id == season_id)
+        )).one_or_none()
+        if season is None:
+            return None
+        today = local_date(datetime.utcnow(), season.timezone)
+        day = day or today
+        
+        snapshots = LeaderboardSnapshots(self.db)
+        if day == today:
+            closing = await snapshots.standings(season_id)
+        elif day < today:
+            closing = await snapshots.get(season_id, day)
+        else:
+            closing = None
+        earned: List[Tuple[uuid.UUID, int]] = []
+        available = True
+        if closing is not None:
+            if day <= season.start_date:
+                # Nothing was scored before the season's first day
+                previous = RankVector.pack([])
+            else:
+                previous = await snapshots.get(season_id, day - timedelta(days=1))
+            if previous is None:
+                available = False
+                logger.warning("Daily standings unavailable", season_id=str(season_id), day=str(day))
+            else:
+                earned = closing.points_since(previous)
+        
+        users = await self.db.execute(
+            select(User.id, User.email, UserProfile.display_name, UserProfile.avatar_url)
+            .outerjoin(UserProfile, UserProfile.user_id == User.id)
+            .where(User.id.in_([user_id for user_id, _ in earned]))
+        )
+        users = {row.id: row for row in users}
+        
+        entries = []
+        for position, (user_id, points) in enumerate(earned):
+            rank = entries[-1].rank if entries and points == earned[position - 1][1] else position + 1
+            user = users[user_id]
+            entries.append(DailyLeaderboardEntry.model_construct(
+                rank=rank,
+                user_id=str(user_id),
+                points=points,
+                user_email=user.email,
+                user_display_name=user.display_name,
+                user_avatar_url=user.avatar_url,
+            ))
+        return DailyLeaderboardResponse.model_construct(
+            season_id=str(season_id),
+            season_name=season.title,
+            day=day,
+            entries=entries,
+            generated_at=datetime.utcnow(),
+            available=available,
+        )
@@ -5,17 +5,31 @@ Season service for season management operations
 import uuid
 import secrets
 import string
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 import structlog
 
 from app.models.season import Season, SeasonMember
-from app.schemas.season import SeasonCreate, SeasonUpdate
+from app.schemas.season import SeasonCreate, SeasonUpdate, SeasonResponse
+from app.services.score_ledger_service import ScoreLedgerService
+from app.utils.pagination import CursorKey, keyset_paginate, build_page
+from app.utils.projection import Projection
 
 logger = structlog.get_logger()
 
+# Counted in SQL through the (season_id, user_id) index instead of loading members
+active_member_count = (
+    select(func.count(SeasonMember.id))
+    .where(SeasonMember.season_id == Season.id, SeasonMember.is_active.is_(True))
+    .correlate(Season)
+    .scalar_subquery()
+)
+
+season_projection = Projection(SeasonResponse, Season, member_count=active_member_count)
+
 
 class SeasonService:
     """Service for season management operations."""
@@ -53,6 +67,7 @@ class SeasonService:
             longitude=season_data.longitude,
             start_date=start_date,
             end_date=end_date,
+            timezone=season_data.timezone,
             cover_image_url=season_data.cover_image_url,
             invitation_code=invitation_code,
             is_active=season_data.is_active,
@@ -72,6 +87,9 @@ class SeasonService:
         self.db.add(creator_member)
         await self.db.commit()
         
+        # Give the season its own score ledger partition
+        await ScoreLedgerService(self.db).ensure_partition(season.id)
+        
         return season
     
     async def get_season_by_id(self, season_id: str) -> Optional[Season]:
@@ -83,34 +101,67 @@ class SeasonService:
         )
         return result.scalar_one_or_none()
     
-    async def get_seasons(self, skip: int = 0, limit: int = 50) -> List[Season]:
-        """Get list of seasons with relationships loaded."""
+    async def get_season_response(self, season_id: str) -> Optional[SeasonResponse]:
+        """Get a season's response projection by ID."""
         result = await self.db.execute(
-            select(Season)
-            .options(selectinload(Season.members))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Season.created_at.desc())
+            season_projection.select().where(Season.id == season_id)
         )
-        return list(result.scalars().all())
+        row = result.one_or_none()
+        return season_projection.from_row(row) if row else None
     
-    async def join_season(self, season_id: str, user_id: str) -> Optional[SeasonMember]:
-        """Join a user to a season."""
-        season = await self.get_season_by_id(season_id)
-        if not season:
-            return None
-        
-        # Check if already a member
-        existing = await self.db.execute(
-            select(SeasonMember).where(
-                and_(SeasonMember.season_id == season_id, SeasonMember.user_id == user_id)
+    async def get_seasons(
+        self, limit: int = 50, after: Optional[CursorKey] = None
+    ) -> Tuple[List[SeasonResponse], Optional[str]]:
+        """Get a page of season response projections, newest first."""
+        stmt = keyset_paginate(
+            season_projection.select(),
+            Season.created_at, Season.id, after, limit
+        )
+        result = await self.db.execute(stmt)
+        rows, next_cursor = build_page(result.all(), limit)
+        return season_projection.from_rows(rows), next_cursor
+    
+    async def is_member(self, season_id: str, user_id: str) -> bool:
+        """Check whether a user is an active member of a season."""
+        result = await self.db.execute(
+            select(SeasonMember.id).where(
+                SeasonMember.season_id == season_id,
+                SeasonMember.user_id == user_id,
+                SeasonMember.is_active.is_(True),
+            )
+        )
+        return result.scalar_one_or_none() is not None
+    
+    async def get_current_season_id(self, user_id: str) -> Optional[uuid.UUID]:
+        """The running season the user joined most recently, if any."""
+        result = await self.db.execute(
+            select(SeasonMember.season_id)
+            .join(Season, Season.id == SeasonMember.season_id)
+            .where(
+                SeasonMember.user_id == user_id,
+                SeasonMember.is_active.is_(True),
+                Season.is_active.is_(True),
+                Season.is_completed.is_(False),
             )
+            .order_by(SeasonMember.joined_at.desc())
+            .limit(1)
         )
-        if existing.scalar_one_or_none():
+        return result.scalar_one_or_none()
+    
+    async def join_season(self, season_id: str, user_id: str) -> Optional[SeasonMember]:
+        """Join a user to a season."""
+        exists = await self.db.execute(select(Season.id).where(Season.id == season_id))
+        if exists.scalar_one_or_none() is None:
             return None
         
+        # The unique (season_id, user_id) index rejects duplicate memberships,
+        # including concurrent joins, without a separate lookup
         member = SeasonMember(season_id=season_id, user_id=user_id)
         self.db.add(member)
-        await self.db.commit()
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            return None
         await self.db.refresh(member)
         return member
@@ -0,0 +1,208 @@
+"""
+Streak service: consecutive active days, streak bonuses and streak badges
+"""
+
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+import structlog
+
+from app.config import settings
+from app.models.scoring import Score, ScoreType, UserStreak
+from app.models.user import UserProfile
+from app.services.badge_service import BadgeEngine
+from app.utils.ids import as_uuid
+
+logger = structlog.get_logger()
+
+# Every run of this many consecutive days earns a streak bonus
+STREAK_BONUS_DAYS = 6
+STREAK_BONUS_POINTS = 20
+
+# Scores that count as taking part on a given day
+STREAK_ACTIVITY_TYPES = (ScoreType.CHALLENGE_COMPLETION,)
+
+
+def zone(timezone_name: Optional[str]) -> ZoneInfo:
+    """A timezone by IANA name, the default one if unset or unknown."""
+    try:
+        return ZoneInfo(timezone_name or settings.default_timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(settings.default_timezone)
+
+
+def local_date(moment: datetime, timezone_name: Optional[str]) -> date:
+    """Calendar day of a naive UTC timestamp in a user's timezone."""
+    return moment.replace(tzinfo=timezone.utc).astimezone(zone(timezone_name)).date()
+
+
+def local_midnight(day: date, timezone_name: Optional[str]) -> datetime:
+    """Start of a local calendar day as a naive UTC timestamp."""
+    start = datetime.combine(day, time.min, tzinfo=zone(timezone_name))
+    return start.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def advance(current: int, longest: int, last_active: Optional[date], day: date) -> Optional[Tuple[int, int]]:
+    """
+    Streak (current, longest) after activity on `day`, or None when the
+    day was already counted. Activity older than the last active day is
+    ignored here; replaying the ledger in order handles backfills.
+    """
+    if last_active is not None and day <= last_active:
+        return None
+    current = current + 1 if last_active == day - timedelta(days=1) else 1
+    return current, max(longest, current)
+
+
+def current_streak(
+    streak: int, last_active: Optional[date], timezone_name: Optional[str], now: Optional[datetime] = None
+) -> int:
+    """A stored streak as of `now`: 0 once a whole day passed without activity."""
+    if last_active is None:
+        return 0
+    today = local_date(now or datetime.utcnow(), timezone_name)
+    return streak if last_active >= today - timedelta(days=1) else 0
+
+
+def _bonus(user_id: uuid.UUID, season_id: uuid.UUID, current: int, day: date) -> Score:
+    return Score(
+        user_id=user_id,
+        season_id=season_id,
+        points=STREAK_BONUS_POINTS,
+        score_type=ScoreType.STREAK_BONUS,
+        description=f"Bonus régularité : {current} jours consécutifs",
+        score_date=day,
+        model_metadata={"streak_days": current},
+    )
+
+
+class StreakService:
+    """
+    Maintain per-(user, season) streaks incrementally.
+    
+    Each activity score updates one `user_streaks` row in O(1) instead of
+    rescanning the user's score history. Days follow the user's profile
+    timezone, so a challenge done late in the evening in Europe counts
+    for that evening rather than the next UTC day.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _timezones(self, user_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Optional[str]]:
+        result = await self.db.execute(
+            select(UserProfile.user_id, UserProfile.timezone).where(UserProfile.user_id.in_(user_ids))
+        )
+        return {row.user_id: row.timezone for row in result}
+    
+    async def record_activity(
+        self, season_id: Any, user_ids: Iterable[Any], at: Optional[datetime] = None
+    ) -> List[Score]:
+        """
+        Count activity at `at` (naive UTC, default now) towards the users'
+        streaks, adding streak bonuses and streak badges to the session.
+        The caller commits. Returns the bonus scores added.
+        """
+        season_id = as_uuid(season_id)
+        user_ids = list(dict.fromkeys(as_uuid(user_id) for user_id in user_ids))
+        at = at or datetime.utcnow()
+        
+        timezones = await self._timezones(user_ids)
+        result = await self.db.execute(
+            select(UserStreak)
+            .where(UserStreak.season_id == season_id, UserStreak.user_id.in_(user_ids))
+            .with_for_update()
+        )
+        streaks = {streak.user_id: streak for streak in result.scalars()}
+        
+        bonuses: List[Score] = []
+        reached: Dict[uuid.UUID, int] = {}
+        for user_id in user_ids:
+            day = local_date(at, timezones.get(user_id))
+            streak = streaks.get(user_id)
+            if streak is None:
+                streak = UserStreak(user_id=user_id, season_id=season_id, current_streak=0, longest_streak=0)
+                self.db.add(streak)
+            
+            advanced = advance(streak.current_streak, streak.longest_streak, streak.last_active_date, day)
+            if advanced is None:
+                continue
+            streak.current_streak, streak.longest_streak = advanced
+            streak.last_active_date = day
+            reached[user_id] = streak.current_streak
+            if streak.current_streak % STREAK_BONUS_DAYS == 0:
+                bonuses.append(_bonus(user_id, season_id, streak.current_streak, day))
+        
+        self.db.add_all(bonuses)
+        if reached:
+            await BadgeEngine(self.db).record_streaks(season_id, reached)
+        return bonuses
+    
+    async def get_streak(self, user_id: Any, season_id: Any, now: Optional[datetime] = None) -> Tuple[int, int]:
+        """
+        A user's (current, longest) streak in a season. The current streak
+        is 0 once a whole day has passed without activity.
+        """
+        streak = await self.db.get(UserStreak, (as_uuid(user_id), as_uuid(season_id)))
+        if streak is None:
+            return 0, 0
+        timezones = await self._timezones([streak.user_id])
+        current = current_streak(streak.current_streak, streak.last_active_date, timezones.get(streak.user_id), now)
+        return current, streak.longest_streak
+    
+    async def rebuild(self, season_id: Optional[Any] = None) -> Dict[str, int]:
+        """
+        Recompute streaks by replaying the score ledger, for one season or
+        all of them, and award streak bonuses the ledger is missing.
+        Idempotent: bonuses already recorded are not awarded again.
+        """
+        scope = [Score.season_id == as_uuid(season_id)] if season_id else []
+        await self.db.execute(
+            delete(UserStreak).where(*([UserStreak.season_id == as_uuid(season_id)] if season_id else []))
+        )
+        
+        existing = await self.db.execute(
+            select(Score.season_id, Score.user_id, func.count())
+            .where(Score.score_type == ScoreType.STREAK_BONUS.value, *scope)
+            .group_by(Score.season_id, Score.user_id)
+        )
+        bonuses_recorded = {(row[0], row[1]): row[2] for row in existing}
+        
+        stream = await self.db.stream(
+            select(Score.season_id, Score.user_id, Score.created_at, UserProfile.timezone)
+            .outerjoin(UserProfile, UserProfile.user_id == Score.user_id)
+            .where(Score.score_type.in_([score_type.value for score_type in STREAK_ACTIVITY_TYPES]), *scope)
+            .order_by(Score.season_id, Score.user_id, Score.created_at)
+        )
+        
+        streaks: Dict[Tuple[uuid.UUID, uuid.UUID], UserStreak] = {}
+        bonuses_due: Dict[Tuple[uuid.UUID, uuid.UUID], List[Tuple[int, date]]] = {}
+        async for row in stream:
+            key = (row.season_id, row.user_id)
+            streak = streaks.get(key)
+            if streak is None:
+                streak = streaks[key] = UserStreak(
+                    season_id=row.season_id, user_id=row.user_id, current_streak=0, longest_streak=0
+                )
+            day = local_date(row.created_at, row.timezone)
+            advanced = advance(streak.current_streak, streak.longest_streak, streak.last_active_date, day)
+            if advanced is None:
+                continue
+            streak.current_streak, streak.longest_streak = advanced
+            streak.last_active_date = day
+            if streak.current_streak % STREAK_BONUS_DAYS == 0:
+                bonuses_due.setdefault(key, []).append((streak.current_streak, day))
+        
+        bonuses = [
+            _bonus(user, season, current, day)
+            for (season, user), due in bonuses_due.items()
+            for current, day in due[bonuses_recorded.get((season, user), 0):]
+        ]
+        self.db.add_all(list(streaks.values()) + bonuses)
+        await self.db.commit()
+        
+        logger.info("Streaks rebuilt", streaks=len(streaks), bonuses=len(bonuses))
+        return {"streaks": len(streaks), "bonuses": len(bonuses)}
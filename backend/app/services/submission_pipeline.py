@@ -0,0 +1,121 @@
+"""
+In-process worker pool validating challenge submissions in the background
+"""
+
+import asyncio
+from typing import List, Optional
+import structlog
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services.submission_service import SubmissionService
+
+logger = structlog.get_logger()
+
+
+class SubmissionPipeline:
+    """
+    Bounded queue of submission ids drained by a pool of asyncio workers.
+    
+    The submit endpoint persists a PENDING submission and enqueues its id;
+    workers validate it (quiz/sport grading, AI photo analysis) and award
+    points, each job in its own session. Failed jobs are retried with
+    exponential backoff; since processing is idempotent, a job that ran
+    twice (retry, duplicate enqueue, startup recovery) has no extra effect.
+    Submissions left PENDING by a restart or exhausted retries are
+    re-enqueued on the next start.
+    """
+    
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        workers: int = settings.submission_workers,
+        queue_size: int = settings.submission_queue_size,
+        max_attempts: int = settings.submission_max_attempts,
+        retry_delay: float = 0.5,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    @property
+    def queue(self) -> asyncio.Queue:
+        # Created lazily so the queue binds to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        return self._queue
+    
+    def is_full(self) -> bool:
+        return self.queue.full()
+    
+    def enqueue(self, submission_id) -> bool:
+        """Queue a submission for validation. Returns False if the queue is full."""
+        try:
+            self.queue.put_nowait(submission_id)
+        except asyncio.QueueFull:
+            logger.warning("Submission queue full", submission_id=str(submission_id))
+            return False
+        return True
+    
+    async def start(self) -> None:
+        """Start the workers and re-enqueue submissions left pending."""
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"submission-worker-{i}")
+            for i in range(self.workers)
+        ]
+        
+        async with self.session_factory() as db:
+            pending = await SubmissionService(db).get_pending_submission_ids()
+        recovered = sum(1 for submission_id in pending if self.enqueue(submission_id))
+        logger.info("Submission pipeline started", workers=self.workers, recovered=recovered)
+    
+    async def join(self) -> None:
+        """Wait until every queued submission has been processed."""
+        await self.queue.join()
+    
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Drain the queue for up to `timeout` seconds, then stop the workers."""
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Submission queue not drained", remaining=self.queue.qsize())
+        
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def _worker(self) -> None:
+        while True:
+            submission_id = await self.queue.get()
+            try:
+                await self._process(submission_id)
+            finally:
+                self.queue.task_done()
+    
+    async def _process(self, submission_id) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self.session_factory() as db:
+                    await SubmissionService(db).process_submission(submission_id)
+                return
+            except Exception as e:
+                logger.warning(
+                    "Submission validation failed",
+                    submission_id=str(submission_id),
+                    attempt=attempt,
+                    error=str(e),
+                )
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+        
+        # Stays PENDING and is picked up again on the next start
+        logger.error("Submission validation abandoned", submission_id=str(submission_id))
+
+
+# Shared by the submit endpoint and the application lifespan
+submission_pipeline = SubmissionPipeline()
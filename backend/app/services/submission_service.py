@@ -0,0 +1,339 @@
+"""
+Submission service for challenge submissions and their validation
+"""
+
+import math
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
+import structlog
+
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType, SubmissionStatus
+from app.models.scoring import Score
+from app.models.season import SeasonMember
+from app.schemas.challenge import ChallengeSubmissionResponse
+from app.services.ai_budget import Spender
+from app.services.badge_service import BadgeEngine
+from app.services.challenge_service import ChallengeService, submission_projection
+from app.services.leaderboard_feed import leaderboard_feed
+from app.services.member_counters import COMPLETION_TYPES, MemberCounters, MemberDelta
+from app.services.personalization import personalization_cache
+from app.services.photo_duplicates import PhotoDuplicateIndex, photo_duplicate_index
+from app.services.photo_analysis import (
+    PHOTO_APPROVAL_THRESHOLD, PhotoAnalysis, grade_photo, photo_analysis as shared_photo_analysis
+)
+from app.services.scoring_service import ScoringService
+from app.utils.file_upload import file_upload_handler
+from app.utils.quiz_keys import AnswerKey
+
+logger = structlog.get_logger()
+
+# A user's submission in one of these states answers a retried submit (see ACTIVE_SUBMISSION)
+ACTIVE_STATUSES = (SubmissionStatus.PENDING, SubmissionStatus.APPROVED, SubmissionStatus.NEEDS_REVIEW)
+
+TEAM_ALREADY_REWARDED = "Défi d'équipe déjà réussi : points déjà attribués à la famille"
+
+
+def grade_quiz(key: AnswerKey, submission_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Grade quiz answers against the challenge's compiled answer key."""
+    if not key.size:
+        return {"status": SubmissionStatus.NEEDS_REVIEW, "score": None, "notes": "Quiz has no answer key"}
+    
+    correct = key.count_correct(submission_data.get("answers"))
+    return {
+        "status": SubmissionStatus.APPROVED if correct else SubmissionStatus.REJECTED,
+        "score": correct / key.size,
+        "notes": f"{correct}/{key.size} correct answers",
+    }
+
+
+def _measure(value: Any) -> Optional[float]:
+    """A finite, non-negative number from activity data, 0 when absent, None when malformed."""
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) and number >= 0 else None
+
+
+def grade_sport(content: Optional[Dict[str, Any]], submission_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Grade activity data against the challenge's distance and duration targets."""
+    content = content if isinstance(content, dict) else {}
+    progress = []
+    for target_key, value_key in (("target_distance", "distance"), ("target_duration", "duration")):
+        target = _measure(content.get(target_key))
+        if target:
+            value = _measure(submission_data.get(value_key))
+            if value is None:
+                return {"status": SubmissionStatus.NEEDS_REVIEW, "score": None, "notes": f"Invalid {value_key}"}
+            progress.append(min(value / target, 1.0))
+    if not progress:
+        return {"status": SubmissionStatus.NEEDS_REVIEW, "score": None, "notes": "Challenge has no target"}
+    
+    score = min(progress)
+    return {
+        "status": SubmissionStatus.APPROVED if score >= 1.0 else SubmissionStatus.REJECTED,
+        "score": score,
+        "notes": f"{score:.0%} of the target reached",
+    }
+
+
+class SubmissionService:
+    """Service for challenge submissions and their validation."""
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        photo_analysis: Optional[PhotoAnalysis] = None,
+        duplicates: PhotoDuplicateIndex = photo_duplicate_index,
+    ):
+        self.db = db
+        self.photo_analysis = photo_analysis or shared_photo_analysis
+        self.duplicates = duplicates
+    
+    async def submit(
+        self, challenge_id: str, user_id: str, submission_data: Dict[str, Any]
+    ) -> Optional[ChallengeSubmission]:
+        """
+        Record a PENDING submission for later validation.
+        
+        A retried submit returns the user's existing pending or accepted
+        submission instead of creating a second one; a partial unique
+        index settles concurrent ones.
+        """
+        result = await self.db.execute(
+            select(Challenge.season_id, Challenge.type, Challenge.expires_at)
+            .join(SeasonMember, SeasonMember.season_id == Challenge.season_id)
+            .where(
+                Challenge.id == challenge_id,
+                SeasonMember.user_id == user_id,
+                SeasonMember.is_active.is_(True),
+            )
+        )
+        challenge = result.one_or_none()
+        if challenge is None or (challenge.expires_at and challenge.expires_at < datetime.utcnow()):
+            return None
+        
+        submission = await self._active_submission(challenge_id, user_id)
+        if submission:
+            return submission
+        
+        photo_hash = None
+        if challenge.type == ChallengeType.PHOTO and isinstance(submission_data.get("image_url"), str):
+            image_hash = file_upload_handler.get_image_hash(submission_data["image_url"])
+            photo_hash = None if image_hash is None else f"{image_hash:016x}"
+        
+        submission = ChallengeSubmission(
+            challenge_id=challenge_id,
+            user_id=user_id,
+            submission_data=submission_data,
+            photo_hash=photo_hash,
+        )
+        self.db.add(submission)
+        try:
+            await self.db.flush()
+        except IntegrityError:
+            # A concurrent submit recorded one first
+            await self.db.rollback()
+            return await self._active_submission(challenge_id, user_id)
+        await MemberCounters(self.db).add(challenge.season_id, {user_id: MemberDelta(attempted=1)})
+        await self.db.commit()
+        await self.db.refresh(submission)
+        return submission
+    
+    async def _active_submission(self, challenge_id: str, user_id: str) -> Optional[ChallengeSubmission]:
+        result = await self.db.execute(
+            select(ChallengeSubmission).where(
+                ChallengeSubmission.user_id == user_id,
+                ChallengeSubmission.challenge_id == challenge_id,
+                ChallengeSubmission.status.in_(ACTIVE_STATUSES),
+            )
+        )
+        return result.scalars().first()
+    
+    async def get_submission_response(
+        self, submission_id: str, user_id: str
+    ) -> Optional[ChallengeSubmissionResponse]:
+        """Get one of a user's submissions with its validation status."""
+        result = await self.db.execute(
+            submission_projection.select().where(
+                ChallengeSubmission.id == submission_id,
+                ChallengeSubmission.user_id == user_id,
+            )
+        )
+        row = result.one_or_none()
+        return submission_projection.from_row(row) if row else None
+    
+    async def get_pending_submission_ids(self) -> List[str]:
+        """Get submissions still waiting for validation, oldest first."""
+        result = await self.db.execute(
+            select(ChallengeSubmission.id)
+            .where(ChallengeSubmission.status == SubmissionStatus.PENDING)
+            .order_by(ChallengeSubmission.created_at)
+        )
+        return list(result.scalars().all())
+    
+    async def _validate(self, challenge: Challenge, submission: ChallengeSubmission) -> Dict[str, Any]:
+        """Validate a submission according to its challenge type."""
+        if challenge.type == ChallengeType.QUIZ:
+            key = await ChallengeService(self.db).get_answer_key(challenge.id, challenge.updated_at)
+            return grade_quiz(key, submission.submission_data)
+        if challenge.type == ChallengeType.SPORT:
+            content = await self.db.scalar(select(Challenge.content).where(Challenge.id == challenge.id))
+            return grade_sport(content, submission.submission_data)
+        if challenge.type == ChallengeType.PHOTO:
+            if submission.validation_score is not None:
+                # Analyzed by an earlier attempt
+                return grade_photo(
+                    submission.validation_score, submission.validation_notes,
+                    rejected=submission.auto_validated and submission.validation_score < PHOTO_APPROVAL_THRESHOLD,
+                )
+            duplicate = await self.duplicates.find_earlier(self.db, challenge.season_id, submission)
+            if duplicate:
+                # Left to a moderator, without spending an analysis on it
+                distance, original_id = duplicate
+                logger.info(
+                    "Duplicate photo submission",
+                    submission_id=str(submission.id),
+                    original_id=str(original_id),
+                    distance=distance,
+                )
+                return {
+                    "status": SubmissionStatus.NEEDS_REVIEW,
+                    "score": None,
+                    "notes": f"Photo quasi identique à une soumission précédente ({original_id})",
+                }
+            return await self.photo_analysis.analyze(
+                submission.id,
+                submission.submission_data.get("image_url", ""),
+                Spender(season_id=challenge.season_id, user_id=submission.user_id),
+            )
+        # Creative, exploration and team challenges are reviewed by a moderator
+        return {"status": SubmissionStatus.NEEDS_REVIEW, "score": None, "notes": None}
+    
+    async def _team_already_rewarded(self, challenge: Challenge) -> bool:
+        """Whether a teammate's submission already earned the family this team challenge."""
+        # Validations of the same team challenge wait for each other until commit
+        await self.db.execute(select(Challenge.id).where(Challenge.id == challenge.id).with_for_update())
+        rewarded = await self.db.scalar(
+            select(Score.id)
+            .where(
+                Score.season_id == challenge.season_id,
+                Score.challenge_id == challenge.id,
+                Score.score_type.in_([score_type.value for score_type in COMPLETION_TYPES]),
+            )
+            .limit(1)
+        )
+        return rewarded is not None
+    
+    async def process_submission(self, submission_id: str) -> bool:
+        """
+        Validate a pending submission and award its points.
+        
+        Idempotent: the status change is conditional on the submission still
+        being PENDING and commits together with the score, so a retried or
+        duplicated job neither validates twice nor awards points twice. A
+        team challenge is awarded to the family once, for the first
+        approved submission; teammates' later ones are approved without
+        points.
+        Returns True if this call validated the submission.
+        """
+        result = await self.db.execute(
+            select(ChallengeSubmission, Challenge)
+            .join(Challenge, Challenge.id == ChallengeSubmission.challenge_id)
+            .where(ChallengeSubmission.id == submission_id)
+            # Quizzes are graded from the cached answer key
+            .options(defer(Challenge.content, raiseload=True))
+            .execution_options(populate_existing=True)
+        )
+        row = result.one_or_none()
+        if row is None or row.ChallengeSubmission.status != SubmissionStatus.PENDING:
+            return False
+        submission, challenge = row
+        
+        outcome = await self._validate(challenge, submission)
+        points = 0
+        if outcome["status"] == SubmissionStatus.APPROVED:
+            points = challenge.base_points
+            if outcome["score"] is not None:
+                points = round(points * outcome["score"])
+                if outcome["score"] >= 1.0:
+                    points += challenge.bonus_points
+            if points and challenge.is_team_challenge and await self._team_already_rewarded(challenge):
+                # The whole family was awarded once already
+                points = 0
+                outcome["notes"] = "; ".join(filter(None, [outcome["notes"], TEAM_ALREADY_REWARDED]))
+        
+        transition = await self.db.execute(
+            update(ChallengeSubmission)
+            .where(
+                ChallengeSubmission.id == submission.id,
+                ChallengeSubmission.status == SubmissionStatus.PENDING,
+            )
+            .values(
+                status=outcome["status"],
+                points_awarded=points,
+                auto_validated=outcome["status"] != SubmissionStatus.NEEDS_REVIEW,
+                validation_score=outcome["score"],
+                validation_notes=outcome["notes"],
+                validated_at=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if transition.rowcount != 1:
+            await self.db.rollback()
+            return False
+        
+        if points:
+            scoring_service = ScoringService(self.db)
+            await scoring_service.award_points(
+                user_id=submission.user_id,
+                season_id=challenge.season_id,
+                points=points,
+                reason=f"Défi réussi : {challenge.title}"[:200],
+                challenge_id=challenge.id,
+                submission_id=submission.id,
+                commit=False,
+            )
+            if challenge.is_team_challenge:
+                # The rest of the family earns the same points
+                teammates = await self.db.scalars(
+                    select(SeasonMember.user_id).where(
+                        SeasonMember.season_id == challenge.season_id,
+                        SeasonMember.is_active.is_(True),
+                        SeasonMember.user_id != submission.user_id,
+                    )
+                )
+                await scoring_service.award_points_bulk(
+                    user_ids=teammates.all(),
+                    season_id=challenge.season_id,
+                    points=points,
+                    reason=f"Défi d'équipe réussi : {challenge.title}"[:200],
+                    challenge_id=challenge.id,
+                    submission_id=submission.id,
+                    commit=False,
+                )
+        if outcome["status"] == SubmissionStatus.APPROVED:
+            await BadgeEngine(self.db).record_submissions(
+                challenge.season_id, [(submission.user_id, challenge.type, outcome["score"])]
+            )
+        await self.db.commit()
+        if points:
+            leaderboard_feed.notify(challenge.season_id)
+        if outcome["status"] == SubmissionStatus.APPROVED:
+            personalization_cache.record_completion(submission.user_id, challenge.type)
+        
+        logger.info(
+            "Submission validated",
+            submission_id=str(submission.id),
+            status=outcome["status"].value,
+            points=points,
+        )
+        return True
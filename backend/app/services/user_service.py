@@ -9,10 +9,16 @@ from sqlalchemy.orm import selectinload
 import structlog
 
 from app.models.user import User, UserProfile
-from app.schemas.user import UserCreate, UserUpdate, UserProfileCreate, UserProfileUpdate
+from app.schemas.user import UserCreate, UserUpdate, UserProfileCreate, UserProfileUpdate, UserProfileResponse
+from app.services.personalization import personalization_cache
+from app.utils.projection import Projection
 
 logger = structlog.get_logger()
 
+profile_projection = Projection(
+    UserProfileResponse, UserProfile, preferences=UserProfile.challenge_preferences
+)
+
 
 class UserService:
     """Service for user management operations."""
@@ -86,11 +92,14 @@ class UserService:
             return None
         
         update_data = profile_update.model_dump(exclude_unset=True)
+        if "preferences" in update_data:
+            update_data["challenge_preferences"] = update_data.pop("preferences")
         for field, value in update_data.items():
             setattr(profile, field, value)
         
         await self.db.commit()
         await self.db.refresh(profile)
+        personalization_cache.update_profile(user_id, profile.display_name, profile.challenge_preferences)
         return profile
     
     async def deactivate_user(self, user_id: str) -> bool:
@@ -2,19 +2,35 @@
 File upload utilities for handling media files
 """
 
+import io
 import os
+import re
 import uuid
+import asyncio
 import mimetypes
 from typing import Optional, List, Tuple
 from pathlib import Path
 import aiofiles
 from fastapi import UploadFile, HTTPException, status
+from PIL import Image, UnidentifiedImageError
 import structlog
 
 from app.config import settings
+from app.utils.image_hash import phash
 
 logger = structlog.get_logger()
 
+# Stored images are named "<uuid>-<perceptual hash>.<ext>"
+_HASHED_IMAGE_URL = re.compile(r"^/uploads/image/[0-9a-f-]{36}-([0-9a-f]{16})\.[a-z0-9]+$")
+
+
+def _image_hash(content: bytes) -> Optional[int]:
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            return phash(image)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        return None
+
 
 class FileUploadHandler:
     """Handler for file uploads with validation and storage."""
@@ -90,13 +106,19 @@ class FileUploadHandler:
             if category and category in self.allowed_extensions:
                 file_category = category
             
-            # Generate unique filename
-            unique_filename = f"{uuid.uuid4()}{file_ext}"
+            content = await file.read()
+            
+            # Generate unique filename, carrying the perceptual hash of images
+            # so duplicate photo checks never have to decode them again
+            image_hash = await asyncio.to_thread(_image_hash, content) if file_category == 'image' else None
+            if image_hash is None:
+                unique_filename = f"{uuid.uuid4()}{file_ext}"
+            else:
+                unique_filename = f"{uuid.uuid4()}-{image_hash:016x}{file_ext}"
             file_path = self.upload_dir / file_category / unique_filename
             
             # Save file
             async with aiofiles.open(file_path, 'wb') as f:
-                content = await file.read()
                 await f.write(content)
             
             # Get file info
@@ -107,7 +129,8 @@ class FileUploadHandler:
                 'size': len(content),
                 'mime_type': file.content_type or mimetypes.guess_type(file.filename)[0],
                 'path': str(file_path),
-                'url': f"/uploads/{file_category}/{unique_filename}"
+                'url': f"/uploads/{file_category}/{unique_filename}",
+                'image_hash': None if image_hash is None else f"{image_hash:016x}"
             }
             
             logger.info("File uploaded successfully", **file_info)
@@ -145,6 +168,13 @@ class FileUploadHandler:
             logger.error("Failed to delete file", error=str(e), path=file_path)
             return False
     
+    def get_image_hash(self, url: str) -> Optional[int]:
+        """Perceptual hash computed when the image at `url` was uploaded, if it was."""
+        match = _HASHED_IMAGE_URL.match(url)
+        if not match or not self.get_file_path('image', url.rsplit('/', 1)[1]).is_file():
+            return None
+        return int(match.group(1), 16)
+    
     def get_file_url(self, category: str, filename: str) -> str:
         """Get URL for uploaded file."""
         return f"/uploads/{category}/{filename}"
@@ -8,6 +8,7 @@ import httpx
 import structlog
 
 from app.config import settings
+from app.utils.singleflight import SingleFlight
 
 logger = structlog.get_logger()
 
@@ -82,9 +83,23 @@ class LocationInfo:
         }
 
 
+# In-flight reverse geocoding calls, by rounded coordinates
+_location_lookups: SingleFlight[Optional[LocationInfo]] = SingleFlight()
+
+
 async def get_location_info(latitude: float, longitude: float) -> Optional[LocationInfo]:
     """
     Get location information from coordinates using reverse geocoding.
+    Concurrent lookups of the same point, to the sixth decimal, share one call.
+    """
+    return await _location_lookups.do(
+        (round(latitude, 6), round(longitude, 6)), lambda: _reverse_geocode(latitude, longitude)
+    )
+
+
+async def _reverse_geocode(latitude: float, longitude: float) -> Optional[LocationInfo]:
+    """
+    Reverse geocoding behind `get_location_info`.
     This is a simplified implementation - in production, you'd use a real geocoding service.
     """
     try:
@@ -0,0 +1,11 @@
+"""
+Identifier helpers
+"""
+
+import uuid
+from typing import Any
+
+
+def as_uuid(value: Any) -> uuid.UUID:
+    """`value` as a UUID, whether it is one already or its string form."""
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
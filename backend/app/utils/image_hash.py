@@ -0,0 +1,96 @@
+"""
+Perceptual image hashes and a BK-tree for finding near-identical photos
+"""
+
+import math
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+from PIL import Image
+
+V = TypeVar("V")
+
+HASH_SIZE = 8  # 8x8 low frequencies: 64-bit hashes
+_SAMPLE = HASH_SIZE * 4
+
+# DCT-II basis for the low frequencies of a _SAMPLE-point signal
+_COSINES = [
+    [math.cos(math.pi * (2 * x + 1) * u / (2 * _SAMPLE)) for x in range(_SAMPLE)]
+    for u in range(HASH_SIZE)
+]
+
+
+def phash(image: Image.Image) -> int:
+    """
+    64-bit perceptual hash: which of the image's lowest spatial
+    frequencies are above their median. Resizing, recompression and
+    small color changes move it by a few bits at most.
+    """
+    pixels = list(image.convert("L").resize((_SAMPLE, _SAMPLE), Image.Resampling.LANCZOS).getdata())
+    rows = [pixels[y * _SAMPLE:(y + 1) * _SAMPLE] for y in range(_SAMPLE)]
+    # Separable 2D DCT, keeping the HASH_SIZE x HASH_SIZE low corner
+    row_dct = [[sum(c * p for c, p in zip(basis, row)) for basis in _COSINES] for row in rows]
+    coefficients = [
+        sum(c * row_dct[y][u] for y, c in enumerate(basis))
+        for basis in _COSINES
+        for u in range(HASH_SIZE)
+    ]
+    # The DC term only says how bright the image is: bit 0 stays clear
+    ac = coefficients[1:]
+    median = sorted(ac)[len(ac) // 2]
+    return sum(1 << i for i, c in enumerate(ac, 1) if c > median)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+class BKTree(Generic[V]):
+    """
+    Hashes indexed by Hamming distance.
+    
+    Each node's children are keyed by their distance to it, so by the
+    triangle inequality a search within `radius` of a hash only descends
+    into children `radius` away from the distance to their parent,
+    visiting a small part of the tree.
+    """
+    
+    def __init__(self):
+        # Node: (hash, values stored under it, children by distance)
+        self._root: Optional[Tuple[int, List[V], Dict[int, tuple]]] = None
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def add(self, value_hash: int, value: V) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = (value_hash, [value], {})
+            return
+        node = self._root
+        while True:
+            distance = hamming(value_hash, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value_hash, [value], {})
+                return
+            node = child
+    
+    def search(self, value_hash: int, radius: int) -> List[Tuple[int, V]]:
+        """(distance, value) of everything within `radius`, closest first."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_hash, values, children = stack.pop()
+            distance = hamming(value_hash, node_hash)
+            if distance <= radius:
+                found.extend((distance, value) for value in values)
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
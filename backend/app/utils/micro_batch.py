@@ -0,0 +1,64 @@
+"""
+Micro-batching: group calls arriving close together into one batched call
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collect items for up to `max_size` items or `max_wait` seconds,
+    whichever comes first, then pass them to `handler` in one call.
+    
+    `handler` takes the batch and returns one result per item, in order.
+    Each caller of `submit` gets its own item's result; if the handler
+    raises, every caller in the batch gets the exception. A caller that
+    gives up does not cancel the batch it is part of.
+    """
+    
+    def __init__(self, handler: Callable[[List[T]], Awaitable[List[R]]], max_size: int, max_wait: float):
+        self.handler = handler
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[T, "asyncio.Future[R]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()  # Keeps batches in flight referenced
+    
+    async def submit(self, item: T) -> R:
+        """Add `item` to the next batch and wait for its result."""
+        future: "asyncio.Future[R]" = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self.flush)
+        return await future
+    
+    def flush(self) -> None:
+        """Send the items collected so far without waiting any longer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _run(self, batch: List[Tuple[T, "asyncio.Future[R]"]]) -> None:
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch handler returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,118 @@
+"""
+Keyset (cursor) pagination utilities for list endpoints
+"""
+
+import base64
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select, and_, or_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CursorKey = Tuple[datetime, uuid.UUID]
+# Leaderboard position: (total_points, joined_at, user_id)
+RankCursorKey = Tuple[int, datetime, uuid.UUID]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Encode a (created_at, id) position as an opaque URL-safe cursor."""
+    raw = f"{created_at.isoformat()}|{uuid.UUID(str(row_id)).hex}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> CursorKey:
+    """Decode an opaque cursor back into its (created_at, id) position."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError(str(e)) from e
+
+
+def encode_rank_cursor(total_points: int, joined_at: datetime, user_id: Any) -> str:
+    """Encode a leaderboard position: points, then join time and id breaking ties."""
+    return f"{int(total_points)}.{encode_cursor(joined_at, user_id)}"
+
+
+def decode_rank_cursor(cursor: str) -> RankCursorKey:
+    """Decode a leaderboard cursor back into its (total_points, joined_at, user_id) position."""
+    points, _, position = cursor.partition(".")
+    try:
+        total_points = int(points)
+    except ValueError as e:
+        raise InvalidCursorError(str(e)) from e
+    return (total_points, *decode_cursor(position))
+
+
+def keyset_paginate(
+    stmt: Select, created_col, id_col, after: Optional[CursorKey], limit: int
+) -> Select:
+    """
+    Apply newest-first keyset pagination over (created_at, id).
+    
+    One extra row is fetched so that `build_page` can tell whether
+    another page exists without a separate COUNT query.
+    """
+    if after is not None:
+        created_at, row_id = after
+        stmt = stmt.where(
+            or_(
+                created_col < created_at,
+                and_(created_col == created_at, id_col < row_id),
+            )
+        )
+    return stmt.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def build_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and compute the cursor of the next page."""
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
+
+
+def get_cursor(
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned in the X-Next-Cursor header")
+) -> Optional[CursorKey]:
+    """FastAPI dependency decoding the `cursor` query parameter."""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def get_rank_cursor(
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned in the X-Next-Cursor header")
+) -> Optional[RankCursorKey]:
+    """FastAPI dependency decoding the `cursor` query parameter of a leaderboard."""
+    if cursor is None:
+        return None
+    try:
+        return decode_rank_cursor(cursor)
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next page cursor to the client, if any."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,113 @@
+"""
+Column projections from ORM models straight into response schemas
+"""
+
+import uuid
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _python_type(expression: Any) -> Optional[type]:
+    try:
+        return expression.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def _as_datetime(value: date) -> datetime:
+    return datetime.combine(value, time.min)
+
+
+def _converter(annotation: Any, python_type: Optional[type]) -> Optional[Callable[[Any], Any]]:
+    """
+    Conversion from the column's Python type to the field's type, if any.
+    Only the lossless coercions Pydantic would otherwise apply are handled.
+    """
+    target = _unwrap_optional(annotation)
+    if python_type is None or not isinstance(target, type) or issubclass(python_type, target):
+        return None
+    if target is datetime and python_type is date:
+        return _as_datetime
+    if issubclass(target, Enum) or target in (str, int, float, uuid.UUID):
+        return target
+    return None
+
+
+class Projection(Generic[SchemaT]):
+    """
+    Maps a response schema onto the columns of an ORM model.
+    
+    Every schema field named like a column of `model` is selected from it;
+    keyword arguments add or override fields with other column expressions
+    (e.g. a correlated count). Rows come back as tuples and are turned into
+    schema instances with `model_construct`, so the database values are
+    trusted and never validated: return the result in a `FastJSONResponse`
+    so FastAPI does not validate it against `response_model` either.
+    Fields that are not selected keep their schema default.
+    """
+    
+    def __init__(self, schema: Type[SchemaT], model: type, **columns: Any):
+        self.schema = schema
+        mapper_columns = model.__mapper__.column_attrs
+        
+        self.columns: Dict[str, Any] = {
+            name: getattr(model, name)
+            for name in schema.model_fields
+            if name in mapper_columns
+        }
+        self.columns.update(columns)
+        
+        self._fields_set = frozenset(self.columns)
+        self._converters = {
+            name: converter
+            for name, expression in self.columns.items()
+            if (converter := _converter(schema.model_fields[name].annotation, _python_type(expression)))
+        }
+        self._attributes = {
+            name: expression.key
+            for name, expression in self.columns.items()
+            if isinstance(expression, InstrumentedAttribute)
+        }
+    
+    def select(self) -> Select:
+        """SELECT of the projected columns, labelled with the field names."""
+        return select(*(expression.label(name) for name, expression in self.columns.items()))
+    
+    def _construct(self, values: Dict[str, Any]) -> SchemaT:
+        for name, convert in self._converters.items():
+            value = values.get(name)
+            if value is not None:
+                values[name] = convert(value)
+        return self.schema.model_construct(_fields_set=self._fields_set, **values)
+    
+    def from_row(self, row: Any) -> SchemaT:
+        """Build a response from a row of `select()`."""
+        return self._construct(row._asdict())
+    
+    def from_rows(self, rows: Iterable[Any]) -> List[SchemaT]:
+        """Build responses from rows of `select()`."""
+        return [self._construct(row._asdict()) for row in rows]
+    
+    def from_object(self, obj: Any, **values: Any) -> SchemaT:
+        """
+        Build a response from an already loaded instance, e.g. right after
+        it was created. Computed fields are passed as keyword arguments.
+        """
+        for name, attribute in self._attributes.items():
+            values.setdefault(name, getattr(obj, attribute))
+        return self._construct(values)
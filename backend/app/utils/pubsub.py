@@ -0,0 +1,90 @@
+"""
+Publish/subscribe broker for real-time fan-out
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+
+class Subscription:
+    """
+    A subscriber's bounded inbox on one channel.
+    
+    When a slow subscriber's inbox is full the oldest message is dropped,
+    so publishers never wait on, or grow memory for, a stalled client.
+    """
+    
+    def __init__(self, broker: "Broker", channel: str, maxsize: int):
+        self.broker = broker
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+    
+    def deliver(self, message: Any) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+    
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """Next message; raises asyncio.TimeoutError after `timeout` seconds."""
+        if timeout is None:
+            return await self.queue.get()
+        return await asyncio.wait_for(self.queue.get(), timeout)
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> Any:
+        return await self.queue.get()
+    
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+    
+    def __enter__(self) -> "Subscription":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Broker:
+    """
+    In-process stand-in for a shared pub/sub backend (e.g. Redis PUBLISH /
+    SUBSCRIBE). Real-time features only talk to this interface, so running
+    several API workers means swapping in a backend that relays
+    `publish` to every process; within one process delivery is immediate
+    and ordered per channel. Messages are passed as-is: publish payloads
+    serialized once rather than objects each subscriber re-encodes.
+    """
+    
+    def __init__(self):
+        self._channels: Dict[str, Set[Subscription]] = defaultdict(set)
+    
+    def subscribe(self, channel: str, maxsize: int = 100) -> Subscription:
+        subscription = Subscription(self, channel, maxsize)
+        self._channels[channel].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._channels.get(subscription.channel)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._channels[subscription.channel]
+    
+    def subscriber_count(self, channel: str) -> int:
+        return len(self._channels.get(channel, ()))
+    
+    async def publish(self, channel: str, message: Any) -> int:
+        """Deliver a message to the channel's subscribers; returns how many."""
+        subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+        return len(subscribers)
+
+
+# Process-wide broker
+broker = Broker()
@@ -0,0 +1,105 @@
+"""
+Compiled quiz answer keys for fast auto-grading
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Byte values that never match: an answer that is blank or malformed, and
+# a question without a correct option
+NO_ANSWER = 255
+NO_KEY = 254
+
+
+def _encode(value: Any, missing: int) -> int:
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < NO_KEY:
+        return value
+    return missing
+
+
+class AnswerKey:
+    """
+    A quiz's correct option indices packed one byte per question.
+    
+    Answers are packed the same way and compared all at once: XOR-ing the
+    two as big integers leaves a zero byte exactly where an answer is
+    correct, so grading is a couple of C-level operations regardless of
+    the number of questions.
+    """
+    
+    __slots__ = ("correct", "size", "_as_int")
+    
+    def __init__(self, correct: bytes):
+        self.correct = correct
+        self.size = len(correct)
+        self._as_int = int.from_bytes(correct, "big")
+    
+    @classmethod
+    def compile(cls, content: Optional[Dict[str, Any]]) -> "AnswerKey":
+        """Compile a challenge's `{"questions": [{"correct": i}]}` content."""
+        questions = content.get("questions") if isinstance(content, dict) else None
+        if not isinstance(questions, list):
+            questions = []
+        # A malformed question keeps its place but can't be answered correctly
+        return cls(bytes(
+            _encode(question.get("correct") if isinstance(question, dict) else None, NO_KEY)
+            for question in questions
+        ))
+    
+    def encode_answers(self, answers: Optional[Sequence[Any]]) -> bytes:
+        """Pack answers to the key's length, blanks and extras dropped."""
+        answers = list(answers)[:self.size] if isinstance(answers, (list, tuple)) else []
+        packed = bytes(_encode(answer, NO_ANSWER) for answer in answers)
+        return packed + bytes([NO_ANSWER]) * (self.size - len(packed))
+    
+    def count_correct(self, answers: Optional[Sequence[Any]]) -> int:
+        """Number of correct answers."""
+        if not self.size:
+            return 0
+        diff = self._as_int ^ int.from_bytes(self.encode_answers(answers), "big")
+        return diff.to_bytes(self.size, "big").count(0)
+    
+    def grade_many(self, answer_sets: Iterable[Optional[Sequence[Any]]]) -> List[int]:
+        """Correct-answer counts for many answer sets, e.g. a family round."""
+        return [self.count_correct(answers) for answers in answer_sets]
+    
+    def is_correct(self, question: int, answer: Any) -> bool:
+        """Whether a single answer to one question is correct."""
+        return 0 <= question < self.size and self.correct[question] == _encode(answer, NO_ANSWER)
+
+
+class AnswerKeyCache:
+    """
+    LRU cache of compiled answer keys, keyed by challenge id and
+    `updated_at`: an edited challenge no longer matches its cached key
+    even in another worker process, and the editing process also
+    invalidates it explicitly.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._keys: "OrderedDict[Any, Tuple[datetime, AnswerKey]]" = OrderedDict()
+    
+    def get(self, challenge_id: Any, updated_at: datetime) -> Optional[AnswerKey]:
+        entry = self._keys.get(challenge_id)
+        if entry is None or entry[0] != updated_at:
+            return None
+        self._keys.move_to_end(challenge_id)
+        return entry[1]
+    
+    def put(self, challenge_id: Any, updated_at: datetime, key: AnswerKey) -> None:
+        self._keys[challenge_id] = (updated_at, key)
+        self._keys.move_to_end(challenge_id)
+        while len(self._keys) > self.maxsize:
+            self._keys.popitem(last=False)
+    
+    def invalidate(self, challenge_id: Any) -> None:
+        self._keys.pop(challenge_id, None)
+    
+    def clear(self) -> None:
+        self._keys.clear()
+
+
+# Process-wide cache shared by the submission pipeline and quiz rounds
+answer_keys = AnswerKeyCache()
@@ -0,0 +1,128 @@
+"""
+Compact leaderboard standings for daily snapshots and rank deltas
+"""
+
+import sys
+import uuid
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Points are stored as little-endian signed 32-bit integers
+_POINTS_TYPECODE = "i"
+
+
+def _pack_points(points: Iterable[int]) -> bytes:
+    packed = array(_POINTS_TYPECODE, points)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_points(data: bytes) -> array:
+    points = array(_POINTS_TYPECODE)
+    points.frombytes(data)
+    if sys.byteorder == "big":
+        points.byteswap()
+    return points
+
+
+class RankVector:
+    """
+    A season's standings at one moment, packed as two parallel arrays:
+    member ids as concatenated 16-byte UUIDs and their point totals, in
+    leaderboard order. A family season fits in a few hundred bytes.
+    
+    Ranks are derived from the points like the live leaderboard's (ties
+    share a rank), so comparing two days is a pass over both arrays
+    instead of ranking the ledger twice.
+    """
+    
+    __slots__ = ("user_ids", "points", "_index")
+    
+    def __init__(self, user_ids: bytes, points: bytes):
+        self.user_ids = user_ids
+        self.points = points
+        self._index: Optional[Dict[uuid.UUID, Tuple[int, int]]] = None
+    
+    @classmethod
+    def pack(cls, standings: Iterable[Tuple[Any, int]]) -> "RankVector":
+        """Pack (user_id, total_points) pairs, best first."""
+        standings = list(standings)
+        return cls(
+            b"".join(uuid.UUID(str(user_id)).bytes for user_id, _ in standings),
+            _pack_points(points for _, points in standings),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.user_ids) // 16
+    
+    def members(self) -> List[uuid.UUID]:
+        return [uuid.UUID(bytes=self.user_ids[i:i + 16]) for i in range(0, len(self.user_ids), 16)]
+    
+    def ranks(self) -> List[int]:
+        """Competition ranks (1, 2, 2, 4...) in stored order."""
+        ranks: List[int] = []
+        points = _unpack_points(self.points)
+        for position, total in enumerate(points):
+            ranks.append(ranks[-1] if position and total == points[position - 1] else position + 1)
+        return ranks
+    
+    def index(self) -> Dict[uuid.UUID, Tuple[int, int]]:
+        """(rank, points) by member, built once per vector."""
+        if self._index is None:
+            self._index = dict(zip(self.members(), zip(self.ranks(), _unpack_points(self.points))))
+        return self._index
+    
+    def rank_changes(self, previous: "RankVector") -> Dict[uuid.UUID, Optional[int]]:
+        """
+        Places gained since `previous` (negative when dropping), None for
+        members absent from it.
+        """
+        before = previous.index()
+        return {
+            user_id: before[user_id][0] - rank if user_id in before else None
+            for user_id, (rank, _) in self.index().items()
+        }
+    
+    def points_since(self, previous: "RankVector") -> List[Tuple[uuid.UUID, int]]:
+        """
+        Points each member earned since `previous`, best first. Members
+        absent from it count from 0; pass an empty vector for the start of
+        the season.
+        """
+        before = previous.index()
+        earned = [
+            (user_id, points - before.get(user_id, (0, 0))[1])
+            for user_id, (_, points) in self.index().items()
+        ]
+        # Stable: ties keep the overall standings order
+        return sorted(earned, key=lambda entry: -entry[1])
+
+
+class RankVectorCache:
+    """
+    LRU cache of snapshots keyed by (season id, day). Snapshots never
+    change once taken, so entries need no invalidation.
+    """
+    
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._vectors: "OrderedDict[Tuple[str, Any], RankVector]" = OrderedDict()
+    
+    def get(self, season_id: Any, day: Any) -> Optional[RankVector]:
+        key = (str(season_id), day)
+        vector = self._vectors.get(key)
+        if vector is not None:
+            self._vectors.move_to_end(key)
+        return vector
+    
+    def put(self, season_id: Any, day: Any, vector: RankVector) -> None:
+        key = (str(season_id), day)
+        self._vectors[key] = vector
+        self._vectors.move_to_end(key)
+        while len(self._vectors) > self.maxsize:
+            self._vectors.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._vectors.clear()
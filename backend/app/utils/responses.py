@@ -0,0 +1,57 @@
+"""
+Fast JSON response rendering based on orjson
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, BaseModel):
+        # Python mode keeps datetimes and UUIDs for orjson's native encoders
+        return obj.model_dump(by_alias=True)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes."""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def sse_message(event: str, data: Any) -> bytes:
+    """Encode a Server-Sent Events message with a JSON payload."""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+# Comment line keeping idle event streams open through proxies
+SSE_KEEPALIVE = b": keep-alive\n\n"
+
+# Event streams must reach the client unbuffered and uncached
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    
+    Used as the application's default response class. Datetimes, dates,
+    UUIDs and enums are encoded natively, and Pydantic models are dumped
+    directly, so an endpoint holding already-validated response models can
+    return `FastJSONResponse(models)` to skip FastAPI's second validation
+    and `jsonable_encoder` pass. The route's `response_model` still
+    documents the schema.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
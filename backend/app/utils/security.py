@@ -46,6 +46,33 @@ def create_access_token(data: dict, expires_delta: Optional[datetime] = None) ->
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> Optional[str]:
+    """Return the user id of a valid access token, or None."""
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    except JWTError as e:
+        logger.error("JWT decode error", error=str(e))
+        return None
+    
+    if payload.get("type") != "access":
+        return None
+    return payload.get("sub")
+
+
+async def get_websocket_user(token: str, db: AsyncSession) -> Optional[User]:
+    """
+    Authenticate a WebSocket or Server-Sent Events connection. Browsers
+    cannot set headers on WebSocket or EventSource requests, so the access
+    token comes as a query parameter.
+    """
+    user_id = decode_access_token(token)
+    if user_id is None:
+        return None
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    return user if user and user.is_active else None
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -60,21 +87,8 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        # Decode JWT token
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.secret_key,
-            algorithms=[settings.algorithm]
-        )
-        user_id: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        
-        if user_id is None or token_type != "access":
-            raise credentials_exception
-            
-    except JWTError as e:
-        logger.error("JWT decode error", error=str(e))
+    user_id = decode_access_token(credentials.credentials)
+    if user_id is None:
         raise credentials_exception
     
     # Get user from database
@@ -0,0 +1,58 @@
+"""
+Single-flight: concurrent identical calls share one in-flight execution
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls by key.
+    
+    The first caller for a key starts `fn()` as a task; callers arriving
+    while it runs wait on that same task and get its result, or its
+    exception. The task is shielded from any single waiter going away,
+    and cancelled only once every waiter has been cancelled, e.g. when
+    all their clients disconnected. Results are not kept once the call
+    completes: caching them is up to the caller.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight[T]] = {}
+        self.shared = 0  # Calls that joined an execution already in flight
+    
+    def __len__(self) -> int:
+        return len(self._flights)
+    
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn()` for `key`, or wait for the run already in flight."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.shared += 1
+        
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every waiter gave up: later callers start afresh
+                self._forget(key, flight)
+                flight.task.cancel()
+    
+    def _forget(self, key: Hashable, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
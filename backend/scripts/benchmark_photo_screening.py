@@ -0,0 +1,78 @@
+"""
+Benchmark photo pre-screening on the CPU.
+
+Runs the ONNX classifier the way the API does, through PhotoScreener's
+thread pool, on synthetic photos written to a temporary upload directory,
+and reports per-batch latency and throughput for a few batch sizes.
+
+Usage (from backend/): python scripts/benchmark_photo_screening.py MODEL.onnx [--batches N] [--threads N]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PIL import Image  # noqa: E402
+
+from app.services.photo_screening import PhotoScreener  # noqa: E402
+
+
+def make_photos(upload_dir: Path, count: int) -> List[str]:
+    rng = random.Random(42)
+    urls = []
+    for i in range(count):
+        image = Image.new("RGB", (1280, 960), tuple(rng.randrange(256) for _ in range(3)))
+        image.save(upload_dir / f"photo{i}.jpg", quality=85)
+        urls.append(f"/uploads/photo{i}.jpg")
+    return urls
+
+
+async def measure(screener: PhotoScreener, urls: List[str], batch_size: int, batches: int) -> List[float]:
+    latencies = []
+    for i in range(batches):
+        start = time.perf_counter()
+        await screener.screen([urls[(i * batch_size + j) % len(urls)] for j in range(batch_size)])
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main(model_path: str, batches: int, threads: int) -> None:
+    with tempfile.TemporaryDirectory() as upload_dir:
+        urls = make_photos(Path(upload_dir), 32)
+        screener = PhotoScreener(model_path=model_path, threads=threads, upload_dir=Path(upload_dir))
+
+        # Loads the model once, as the first request would
+        start = time.perf_counter()
+        probabilities = await screener.screen(urls[:1])
+        if probabilities[0] is None:
+            sys.exit(f"Could not screen with {model_path}")
+        print(f"model load + first photo: {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+        print(f"{'batch':>6} {'p50 ms':>10} {'p95 ms':>10} {'photos/s':>10}")
+        for batch_size in (1, 4, 8, 16):
+            latencies = sorted(await measure(screener, urls, batch_size, batches))
+            p50 = statistics.median(latencies) * 1e3
+            p95 = latencies[int(len(latencies) * 0.95) - 1] * 1e3
+            print(f"{batch_size:>6} {p50:>10.1f} {p95:>10.1f} {batch_size * len(latencies) / sum(latencies):>10.1f}")
+        screener.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark photo pre-screening on the CPU")
+    parser.add_argument("model", help="ONNX classifier")
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=2)
+    args = parser.parse_args()
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        sys.exit("onnxruntime is not installed: pip install numpy onnxruntime")
+    asyncio.run(main(args.model, args.batches, args.threads))
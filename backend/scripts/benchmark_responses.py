@@ -0,0 +1,117 @@
+"""
+Benchmark JSON response rendering per endpoint payload.
+
+Compares FastAPI's default path (validate against response_model, serialize,
+render with stdlib json) with returning an orjson FastJSONResponse directly.
+
+Usage (from backend/): python scripts/benchmark_responses.py [--iterations N]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.schemas.scoring import LeaderboardEntry, LeaderboardResponse  # noqa: E402
+from app.schemas.season import SeasonResponse  # noqa: E402
+from app.utils.responses import FastJSONResponse  # noqa: E402
+
+
+def make_seasons(count: int) -> List[SeasonResponse]:
+    now = datetime(2025, 7, 4, 12, 0)
+    return [
+        SeasonResponse(
+            id=str(uuid.uuid4()),
+            title=f"Vacances au lac {i}",
+            description="Deux semaines de défis en famille",
+            location="Lac d'Annecy",
+            latitude=45.86,
+            longitude=6.17,
+            start_date=now,
+            end_date=now + timedelta(days=14),
+            is_active=True,
+            created_by=str(uuid.uuid4()),
+            invitation_code="ABC123",
+            member_count=4,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def make_leaderboard(count: int) -> LeaderboardResponse:
+    return LeaderboardResponse(
+        season_id=str(uuid.uuid4()),
+        season_name="Été 2025",
+        total_participants=count,
+        generated_at=datetime(2025, 7, 4, 12, 0),
+        entries=[
+            LeaderboardEntry(
+                rank=i + 1,
+                user_id=str(uuid.uuid4()),
+                total_points=1000 - i,
+                challenges_completed=20,
+                badges_earned=3,
+                user_email=f"user{i}@example.com",
+                user_first_name="Camille",
+                user_last_name="Martin",
+                last_activity=datetime(2025, 7, 4, 11, 0),
+            )
+            for i in range(count)
+        ],
+    )
+
+
+async def default_path(field, content) -> bytes:
+    payload = await serialize_response(field=field, response_content=content)
+    return JSONResponse(payload).body
+
+
+async def fast_path(field, content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+async def measure(render, field, content, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await render(field, content)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations: int) -> None:
+    endpoints = [
+        ("GET /seasons (limit=50)", List[SeasonResponse], make_seasons(50)),
+        ("GET /seasons (limit=100)", List[SeasonResponse], make_seasons(100)),
+        ("GET /seasons/{id}", SeasonResponse, make_seasons(1)[0]),
+        ("GET /scoring/leaderboard (100)", LeaderboardResponse, make_leaderboard(100)),
+    ]
+
+    print(f"{'endpoint':<32} {'default µs':>12} {'orjson µs':>12} {'speedup':>8}")
+    for name, response_model, content in endpoints:
+        field = create_response_field(name="Response_" + uuid.uuid4().hex, type_=response_model)
+
+        # Both paths must produce the same document
+        expected = json.loads(await default_path(field, content))
+        assert json.loads(await fast_path(field, content)) == expected, name
+
+        default_us = await measure(default_path, field, content, iterations)
+        fast_us = await measure(fast_path, field, content, iterations)
+        print(f"{name:<32} {default_us:>12.1f} {fast_us:>12.1f} {default_us / fast_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON response rendering")
+    parser.add_argument("--iterations", type=int, default=500)
+    asyncio.run(main(parser.parse_args().iterations))
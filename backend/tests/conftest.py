@@ -5,6 +5,7 @@ Test configuration and fixtures for Lake Holidays Challenge backend
 import asyncio
 import os
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -46,7 +47,7 @@ def event_loop():
     yield loop
 
 
-@pytest.fixture(scope="function")
+@pytest_asyncio.fixture(scope="function")
 async def db_session():
     """Create a test database session."""
     async with test_engine.begin() as conn:
@@ -0,0 +1,227 @@
+"""
+Local fake of an OpenAI-compatible chat completions server
+Usage: python -m tests.fake_ai_provider [port]
+then set AI_BASE_URL=http://localhost:8081 and OPENAI_API_KEY to anything.
+"""
+
+import asyncio
+import json
+import sys
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class FakeAIProvider:
+    """
+    Answers chat completions with a canned reply, after an optional
+    `delay`. Failures can be queued to exercise retries: each entry in
+    `failures` is the status code of the next response, e.g. 429.
+    Streamed completions send the reply `chunk_size` characters at a
+    time, `chunk_delay` apart. Records the requests received and the
+    peak number in flight.
+    """
+    
+    def __init__(
+        self,
+        reply: Optional[str] = None,
+        delay: float = 0.0,
+        failures: Optional[List[int]] = None,
+        chunk_size: int = 8,
+        chunk_delay: float = 0.0,
+    ):
+        self.reply = reply
+        self.delay = delay
+        self.failures = list(failures or [])
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.requests: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.app = FastAPI(title="Fake AI provider")
+        self.app.post("/chat/completions")(self._complete)
+        self.app.post("/openai/deployments/{deployment}/chat/completions")(self._complete)
+        self.app.post("/embeddings")(self._embed)
+        self.app.post("/openai/deployments/{deployment}/embeddings")(self._embed)
+    
+    def _content(self, body: Dict[str, Any]) -> str:
+        if self.reply is not None:
+            return self.reply
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            batch = _batch(body)
+            if batch is not None:
+                return json.dumps({"results": [{"score": 80, "feedback": "Bien"} for _ in batch]})
+            return json.dumps({"title": "Défi du lac", "description": "Un défi généré", "score": 80, "feedback": "Bien"})
+        return "Réponse de test"
+    
+    async def _complete(self, request: Request) -> JSONResponse:
+        body = await request.json()
+        self.requests.append(body)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.failures:
+                status_code = self.failures.pop(0)
+                return JSONResponse(
+                    {"error": {"message": "Fake failure", "code": status_code}},
+                    status_code=status_code,
+                    headers={"Retry-After": "0"} if status_code == 429 else None,
+                )
+            content = self._content(body)
+            if body.get("stream"):
+                return StreamingResponse(self._chunks(body, content), media_type="text/event-stream")
+            prompt = "".join(message.get("content", "") for message in body.get("messages", []))
+            return JSONResponse({
+                "id": f"fake-{len(self.requests)}",
+                "object": "chat.completion",
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                # Roughly four characters per token
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4},
+            })
+        finally:
+            self.in_flight -= 1
+    
+    async def _chunks(self, body: Dict[str, Any], content: str) -> AsyncIterator[bytes]:
+        for start in range(0, len(content), self.chunk_size):
+            if start and self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            chunk = {
+                "id": f"fake-{len(self.requests)}",
+                "object": "chat.completion.chunk",
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "delta": {"content": content[start:start + self.chunk_size]}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+    
+    async def _embed(self, request: Request) -> JSONResponse:
+        body = await request.json()
+        self.requests.append(body)
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        tokens = sum(len(text) // 4 for text in texts)
+        return JSONResponse({
+            "object": "list",
+            "model": body.get("model", "fake"),
+            "data": [{"object": "embedding", "index": i, "embedding": embedding(text)} for i, text in enumerate(texts)],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+
+def _batch(body: Dict[str, Any]) -> Optional[List[Any]]:
+    """The items of a batched request: a last message holding {"submissions": [...]}."""
+    try:
+        content = json.loads(body["messages"][-1]["content"])
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+    return content.get("submissions") if isinstance(content, dict) else None
+
+
+class StreamingASGITransport(httpx.AsyncBaseTransport):
+    """
+    Calls an ASGI app in-process like `httpx.ASGITransport`, but hands
+    the response over as soon as its headers are sent and its body as it
+    is written, so tests can observe streaming, e.g. time to first byte.
+    Closing the response early tells the app the client disconnected.
+    """
+    
+    def __init__(self, app: Any):
+        self.app = app
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "headers": [(key.lower(), value) for key, value in request.headers.raw],
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "server": (request.url.host, request.url.port),
+            "client": ("127.0.0.1", 123),
+            "root_path": "",
+        }
+        started: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        chunks: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+        disconnected = asyncio.Event()
+        request_sent = False
+        
+        async def receive() -> Dict[str, Any]:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+        
+        async def send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                started.set_result(message)
+            elif message["type"] == "http.response.body":
+                await chunks.put(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await chunks.put(None)
+        
+        async def run() -> None:
+            try:
+                await self.app(scope, receive, send)
+            except Exception as e:
+                if not started.done():
+                    started.set_exception(e)
+            finally:
+                if not started.done():
+                    started.set_exception(RuntimeError("The app sent no response"))
+                await chunks.put(None)
+        
+        task = asyncio.create_task(run())
+        start = await started
+        return httpx.Response(
+            start["status"], headers=start.get("headers", []), stream=_QueueStream(chunks, task, disconnected)
+        )
+
+
+class _QueueStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: "asyncio.Queue[Optional[bytes]]", task: asyncio.Task, disconnected: asyncio.Event):
+        self.chunks = chunks
+        self.task = task
+        self.disconnected = disconnected
+    
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while (chunk := await self.chunks.get()) is not None:
+            yield chunk
+    
+    async def aclose(self) -> None:
+        self.disconnected.set()
+        if not self.task.done():
+            self.task.cancel()
+
+
+def embedding(text: str, dimensions: int = 64) -> List[float]:
+    """
+    Deterministic stand-in for a text embedding: character trigram counts
+    hashed into a fixed-size vector, so texts sharing most of their
+    wording come out close.
+    """
+    vector = [0.0] * dimensions
+    padded = f"  {text.lower()} "
+    for i in range(len(padded) - 2):
+        vector[zlib.crc32(padded[i:i + 3].encode()) % dimensions] += 1.0
+    return vector
+
+
+# Module-level app for `uvicorn tests.fake_ai_provider:app`
+app = FakeAIProvider().app
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    uvicorn.run(app, port=int(sys.argv[1]) if len(sys.argv) > 1 else 8081)
@@ -0,0 +1,111 @@
+"""
+Tests for AI usage accounting and daily quotas
+"""
+
+import json
+import uuid
+from datetime import datetime
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+
+from app.models.ai import AIUsage
+from app.services.ai_budget import SEASON, USER, AIBudget, Spender
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_client import AIClient, AIProvider
+from app.services.ai_service import AIService
+from tests.conftest import TestSessionLocal
+from tests.fake_ai_provider import FakeAIProvider
+
+TODAY = datetime.utcnow().date()
+
+
+def _budget(**quotas) -> AIBudget:
+    quotas.setdefault("season_daily_tokens", 0)
+    quotas.setdefault("user_daily_tokens", 0)
+    return AIBudget(session_factory=TestSessionLocal, prompt_token_cost=1.0, completion_token_cost=2.0, **quotas)
+
+
+def _service(fake: FakeAIProvider, budget: AIBudget) -> AIService:
+    client = AIClient(AIProvider("test-key", "gpt-test", "http://fake-ai"), transport=httpx.ASGITransport(app=fake.app))
+    return AIService(client, AIResponseCache(path=None), budget=budget)
+
+
+class TestAIBudget:
+    """Test cases for counting usage and enforcing quotas."""
+    
+    @pytest.mark.asyncio
+    async def test_usage_is_flushed_and_shared_between_processes(self, db_session):
+        season, user = uuid.uuid4(), uuid.uuid4()
+        spender = Spender(season_id=season, user_id=user)
+        first, second = _budget(user_daily_tokens=1000), _budget(user_daily_tokens=1000)
+        
+        assert first.record(spender, "analysis", 300, 100) == pytest.approx(500 / 1e6)
+        first.record(Spender(user_id=user), "analysis", 500, 100)
+        assert first.used((USER, user, TODAY)) == 1000
+        assert not await first.allows(spender)
+        
+        # Until flushed, other processes don't know about it
+        assert await second.allows(spender)
+        await first.flush()
+        await first.flush()
+        async with TestSessionLocal() as db:
+            rows = (await db.execute(select(AIUsage.scope, AIUsage.tokens, AIUsage.cost))).all()
+        assert sorted(rows) == [(SEASON, 400, pytest.approx(500 / 1e6)), (USER, 1000, pytest.approx(1200 / 1e6))]
+        
+        third = _budget(user_daily_tokens=1000)
+        denials = REGISTRY.get_sample_value("ai_budget_denials_total", {"scope": USER}) or 0
+        assert not await third.allows(spender)
+        assert REGISTRY.get_sample_value("ai_budget_denials_total", {"scope": USER}) == denials + 1
+        # Other users and unlimited scopes are unaffected
+        assert await third.allows(Spender(season_id=season, user_id=uuid.uuid4()))
+        
+        # Counts flushed by several processes add up
+        second.record(spender, "analysis", 50, 0)
+        await second.flush()
+        assert second.used((USER, user, TODAY)) == 1050
+    
+    @pytest.mark.asyncio
+    async def test_spender_over_quota_gets_cached_or_template_content(self, db_session):
+        fake = FakeAIProvider(reply=json.dumps({"title": "Le héron", "description": "Photographie un héron"}))
+        budget = _budget(season_daily_tokens=1)
+        service = _service(fake, budget)
+        season = Spender(season_id=uuid.uuid4())
+        
+        generated = await service.generate_challenge_content("Oiseaux", 2, "Lac d'Annecy", spender=season)
+        assert generated["title"] == "Le héron"
+        assert budget.used((SEASON, season.season_id, TODAY)) > 1
+        
+        # Still served from the cache, but nothing new is generated
+        assert await service.generate_challenge_content("oiseaux", 2, "Lac d'Annecy", spender=season) == generated
+        template = await service.generate_challenge_content("Kayak", 3, "Lac d'Annecy", spender=season)
+        assert template["title"] == "Crée un challenge à propos de Kayak"
+        assert len(fake.requests) == 1
+        
+        # Others keep their own budget
+        other = await service.generate_challenge_content("Kayak", 3, "Lac d'Annecy", spender=Spender(season_id=uuid.uuid4()))
+        assert other["title"] == "Le héron"
+        assert len(fake.requests) == 2
+        await service.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_photos_over_quota_are_left_out_of_the_batch(self, db_session):
+        fake = FakeAIProvider()
+        budget = _budget(user_daily_tokens=100)
+        service = _service(fake, budget)
+        thrifty, chatty = Spender(user_id=uuid.uuid4()), Spender(user_id=uuid.uuid4())
+        budget.record(chatty, "photos", 100, 0)
+        
+        analyses = await service.analyze_submissions(
+            ["https://photos.example.com/1.jpg", "https://photos.example.com/2.jpg"], [thrifty, chatty]
+        )
+        assert analyses[0]["score"] == 80
+        assert analyses[1] is None
+        assert json.loads(fake.requests[0]["messages"][-1]["content"]) == {
+            "submissions": ["https://photos.example.com/1.jpg"]
+        }
+        assert budget.used((USER, thrifty.user_id, TODAY)) > 0
+        assert budget.used((USER, chatty.user_id, TODAY)) == 100
+        await service.client.aclose()
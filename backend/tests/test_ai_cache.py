@@ -0,0 +1,107 @@
+"""
+Tests for the generated challenge content cache
+"""
+
+import httpx
+import pytest
+
+from app.services.ai_cache import AIResponseCache, PromptKey, normalize
+from app.services.ai_client import AIClient, AIProvider
+from app.services.ai_service import AIService
+from tests.fake_ai_provider import FakeAIProvider, embedding
+
+CONTENT = {"title": "Coucher de soleil", "description": "Photographie le coucher de soleil"}
+
+
+async def _embed(texts):
+    return [embedding(text) for text in texts]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestPromptKey:
+    """Test cases for key normalization."""
+    
+    def test_normalizes_case_accents_and_punctuation(self):
+        assert normalize("  Été   au LAC ! ") == "ete au lac"
+        first = PromptKey.build("Coucher de soleil !", 2, "Lac d'Annecy")
+        second = PromptKey.build("coucher de  soleil", 2, "lac d annecy", "FR")
+        assert first.exact == second.exact
+        assert PromptKey.build("coucher de soleil", 3, "Lac d'Annecy").exact != first.exact
+
+
+class TestAIResponseCache:
+    """Test cases for the exact and similarity tiers."""
+    
+    @pytest.mark.asyncio
+    async def test_exact_hits_and_ttl(self):
+        clock = _Clock()
+        cache = AIResponseCache(ttl=60, path=None, clock=clock)
+        key = PromptKey.build("Coucher de soleil", 2, "Annecy")
+        
+        assert await cache.get(key) is None
+        await cache.put(key, CONTENT)
+        assert await cache.get(PromptKey.build("coucher de soleil!", 2, "annecy")) == CONTENT
+        
+        clock.now += 61
+        assert await cache.get(key) is None
+        assert cache.lookups == {"exact": 1, "similar": 0, "miss": 2}
+        assert cache.hit_rate == pytest.approx(1 / 3)
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        cache = AIResponseCache(maxsize=2, path=None)
+        keys = [PromptKey.build(theme, 1) for theme in ("kayak", "pêche", "randonnée")]
+        for key in keys:
+            await cache.put(key, CONTENT)
+        assert await cache.get(keys[0]) is None
+        assert await cache.get(keys[2]) == CONTENT
+    
+    @pytest.mark.asyncio
+    async def test_similar_themes_within_the_same_bucket(self):
+        cache = AIResponseCache(path=None, similarity=0.9)
+        key = PromptKey.build("coucher de soleil sur le lac", 2, "Annecy")
+        assert await cache.get(key, _embed) is None
+        await cache.put(key, CONTENT)
+        
+        assert await cache.get(PromptKey.build("coucher du soleil sur le lac", 2, "Annecy"), _embed) == CONTENT
+        assert await cache.get(PromptKey.build("coucher du soleil sur le lac", 4, "Annecy"), _embed) is None
+        assert await cache.get(PromptKey.build("course de kayak", 2, "Annecy"), _embed) is None
+        assert cache.lookups["similar"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_survives_restart(self, tmp_path):
+        path = tmp_path / "ai_cache.sqlite3"
+        key = PromptKey.build("Coucher de soleil", 2, "Annecy")
+        await AIResponseCache(path=str(path), similarity=0.9).put(key, CONTENT)
+        
+        restarted = AIResponseCache(path=str(path))
+        assert await restarted.get(key) == CONTENT
+        
+        expired = AIResponseCache(path=str(path), clock=lambda: 1e12)
+        assert await expired.get(key) is None
+
+
+class TestCachedGeneration:
+    """Test cases for generation through the cache."""
+    
+    @pytest.mark.asyncio
+    async def test_same_theme_generated_once(self):
+        fake = FakeAIProvider()
+        client = AIClient(AIProvider("test-key", "gpt-test", "http://fake-ai"), transport=httpx.ASGITransport(app=fake.app))
+        service = AIService(client, AIResponseCache(path=None))
+        
+        first = await service.generate_challenge_content("Nature", 2, "Lac d'Annecy")
+        second = await service.generate_challenge_content("nature ", 2, "lac d'Annecy")
+        assert first == second
+        assert len(fake.requests) == 1
+        
+        second["title"] = "Modifié"
+        assert (await service.generate_challenge_content("Nature", 2, "Lac d'Annecy"))["title"] == first["title"]
+        await client.aclose()
@@ -0,0 +1,140 @@
+"""
+Tests for the pooled AI provider client against the local fake provider
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_client import AIClient, AIProvider, AIProviderError, AzureOpenAIProvider, backoff_delay
+from app.services.ai_service import AIService
+from tests.fake_ai_provider import FakeAIProvider
+
+MESSAGES = [{"role": "user", "content": "Un défi pour demain ?"}]
+
+
+def _client(fake: FakeAIProvider, **options) -> AIClient:
+    options.setdefault("backoff_base", 0.01)
+    return AIClient(
+        AIProvider("test-key", "gpt-test", "http://fake-ai"),
+        transport=httpx.ASGITransport(app=fake.app),
+        **options,
+    )
+
+
+class TestProviders:
+    """Test cases for provider requests and backoff."""
+    
+    def test_azure_request(self):
+        provider = AzureOpenAIProvider("secret", "defis", "https://lac.openai.azure.com/", "2023-12-01-preview")
+        url, headers, body = provider.request("chat/completions", provider.model, {"messages": MESSAGES})
+        assert url == "https://lac.openai.azure.com/openai/deployments/defis/chat/completions?api-version=2023-12-01-preview"
+        assert headers == {"api-key": "secret"}
+        assert "model" not in body
+    
+    def test_backoff_is_jittered_and_capped(self):
+        delays = [backoff_delay(4, 0.5, 3.0) for _ in range(50)]
+        assert all(0 <= delay <= 3.0 for delay in delays)
+        assert len(set(delays)) > 1
+        assert backoff_delay(1, 0.5, 3.0, retry_after="2") == 2.0
+        assert backoff_delay(1, 0.5, 3.0, retry_after="60") == 3.0
+
+
+class TestAIClient:
+    """Test cases for retries, deadlines and concurrency limits."""
+    
+    @pytest.mark.asyncio
+    async def test_retries_throttling_and_server_errors(self):
+        fake = FakeAIProvider(reply="Bonjour", failures=[429, 503])
+        client = _client(fake)
+        
+        completion = await client.chat(MESSAGES)
+        assert completion.text == "Bonjour"
+        assert completion.model == "gpt-test"
+        assert len(fake.requests) == 3
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        fake = FakeAIProvider(failures=[400])
+        client = _client(fake)
+        
+        with pytest.raises(AIProviderError) as error:
+            await client.chat(MESSAGES)
+        assert error.value.status_code == 400
+        assert len(fake.requests) == 1
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        fake = FakeAIProvider(failures=[500] * 5)
+        client = _client(fake, max_retries=2)
+        
+        with pytest.raises(AIProviderError):
+            await client.chat(MESSAGES)
+        assert len(fake.requests) == 3
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_the_call(self):
+        client = _client(FakeAIProvider(delay=1.0))
+        
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(AIProviderError):
+            await client.chat(MESSAGES, timeout=0.1)
+        assert asyncio.get_running_loop().time() - started < 0.5
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_is_limited_per_provider(self):
+        fake = FakeAIProvider(delay=0.02)
+        client = _client(fake, max_concurrency=2)
+        
+        await asyncio.gather(*(client.chat(MESSAGES) for _ in range(6)))
+        assert len(fake.requests) == 6
+        assert fake.peak_in_flight == 2
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_malformed_responses_raise_provider_errors(self):
+        bodies = iter([b"<html>Bad gateway</html>", b'{"choices": []}', b'{"data": [{"index": 0}]}'])
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=next(bodies)))
+        client = AIClient(AIProvider("test-key", "gpt-test", "http://fake-ai"), transport=transport)
+        
+        for call in (client.chat(MESSAGES), client.chat(MESSAGES), client.embed(["héron"])):
+            with pytest.raises(AIProviderError):
+                await call
+        await client.aclose()
+
+
+class TestAIService:
+    """Test cases for AI features over the client."""
+    
+    @pytest.mark.asyncio
+    async def test_generates_and_analyzes_with_provider(self):
+        fake = FakeAIProvider()
+        service = AIService(_client(fake), AIResponseCache(path=None))
+        
+        content = await service.generate_challenge_content("Nature", 2)
+        assert content["title"] == "Défi du lac"
+        assert content["hints"] == []
+        assert fake.requests[0]["response_format"] == {"type": "json_object"}
+        
+        analysis = await service.analyze_submission("Photo d'un héron")
+        assert analysis["score"] == 80
+        await service.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_invalid_json_raises(self):
+        service = AIService(_client(FakeAIProvider(reply="pas du JSON")))
+        with pytest.raises(AIProviderError):
+            await service.analyze_submission("Photo")
+        await service.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_templates_without_provider(self):
+        service = AIService(AIClient(None))
+        content = await service.generate_challenge_content("Nature", 2)
+        assert content["title"] == "Crée un challenge à propos de Nature"
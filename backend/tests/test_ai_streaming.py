@@ -0,0 +1,219 @@
+"""
+Tests for streamed AI responses, from the provider to Server-Sent Events
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import date, datetime
+
+import httpx
+import pytest
+
+from app.database import get_db
+from app.main import app
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.routers import ai_content
+from app.services.ai_budget import SEASON, USER, AIBudget
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_client import AIClient, AIProvider, AIProviderError
+from app.services.ai_service import AIService, partial_fields
+from app.utils.security import get_current_user
+from tests.conftest import TestSessionLocal
+from tests.fake_ai_provider import FakeAIProvider, StreamingASGITransport
+
+MESSAGES = [{"role": "user", "content": "Un défi pour demain ?"}]
+CONTENT = {
+    "title": "Le héron du ponton",
+    "description": "Photographie un héron depuis le ponton sans le faire fuir",
+    "instructions": "Approche-toi lentement",
+    "hints": ["Tôt le matin", "Reste immobile"],
+}
+
+
+def _client(fake: FakeAIProvider, **options) -> AIClient:
+    options.setdefault("backoff_base", 0.01)
+    return AIClient(
+        AIProvider("test-key", "gpt-test", "http://fake-ai"),
+        transport=StreamingASGITransport(fake.app),
+        **options,
+    )
+
+
+def _decode(message: bytes):
+    lines = message.decode().strip().split("\n")
+    return lines[0][len("event: "):], json.loads(lines[1][len("data: "):])
+
+
+async def _events(stream):
+    return [_decode(message) async for message in stream]
+
+
+class TestChatStream:
+    """Test cases for streamed completions from the provider."""
+    
+    @pytest.mark.asyncio
+    async def test_yields_text_as_generated(self):
+        fake = FakeAIProvider(reply="Bonjour les baigneurs", chunk_size=5, failures=[503])
+        client = _client(fake)
+        
+        chunks = [chunk async for chunk in client.chat_stream(MESSAGES)]
+        assert chunks[0] == "Bonjo"
+        assert "".join(chunks) == "Bonjour les baigneurs"
+        assert len(fake.requests) == 2
+        assert fake.requests[-1]["stream"] is True
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_deadline_covers_the_stream(self):
+        client = _client(FakeAIProvider(reply="x" * 40, chunk_size=4, chunk_delay=0.05), max_concurrency=1)
+        
+        with pytest.raises(AIProviderError):
+            async for _ in client.chat_stream(MESSAGES, timeout=0.1):
+                pass
+        # The slot was given back
+        await asyncio.wait_for(client._slot(client.provider).acquire(), 0.1)
+        await client.aclose()
+    
+    def test_partial_fields(self):
+        assert partial_fields('{"title": "Le hé') == {}
+        assert partial_fields('{"title": "Le \\"héron\\"", "score": 8') == {"title": 'Le "héron"'}
+        assert partial_fields('{"title": "Héron", "score": 80}') == {"title": "Héron", "score": 80}
+
+
+class TestStreamedContent:
+    """Test cases for the streamed generation and analysis events."""
+    
+    @pytest.mark.asyncio
+    async def test_generation_events_then_cached_result(self):
+        fake = FakeAIProvider(reply=json.dumps(CONTENT, ensure_ascii=False), chunk_size=10)
+        service = AIService(_client(fake), AIResponseCache(path=None))
+        
+        events = await _events(service.stream_challenge_content("Oiseaux", 2, "Lac d'Annecy"))
+        kinds = [kind for kind, _ in events]
+        assert kinds[0] == "token"
+        assert kinds[-1] == "result"
+        assert events[-1][1] == CONTENT
+        assert [data["name"] for kind, data in events if kind == "field"] == ["title", "description", "instructions"]
+        assert "".join(data["text"] for kind, data in events if kind == "token") == json.dumps(CONTENT, ensure_ascii=False)
+        
+        again = await _events(service.stream_challenge_content("oiseaux", 2, "lac d'annecy"))
+        assert again == [("result", CONTENT)]
+        assert len(fake.requests) == 1
+        await service.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_invalid_output_ends_with_error(self):
+        fake = FakeAIProvider(reply="pas du JSON")
+        service = AIService(_client(fake), AIResponseCache(path=None))
+        
+        events = await _events(service.stream_challenge_content("Oiseaux", 2))
+        assert events[-1] == ("error", {"detail": "AI provider unavailable, please retry later"})
+        await _events(service.stream_challenge_content("Oiseaux", 2))
+        assert len(fake.requests) == 2
+        await service.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_malformed_chunk_ends_with_error(self):
+        chunks = b'data: {"choices": [{"delta": {"content": "{\\"title"}}]}\n\ndata: {tronqu\n\n'
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, content=chunks, headers={"Content-Type": "text/event-stream"})
+        )
+        service = AIService(AIClient(AIProvider("test-key", "gpt-test", "http://fake-ai"), transport=transport))
+        
+        events = await _events(service.stream_submission_analysis("Photo d'un héron"))
+        assert events[0] == ("token", {"text": '{"title'})
+        assert events[-1] == ("error", {"detail": "AI provider unavailable, please retry later"})
+        await service.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_analysis_result_is_validated(self):
+        fake = FakeAIProvider(reply='{"score": 140, "feedback": "Superbe"}', chunk_size=6)
+        service = AIService(_client(fake))
+        
+        events = await _events(service.stream_submission_analysis("Photo d'un héron"))
+        assert ("field", {"name": "score", "value": 140}) in events
+        assert events[-1] == ("result", {"score": 100, "feedback": "Superbe", "suggestions": []})
+        await service.client.aclose()
+
+
+class TestStreamingEndpoint:
+    """Test cases for the SSE mode of the AI endpoints."""
+    
+    @pytest.mark.asyncio
+    async def test_time_to_first_byte(self, db_session, monkeypatch):
+        # 16 chunks 50 ms apart: the whole generation takes about 0.75 s
+        reply = json.dumps(CONTENT, ensure_ascii=False)
+        fake = FakeAIProvider(reply=reply, chunk_size=len(reply) // 15, chunk_delay=0.05)
+        service = AIService(_client(fake), AIResponseCache(path=None))
+        monkeypatch.setattr(ai_content, "ai_service", service)
+        
+        async def test_db():
+            yield db_session
+        
+        app.dependency_overrides[get_current_user] = lambda: User(id=uuid.uuid4(), email="papa@example.com")
+        app.dependency_overrides[get_db] = test_db
+        try:
+            async with httpx.AsyncClient(transport=StreamingASGITransport(app), base_url="http://test") as client:
+                loop = asyncio.get_running_loop()
+                started = loop.time()
+                async with client.stream(
+                    "POST", "/ai/generate-challenge",
+                    params={"theme": "Oiseaux", "difficulty": 2, "stream": "true"},
+                ) as response:
+                    assert response.status_code == 200
+                    assert response.headers["content-type"].startswith("text/event-stream")
+                    body = response.aiter_bytes()
+                    first = await body.__anext__()
+                    first_byte = loop.time() - started
+                    rest = b"".join([chunk async for chunk in body])
+                total = loop.time() - started
+        finally:
+            app.dependency_overrides.clear()
+            await service.client.aclose()
+        
+        assert first.startswith(b"event: token")
+        assert first_byte < 0.25
+        assert total > 0.6
+        assert b"event: result" in rest
+    
+    @pytest.mark.asyncio
+    async def test_calls_are_charged_to_the_current_season(self, db_session, monkeypatch):
+        papa = User(id=uuid.uuid4(), email="papa@example.com")
+        seasons = [
+            Season(
+                id=uuid.uuid4(), title=title, location="Lac d'Annecy", is_active=True,
+                start_date=date(2026, 7, 1), end_date=date(2026, 8, 31),
+                invitation_code=code, created_by=papa.id,
+            )
+            for title, code in (("Été", "LAC001"), ("Automne", "LAC002"))
+        ]
+        db_session.add_all([papa] + seasons + [SeasonMember(season_id=seasons[0].id, user_id=papa.id)])
+        await db_session.commit()
+        budget = AIBudget(session_factory=TestSessionLocal, season_daily_tokens=0, user_daily_tokens=0)
+        service = AIService(_client(FakeAIProvider(reply=json.dumps(CONTENT))), AIResponseCache(path=None), budget=budget)
+        monkeypatch.setattr(ai_content, "ai_service", service)
+        
+        async def test_db():
+            yield db_session
+        
+        app.dependency_overrides[get_current_user] = lambda: papa
+        app.dependency_overrides[get_db] = test_db
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.post("/ai/generate-challenge", params={"theme": "Oiseaux", "difficulty": 2})
+                assert response.status_code == 200
+                # Only members can charge a season
+                response = await client.post(
+                    "/ai/generate-challenge",
+                    params={"theme": "Kayak", "difficulty": 2, "season_id": str(seasons[1].id)},
+                )
+                assert response.status_code == 403
+        finally:
+            app.dependency_overrides.clear()
+            await service.client.aclose()
+        
+        today = datetime.utcnow().date()
+        assert budget.used((SEASON, seasons[0].id, today)) > 0
+        assert budget.used((USER, papa.id, today)) == budget.used((SEASON, seasons[0].id, today))
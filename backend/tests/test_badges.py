@@ -0,0 +1,128 @@
+"""
+Tests for the compiled badge engine
+"""
+
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType, SubmissionStatus
+from app.models.scoring import Badge, BadgeCategory, UserBadge, UserCounter
+from app.models.season import Season
+from app.models.user import User
+from app.services.badge_service import BadgeEngine, BadgeRules, compile_criteria
+from app.services.scoring_service import ScoringService
+
+
+async def _setup(db):
+    user = User(id=uuid.uuid4(), email="lea@example.com")
+    season = Season(
+        id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+        start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+        invitation_code="LAC001", created_by=user.id,
+    )
+    badges = {
+        "quiz": Badge(
+            name="Quizzeur", description="2 quiz réussis", category=BadgeCategory.MILESTONE.value,
+            criteria={"type": "challenge_count", "challenge_type": "quiz", "count": 2},
+        ),
+        "points": Badge(
+            name="Centurion", description="100 points", category=BadgeCategory.MILESTONE.value,
+            criteria={"type": "points_total", "points": 100},
+        ),
+        "perfect": Badge(
+            name="Sans faute", description="Un défi parfait", category=BadgeCategory.SPECIAL.value,
+            criteria={"type": "perfect_score"},
+        ),
+    }
+    db.add_all([user, season, *badges.values()])
+    await db.commit()
+    return user, season, badges
+
+
+async def _earned(db, user_id):
+    result = await db.execute(select(UserBadge.badge_id).where(UserBadge.user_id == user_id))
+    return set(result.scalars())
+
+
+class TestCompileCriteria:
+    """Test cases for criteria compilation."""
+    
+    def test_known_criteria(self):
+        badge_id = uuid.uuid4()
+        rule = compile_criteria(badge_id, {"type": "challenge_count", "challenge_type": "quiz", "count": 10})
+        assert (rule.counter, rule.threshold) == ("challenges:quiz", 10)
+        assert compile_criteria(badge_id, {"type": "challenge_count", "count": 3}).counter == "challenges"
+        assert compile_criteria(badge_id, {"type": "streak_days", "days": 6}).counter == "streak"
+        assert compile_criteria(badge_id, {"type": "perfect_score"}).threshold == 1
+    
+    def test_unsupported_criteria(self):
+        assert compile_criteria(uuid.uuid4(), {"type": "moon_phase"}) is None
+        assert compile_criteria(uuid.uuid4(), {"type": "points_total"}) is None
+        assert compile_criteria(uuid.uuid4(), None) is None
+    
+    def test_crossing(self):
+        rule = compile_criteria(uuid.uuid4(), {"type": "points_total", "points": 100})
+        assert rule.crossed(90, 110)
+        assert not rule.crossed(100, 120)
+        assert not rule.crossed(50, 90)
+
+
+class TestBadgeEngine:
+    """Test cases for counter-driven badge awards."""
+    
+    @pytest.mark.asyncio
+    async def test_badges_awarded_when_threshold_crossed(self, db_session):
+        user, season, badges = await _setup(db_session)
+        engine = BadgeEngine(db_session, BadgeRules())
+        
+        await engine.record_submissions(season.id, [(user.id, ChallengeType.QUIZ, 0.5)])
+        await engine.record_points(season.id, {user.id: 60})
+        await db_session.commit()
+        assert await _earned(db_session, user.id) == set()
+        
+        awarded = await engine.record_submissions(season.id, [(user.id, ChallengeType.QUIZ, 1.0)])
+        awarded += await engine.record_points(season.id, {user.id: 60})
+        await db_session.commit()
+        assert {badge.badge_id for badge in awarded} == {badge.id for badge in badges.values()}
+        
+        # Counters keep counting without awarding again
+        assert await engine.record_points(season.id, {user.id: 60}) == []
+        counter = await db_session.get(UserCounter, (user.id, season.id, "points"))
+        assert counter.value == 180
+    
+    @pytest.mark.asyncio
+    async def test_award_points_feeds_counters(self, db_session):
+        user, season, badges = await _setup(db_session)
+        
+        await ScoringService(db_session).award_points(user.id, season.id, 120, "Défi réussi")
+        
+        counter = await db_session.get(UserCounter, (user.id, season.id, "points"))
+        assert counter.value == 120
+    
+    @pytest.mark.asyncio
+    async def test_rebuild_awards_deserved_badges(self, db_session):
+        user, season, badges = await _setup(db_session)
+        challenges = [
+            Challenge(
+                id=uuid.uuid4(), season_id=season.id, title=f"Quiz {n}", description="Quiz",
+                type=ChallengeType.QUIZ, challenge_date=date(2025, 7, n + 1),
+            )
+            for n in range(2)
+        ]
+        db_session.add_all(challenges)
+        db_session.add_all([
+            ChallengeSubmission(
+                challenge_id=challenge.id, user_id=user.id, submission_data={},
+                status=SubmissionStatus.APPROVED, validation_score=0.5,
+            )
+            for challenge in challenges
+        ])
+        await db_session.commit()
+        
+        engine = BadgeEngine(db_session, BadgeRules())
+        assert await engine.rebuild(season.id) == {"counters": 3, "badges": 1}
+        assert await _earned(db_session, user.id) == {badges["quiz"].id}
+        assert (await engine.rebuild(season.id))["badges"] == 0
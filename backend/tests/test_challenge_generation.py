@@ -0,0 +1,141 @@
+"""
+Tests for the nightly pre-generation of daily challenges
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.models.challenge import Challenge
+from app.models.season import Season
+from app.models.user import User
+from app.services.ai_budget import SEASON, AIBudget, Spender
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_client import AIClient, AIProvider
+from app.services.ai_service import AIService
+from app.services.challenge_generation import ChallengeGenerator, daily_slots
+from app.services.challenge_service import ChallengeService
+from tests.conftest import TestSessionLocal
+from tests.fake_ai_provider import FakeAIProvider
+
+# 20:00 UTC, 22:00 in Paris: tomorrow is the 16th everywhere below
+NOW = datetime(2026, 7, 15, 20, 0)
+
+
+async def _seasons(db, *locations, end_date=date(2026, 8, 31)):
+    owner = User(id=uuid.uuid4(), email="papa@example.com")
+    seasons = [
+        Season(
+            id=uuid.uuid4(), title=f"Été {i}", location=location, timezone="Europe/Paris",
+            start_date=date(2026, 7, 1), end_date=end_date,
+            invitation_code=f"LAC{i:03d}", created_by=owner.id, is_active=True,
+        )
+        for i, location in enumerate(locations)
+    ]
+    db.add_all([owner] + seasons)
+    await db.commit()
+    return seasons
+
+
+def _generator(db, fake: FakeAIProvider, budget: AIBudget = None, **options) -> ChallengeGenerator:
+    client = AIClient(
+        AIProvider("test-key", "gpt-test", "http://fake-ai"),
+        transport=httpx.ASGITransport(app=fake.app), backoff_base=0.01,
+    )
+    budget = budget or AIBudget(session_factory=TestSessionLocal)
+    return ChallengeGenerator(db, AIService(client, AIResponseCache(path=None), budget=budget), **options)
+
+
+class TestChallengeGenerator:
+    """Test cases for the nightly batch."""
+    
+    def test_daily_slots_rotate(self):
+        day = date(2026, 7, 16)
+        slots = daily_slots(day)
+        assert len(slots) == 3
+        assert len({kind for kind, _, _ in slots}) == 3
+        assert daily_slots(day + timedelta(days=1)) != slots
+    
+    @pytest.mark.asyncio
+    async def test_generates_once_per_location(self, db_session):
+        annecy, bourget, voisins = await _seasons(db_session, "Lac d'Annecy", "Lac du Bourget", "lac d'annecy")
+        fake = FakeAIProvider(delay=0.01)
+        generator = _generator(db_session, fake, concurrency=2)
+        
+        summary = await generator.generate_due(NOW)
+        assert summary == {"seasons": 3, "generations": 9, "failed": 0, "challenges": 9}
+        # The neighbours' themes come from the cache
+        assert len(fake.requests) == 6
+        assert fake.peak_in_flight <= 2
+        
+        challenges = (await db_session.execute(
+            select(Challenge).where(Challenge.season_id == voisins.id)
+        )).scalars().all()
+        assert len(challenges) == 3
+        for challenge in challenges:
+            assert challenge.ai_generated
+            assert challenge.generation_context["day"] == "2026-07-16"
+            # 08:00 in Paris, summer time
+            assert challenge.challenge_date == datetime(2026, 7, 16, 6, 0)
+            assert challenge.expires_at == datetime(2026, 7, 16, 22, 0)
+        
+        await generator.ai.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_rerun_fills_only_failed_generations(self, db_session):
+        await _seasons(db_session, "Lac d'Annecy")
+        fake = FakeAIProvider(failures=[400])
+        generator = _generator(db_session, fake)
+        
+        first = await generator.generate_due(NOW)
+        assert first["failed"] == 1 and first["challenges"] == 2
+        
+        second = await generator.generate_due(NOW)
+        assert second == {"seasons": 1, "generations": 1, "failed": 0, "challenges": 1}
+        assert await generator.generate_due(NOW) == {"seasons": 0, "generations": 0, "failed": 0, "challenges": 0}
+        await generator.ai.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_skips_seasons_ending_today(self, db_session):
+        await _seasons(db_session, "Lac d'Annecy", end_date=date(2026, 7, 15))
+        generator = _generator(db_session, FakeAIProvider())
+        
+        assert (await generator.generate_due(NOW))["challenges"] == 0
+        await generator.ai.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_morning_read(self, db_session):
+        season, = await _seasons(db_session, "Lac d'Annecy")
+        generator = _generator(db_session, FakeAIProvider())
+        await generator.generate_due(NOW)
+        
+        service = ChallengeService(db_session)
+        assert await service.get_open_challenges(season.id, now=datetime(2026, 7, 16, 5, 0)) == []
+        morning = await service.get_open_challenges(season.id, now=datetime(2026, 7, 16, 6, 30))
+        assert len(morning) == 3
+        assert await service.get_open_challenges(season.id, now=datetime(2026, 7, 16, 23, 0)) == []
+        await generator.ai.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_each_season_is_charged_on_its_own_budget(self, db_session):
+        annecy, bourget = await _seasons(db_session, "Lac d'Annecy", "Lac du Bourget")
+        budget = AIBudget(session_factory=TestSessionLocal, season_daily_tokens=10_000, user_daily_tokens=0)
+        today = datetime.utcnow().date()
+        budget.record(Spender(season_id=bourget.id), "generation", 10_000, 0)
+        fake = FakeAIProvider()
+        generator = _generator(db_session, fake, budget)
+        
+        await generator.generate_due(NOW)
+        
+        assert len(fake.requests) == 3
+        assert budget.used((SEASON, annecy.id, today)) > 0
+        assert budget.used((SEASON, bourget.id, today)) == 10_000
+        titles = dict((await db_session.execute(
+            select(Challenge.ai_prompt, Challenge.title).where(Challenge.season_id == bourget.id)
+        )).all())
+        # Over quota: template content instead of fresh generations
+        assert titles == {theme: f"Crée un challenge à propos de {theme}" for _, theme, _ in daily_slots(date(2026, 7, 16))}
+        await generator.ai.client.aclose()
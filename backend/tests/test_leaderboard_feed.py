@@ -0,0 +1,206 @@
+"""
+Tests for the season leaderboard and its live push feed
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import date, datetime
+
+import pytest
+
+from app.models.challenge import Challenge, ChallengeType
+from app.models.scoring import ScoreType
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.services.leaderboard_feed import LeaderboardFeed, leaderboard_channel
+from app.services.score_ledger_service import ScoreLedgerService
+from app.services.scoring_service import ScoringService
+from app.utils.pagination import decode_rank_cursor
+from app.utils.pubsub import Broker
+from app.utils.responses import SSE_KEEPALIVE
+from tests.conftest import TestSessionLocal
+
+
+async def _season(db, *emails):
+    """A season whose members are users with the given emails."""
+    users = [User(id=uuid.uuid4(), email=email) for email in emails]
+    season = Season(
+        id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+        start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+        invitation_code="LAC001", created_by=users[0].id,
+    )
+    db.add_all(users + [season])
+    db.add_all([SeasonMember(season_id=season.id, user_id=user.id) for user in users])
+    await db.commit()
+    return season, users
+
+
+def _decode(message: bytes):
+    event, data = message.decode().strip().split("\n")
+    return event[len("event: "):], json.loads(data[len("data: "):])
+
+
+class TestLeaderboard:
+    """Test cases for the ranked leaderboard query."""
+    
+    @pytest.mark.asyncio
+    async def test_ranks_members_with_ties(self, db_session):
+        season, (papa, maman, lea) = await _season(db_session, "papa@example.com", "maman@example.com", "lea@example.com")
+        challenge = Challenge(
+            id=uuid.uuid4(), season_id=season.id, title="Baignade", description="Dans le lac",
+            type=ChallengeType.SPORT, challenge_date=datetime(2025, 7, 2),
+        )
+        db_session.add(challenge)
+        await db_session.commit()
+        scoring = ScoringService(db_session)
+        # Points without a challenge don't count as a completed challenge
+        await scoring.award_points(papa.id, season.id, 30, "Ajustement")
+        await scoring.award_points(maman.id, season.id, 20, "Défi réussi", challenge_id=challenge.id)
+        await scoring.award_points(maman.id, season.id, 10, "Bonus", score_type=ScoreType.SPEED_BONUS)
+        
+        leaderboard = await scoring.get_leaderboard(season.id)
+        
+        assert leaderboard.total_participants == 3
+        ranks = {entry.user_email: (entry.rank, entry.total_points) for entry in leaderboard.entries}
+        assert ranks == {
+            "papa@example.com": (1, 30),
+            "maman@example.com": (1, 30),
+            "lea@example.com": (3, 0),
+        }
+        completed = {entry.user_email: entry.challenges_completed for entry in leaderboard.entries}
+        assert completed == {"papa@example.com": 0, "maman@example.com": 1, "lea@example.com": 0}
+        # Agrees with the member's stats
+        assert (await scoring.get_user_stats(maman.id, season.id)).challenges_completed == 1
+    
+    @pytest.mark.asyncio
+    async def test_archived_season_keeps_its_standings(self, db_session, tmp_path):
+        season, (papa, maman) = await _season(db_session, "papa@example.com", "maman@example.com")
+        scoring = ScoringService(db_session)
+        await scoring.award_points(papa.id, season.id, 10, "Défi réussi")
+        await scoring.award_points(maman.id, season.id, 25, "Défi réussi")
+        season.is_completed = True
+        await db_session.commit()
+        ledger = ScoreLedgerService(db_session)
+        ledger.archive_dir = tmp_path
+        assert await ledger.archive_season(season.id)
+        
+        leaderboard = await scoring.get_leaderboard(season.id)
+        
+        assert [(entry.user_email, entry.rank, entry.total_points) for entry in leaderboard.entries] == [
+            ("maman@example.com", 1, 25),
+            ("papa@example.com", 2, 10),
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_pages_follow_the_ranking(self, db_session):
+        emails = [f"membre{i}@example.com" for i in range(5)]
+        season, members = await _season(db_session, *emails)
+        scoring = ScoringService(db_session)
+        for member, points in zip(members, (10, 30, 10, 20, 10)):
+            await scoring.award_points(member.id, season.id, points, "Défi réussi")
+        full = await scoring.get_leaderboard(season.id, limit=None)
+        
+        pages, after = [], None
+        while True:
+            page = await scoring.get_leaderboard(season.id, limit=2, after=after)
+            pages.append(page)
+            if page.next_cursor is None:
+                break
+            after = decode_rank_cursor(page.next_cursor)
+        
+        assert [len(page.entries) for page in pages] == [2, 2, 1]
+        paged = [(entry.user_id, entry.rank) for page in pages for entry in page.entries]
+        assert paged == [(entry.user_id, entry.rank) for entry in full.entries]
+        assert [rank for _, rank in paged] == [1, 2, 3, 3, 3]
+        assert all(page.total_participants == 5 for page in pages)
+    
+    @pytest.mark.asyncio
+    async def test_unknown_season(self, db_session):
+        assert await ScoringService(db_session).get_leaderboard(uuid.uuid4()) is None
+
+
+class TestLeaderboardFeed:
+    """Test cases for coalesced rank-delta pushes."""
+    
+    @pytest.mark.asyncio
+    async def test_burst_is_coalesced_into_one_delta(self, db_session):
+        season, (papa, maman) = await _season(db_session, "papa@example.com", "maman@example.com")
+        broker = Broker()
+        feed = LeaderboardFeed(broker=broker, session_factory=TestSessionLocal, interval=0.05, keepalive=0.2)
+        scoring = ScoringService(db_session)
+        initial = await scoring.get_leaderboard(season.id, limit=None)
+        
+        stream = feed.stream(season.id, initial)
+        event, snapshot = _decode(await stream.__anext__())
+        assert event == "snapshot"
+        assert len(snapshot["entries"]) == 2
+        
+        # Sessions share one connection in tests, so score before the flush runs
+        for points in (5, 5, 5):
+            await scoring.award_points(maman.id, season.id, points, "Défi réussi")
+        for _ in range(3):
+            feed.notify(season.id)
+        
+        event, delta = _decode(await asyncio.wait_for(stream.__anext__(), 1))
+        assert event == "leaderboard"
+        changes = {change["user_id"]: change for change in delta["changes"]}
+        assert changes[str(maman.id)] == {
+            "user_id": str(maman.id),
+            "rank": 1,
+            "previous_rank": 1,
+            "total_points": 15,
+            "points_delta": 15,
+        }
+        assert changes[str(papa.id)]["rank"] == 2
+        assert changes[str(papa.id)]["points_delta"] == 0
+        
+        # Nothing else was broadcast for the burst
+        assert await stream.__anext__() == SSE_KEEPALIVE
+        await stream.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_unwatched_season_is_not_queried(self, db_session):
+        season, _ = await _season(db_session, "papa@example.com")
+        feed = LeaderboardFeed(broker=Broker(), session_factory=TestSessionLocal, interval=0)
+        
+        feed.notify(season.id)
+        
+        assert not feed._pending
+    
+    @pytest.mark.asyncio
+    async def test_slow_client_is_told_to_resync(self, db_session):
+        season, (papa,) = await _season(db_session, "papa@example.com")
+        broker = Broker()
+        feed = LeaderboardFeed(broker=broker, session_factory=TestSessionLocal, inbox_size=2)
+        initial = await ScoringService(db_session).get_leaderboard(season.id, limit=None)
+        stream = feed.stream(season.id, initial)
+        await stream.__anext__()
+        
+        for n in range(5):
+            await broker.publish(leaderboard_channel(season.id), f"delta {n}".encode())
+        
+        event, data = _decode(await stream.__anext__())
+        assert event == "resync"
+        assert data == {"season_id": str(season.id)}
+        assert await stream.__anext__() == b"delta 3"
+        assert await stream.__anext__() == b"delta 4"
+        await stream.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_season_is_forgotten_when_last_subscriber_leaves(self, db_session):
+        season, (papa,) = await _season(db_session, "papa@example.com")
+        feed = LeaderboardFeed(broker=Broker(), session_factory=TestSessionLocal, interval=0)
+        initial = await ScoringService(db_session).get_leaderboard(season.id, limit=None)
+        first = feed.stream(season.id, initial)
+        second = feed.stream(season.id, initial)
+        await first.__anext__()
+        await second.__anext__()
+        await feed.flush(season.id)
+        
+        await first.aclose()
+        assert str(season.id) in feed._standings
+        
+        await second.aclose()
+        assert str(season.id) not in feed._standings
+        assert str(season.id) not in feed._last_flush
@@ -0,0 +1,160 @@
+"""
+Tests for daily leaderboard snapshots, rank changes and daily standings
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.scoring import Score, ScoreType
+from app.models.season import Season, SeasonMember
+from app.models.user import User, UserProfile
+from app.services.leaderboard_snapshots import LeaderboardSnapshots
+from app.services.member_counters import MemberCounters, MemberDelta
+from app.services.scoring_service import ScoringService
+from app.services.streak_service import local_date
+from app.utils.rank_vectors import RankVector, RankVectorCache
+
+FAMILY = ("Papa", "Maman", "Ado1", "Ado2")
+
+
+async def _family(db, timezone: str = "Europe/Paris", started_days_ago: int = 10):
+    users = {name: User(id=uuid.uuid4(), email=f"{name.lower()}@example.com") for name in FAMILY}
+    today = date.today()
+    season = Season(
+        id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy", timezone=timezone,
+        start_date=today - timedelta(days=started_days_ago), end_date=today + timedelta(days=10),
+        invitation_code="LAC001", created_by=users["Papa"].id, is_active=True,
+    )
+    db.add_all(list(users.values()) + [season])
+    db.add_all([UserProfile(user_id=user.id, display_name=name) for name, user in users.items()])
+    db.add_all([SeasonMember(season_id=season.id, user_id=user.id) for user in users.values()])
+    await db.commit()
+    return season, users
+
+
+async def _score(db, season, users, points):
+    counters = MemberCounters(db)
+    await counters.add(season.id, {users[name].id: MemberDelta(points=amount) for name, amount in points.items()})
+    await db.commit()
+
+
+class TestRankVector:
+    """Test cases for packed standings."""
+    
+    def test_pack_and_ranks(self):
+        ids = [uuid.uuid4() for _ in range(4)]
+        vector = RankVector.pack(zip(ids, [60, 45, 45, -5]))
+        
+        assert len(vector) == 4
+        assert len(vector.user_ids) == 64 and len(vector.points) == 16
+        assert vector.members() == ids
+        assert vector.ranks() == [1, 2, 2, 4]
+        assert vector.index()[ids[3]] == (4, -5)
+    
+    def test_rank_changes_and_points_since(self):
+        papa, maman, ado = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        yesterday = RankVector.pack([(papa, 100), (maman, 90)])
+        today = RankVector.pack([(maman, 150), (papa, 145), (ado, 10)])
+        
+        assert today.rank_changes(yesterday) == {maman: 1, papa: -1, ado: None}
+        assert today.points_since(yesterday) == [(maman, 60), (papa, 45), (ado, 10)]
+        assert yesterday.points_since(RankVector.pack([])) == [(papa, 100), (maman, 90)]
+    
+    def test_cache_evicts_least_recent(self):
+        cache = RankVectorCache(maxsize=2)
+        vector = RankVector.pack([])
+        for day in range(3):
+            cache.put("season", day, vector)
+        assert cache.get("season", 0) is None
+        assert cache.get("season", 2) is vector
+
+
+class TestLeaderboardSnapshots:
+    """Test cases for the end-of-day snapshot job."""
+    
+    @pytest.mark.asyncio
+    async def test_take_due_closes_the_local_day(self, db_session):
+        season, users = await _family(db_session)
+        await _score(db_session, season, users, {"Papa": 450, "Maman": 520, "Ado1": 380, "Ado2": 410})
+        # Scored after midnight in Paris: belongs to the next day
+        now = datetime.utcnow()
+        db_session.add(Score(
+            user_id=users["Ado1"].id, season_id=season.id, points=200,
+            score_type=ScoreType.DAILY_BONUS.value,
+            description="Bonus du jour", created_at=now,
+        ))
+        await _score(db_session, season, users, {"Ado1": 200})
+        snapshots = LeaderboardSnapshots(db_session, cache=RankVectorCache())
+        
+        taken = await snapshots.take_due(now)
+        # Every day since the season started, up to yesterday in Paris
+        assert {(row["season_id"], row["members"]) for row in taken} == {(season.id, 4)}
+        assert [row["day"] for row in taken] == [
+            season.start_date + timedelta(days=n) for n in range(len(taken))
+        ]
+        assert taken[-1]["day"] == local_date(now, "Europe/Paris") - timedelta(days=1)
+        assert await snapshots.take_due(now) == []
+        
+        vector = await snapshots.get(season.id, taken[-1]["day"])
+        names = {user.id: name for name, user in users.items()}
+        assert [names[user_id] for user_id in vector.members()] == ["Maman", "Papa", "Ado2", "Ado1"]
+        assert vector.index()[users["Ado1"].id] == (4, 380)
+    
+    @pytest.mark.asyncio
+    async def test_missed_runs_are_caught_up(self, db_session):
+        season, users = await _family(db_session, timezone="UTC", started_days_ago=3)
+        snapshots = LeaderboardSnapshots(db_session, cache=RankVectorCache())
+        now = datetime.utcnow()
+        today = now.date()
+        
+        taken = await snapshots.take_due(now - timedelta(days=2))
+        assert [row["day"] for row in taken] == [today - timedelta(days=3)]
+        # No run for two days: the next one closes both
+        await _score(db_session, season, users, {"Papa": 10})
+        taken = await snapshots.take_due(now)
+        assert [row["day"] for row in taken] == [today - timedelta(days=2), today - timedelta(days=1)]
+    
+    @pytest.mark.asyncio
+    async def test_daily_standings_unavailable_without_previous_snapshot(self, db_session):
+        season, users = await _family(db_session, timezone="UTC")
+        await _score(db_session, season, users, {"Papa": 100, "Maman": 90})
+        
+        daily = await ScoringService(db_session).get_daily_leaderboard(season.id)
+        assert daily.available is False
+        assert daily.entries == []
+    
+    @pytest.mark.asyncio
+    async def test_leaderboard_and_daily_standings_use_snapshots(self, db_session):
+        season, users = await _family(db_session, timezone="UTC", started_days_ago=1)
+        snapshots = LeaderboardSnapshots(db_session)
+        yesterday = date.today() - timedelta(days=1)
+        await _score(db_session, season, users, {"Papa": 100, "Maman": 90, "Ado1": 80, "Ado2": 70})
+        await snapshots.take_due()
+        
+        today = {"Papa": 45, "Maman": 60, "Ado1": 35, "Ado2": 40}
+        await _score(db_session, season, users, today)
+        db_session.add_all([
+            Score(
+                user_id=users[name].id, season_id=season.id, points=points,
+                score_type=ScoreType.DAILY_BONUS.value, description="Points du jour",
+            )
+            for name, points in {"Papa": 145, "Maman": 150, "Ado1": 115, "Ado2": 110}.items()
+        ])
+        await db_session.commit()
+        scoring = ScoringService(db_session)
+        
+        leaderboard = await scoring.get_leaderboard(season.id)
+        names = {str(user.id): name for name, user in users.items()}
+        assert {names[entry.user_id]: entry.rank_change for entry in leaderboard.entries} == {
+            "Maman": 1, "Papa": -1, "Ado1": 0, "Ado2": 0,
+        }
+        
+        daily = await scoring.get_daily_leaderboard(season.id)
+        assert [names[entry.user_id] for entry in daily.entries] == ["Maman", "Papa", "Ado2", "Ado1"]
+        assert [entry.points for entry in daily.entries] == [60, 45, 40, 35]
+        
+        closed = await scoring.get_daily_leaderboard(season.id, yesterday)
+        assert [entry.points for entry in closed.entries] == [100, 90, 80, 70]
+        assert (await scoring.get_daily_leaderboard(season.id, date.today() + timedelta(days=1))).entries == []
@@ -0,0 +1,147 @@
+"""
+Tests for the stats rollups, their reconciliation and user stats
+"""
+
+import uuid
+from datetime import date, datetime
+
+import httpx
+import pytest
+from sqlalchemy import update
+
+from app.database import get_db
+from app.main import app
+from app.models.challenge import Challenge, ChallengeType
+from app.models.scoring import ScoreType, UserStatsRollup
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.services.member_counters import MemberCounters
+from app.services.submission_service import SubmissionService
+from app.services.scoring_service import ScoringService
+from app.utils.security import get_current_user
+
+
+async def _member(db, email: str = "lea@example.com"):
+    user = User(id=uuid.uuid4(), email=email)
+    season = Season(
+        id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+        start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+        invitation_code=email[:6].upper(), created_by=user.id,
+    )
+    challenge = Challenge(
+        id=uuid.uuid4(), season_id=season.id, title="Quiz du lac", description="Quiz",
+        type=ChallengeType.QUIZ, challenge_date=datetime(2025, 7, 2),
+    )
+    member = SeasonMember(season_id=season.id, user_id=user.id)
+    db.add_all([user, season, challenge, member])
+    await db.commit()
+    return member, challenge
+
+
+async def _counters(db, member):
+    await db.refresh(member)
+    return member.total_points, member.challenges_completed, member.badges_earned
+
+
+class TestMemberCounters:
+    """Test cases for counter maintenance."""
+    
+    @pytest.mark.asyncio
+    async def test_awards_increment_counters(self, db_session):
+        member, challenge = await _member(db_session)
+        scoring = ScoringService(db_session)
+        
+        await scoring.award_points(member.user_id, member.season_id, 20, "Défi réussi", challenge_id=challenge.id)
+        await scoring.award_points(member.user_id, member.season_id, 5, "Rapidité", score_type=ScoreType.SPEED_BONUS)
+        await scoring.award_points(member.user_id, member.season_id, -3, "Retard", score_type=ScoreType.PENALTY)
+        
+        assert await _counters(db_session, member) == (22, 1, 0)
+        assert await MemberCounters(db_session).reconcile() == []
+    
+    @pytest.mark.asyncio
+    async def test_reconcile_reports_and_fixes_drift(self, db_session):
+        member, challenge = await _member(db_session)
+        await ScoringService(db_session).award_points(member.user_id, member.season_id, 20, "Défi réussi", challenge_id=challenge.id)
+        await db_session.execute(
+            update(SeasonMember).where(SeasonMember.id == member.id).values(total_points=50, badges_earned=2)
+        )
+        await db_session.commit()
+        counters = MemberCounters(db_session)
+        
+        drift = await counters.reconcile(member.season_id, fix=False)
+        assert drift == [{
+            "season_id": member.season_id,
+            "user_id": member.user_id,
+            "total_points": -30,
+            "challenges_completed": 0,
+            "challenges_attempted": 0,
+            "badges_earned": -2,
+            "rare_badges": 0,
+        }]
+        assert await _counters(db_session, member) == (50, 1, 2)
+        
+        assert len(await counters.reconcile(member.season_id)) == 1
+        assert await _counters(db_session, member) == (20, 1, 0)
+        assert await counters.reconcile() == []
+    
+    @pytest.mark.asyncio
+    async def test_reconcile_fixes_global_totals(self, db_session):
+        member, challenge = await _member(db_session)
+        await ScoringService(db_session).award_points(member.user_id, member.season_id, 20, "Défi réussi", challenge_id=challenge.id)
+        await db_session.execute(
+            update(UserStatsRollup).where(UserStatsRollup.user_id == member.user_id).values(total_points=0)
+        )
+        await db_session.commit()
+        
+        drift = await MemberCounters(db_session).reconcile()
+        assert [(row["season_id"], row["total_points"]) for row in drift] == [(None, 20)]
+        totals = await db_session.get(UserStatsRollup, member.user_id, populate_existing=True)
+        assert totals.total_points == 20
+
+
+class TestUserStats:
+    """Test cases for stats served from the rollups."""
+    
+    @pytest.mark.asyncio
+    async def test_season_and_global_stats(self, db_session):
+        member, challenge = await _member(db_session)
+        rival, _ = await _member(db_session, "tom@example.com")
+        scoring = ScoringService(db_session)
+        
+        assert await SubmissionService(db_session).submit(challenge.id, member.user_id, {"answers": []})
+        await scoring.award_points(member.user_id, member.season_id, 20, "Défi réussi", challenge_id=challenge.id)
+        await scoring.award_points(rival.user_id, rival.season_id, 50, "Bonus du jour", score_type=ScoreType.DAILY_BONUS)
+        
+        stats = await scoring.get_user_stats(member.user_id, member.season_id)
+        assert (stats.season_points, stats.total_points) == (20, 20)
+        assert (stats.challenges_completed, stats.challenges_attempted) == (1, 1)
+        assert stats.completion_rate == 1.0
+        assert stats.average_points_per_challenge == 20.0
+        assert (stats.season_rank, stats.global_rank) == (1, 2)
+        assert stats.current_streak == 1
+        assert stats.last_activity is not None
+        
+        overall = await scoring.get_user_stats(rival.user_id)
+        assert (overall.total_points, overall.global_rank, overall.season_rank) == (50, 1, None)
+        
+        assert await scoring.get_user_stats(member.user_id, rival.season_id) is None
+        assert await scoring.get_user_stats(uuid.uuid4()) is None
+    
+    @pytest.mark.asyncio
+    async def test_stats_endpoint_validates_ids(self, db_session):
+        member, _ = await _member(db_session)
+        
+        async def test_db():
+            yield db_session
+        
+        app.dependency_overrides[get_current_user] = lambda: User(id=member.user_id, email="lea@example.com")
+        app.dependency_overrides[get_db] = test_db
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                assert (await client.get(f"/scoring/stats/{member.user_id}")).status_code == 200
+                assert (await client.get("/scoring/stats/not-a-uuid")).status_code == 422
+                response = await client.get(f"/scoring/stats/{member.user_id}", params={"season_id": "été"})
+                assert response.status_code == 422
+                assert (await client.get(f"/scoring/stats/{uuid.uuid4()}")).status_code == 404
+        finally:
+            app.dependency_overrides.clear()
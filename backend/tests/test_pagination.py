@@ -0,0 +1,99 @@
+"""
+Tests for keyset (cursor) pagination
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.season import Season
+from app.models.user import User
+from app.services.season_service import SeasonService
+from app.utils.pagination import (
+    InvalidCursorError, decode_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor,
+)
+
+
+async def _create_seasons(db, count: int, created_at: datetime) -> User:
+    user = User(id=uuid.uuid4(), email="pager@example.com", is_active=True)
+    db.add(user)
+    for i in range(count):
+        db.add(Season(
+            id=uuid.uuid4(),
+            title=f"Season {i}",
+            location="Lac d'Annecy",
+            start_date=date(2025, 7, 1),
+            end_date=date(2025, 7, 31),
+            invitation_code=f"CODE{i:02d}",
+            created_by=user.id,
+            # Every other season shares a timestamp to exercise the id tie-break
+            created_at=created_at - timedelta(minutes=i // 2),
+        ))
+    await db.commit()
+    return user
+
+
+class TestCursorEncoding:
+    """Test cases for cursor encoding."""
+
+    def test_round_trip(self):
+        created_at = datetime(2025, 7, 4, 12, 30, 15, 123456)
+        row_id = uuid.uuid4()
+
+        assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+    def test_invalid_cursor(self):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor")
+
+    def test_rank_round_trip(self):
+        joined_at = datetime(2025, 7, 1, 9, 0, 0, 42)
+        user_id = uuid.uuid4()
+
+        assert decode_rank_cursor(encode_rank_cursor(-5, joined_at, user_id)) == (-5, joined_at, user_id)
+
+    def test_invalid_rank_cursor(self):
+        with pytest.raises(InvalidCursorError):
+            decode_rank_cursor(encode_cursor(datetime(2025, 7, 1), uuid.uuid4()))
+
+
+class TestSeasonPagination:
+    """Test cases for paginated season listing."""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_rows_once(self, db_session):
+        await _create_seasons(db_session, 7, datetime(2025, 7, 4, 12, 0))
+        service = SeasonService(db_session)
+
+        seen, after = [], None
+        while True:
+            page, next_cursor = await service.get_seasons(limit=3, after=after)
+            seen.extend(season.id for season in page)
+            if next_cursor is None:
+                break
+            after = decode_cursor(next_cursor)
+
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+
+    @pytest.mark.asyncio
+    async def test_new_rows_do_not_shift_pages(self, db_session):
+        user = await _create_seasons(db_session, 4, datetime(2025, 7, 4, 12, 0))
+        service = SeasonService(db_session)
+
+        first_page, next_cursor = await service.get_seasons(limit=2)
+        db_session.add(Season(
+            title="Late arrival",
+            location="Lac Léman",
+            start_date=date(2025, 8, 1),
+            end_date=date(2025, 8, 15),
+            invitation_code="LATE01",
+            created_by=user.id,
+            created_at=datetime(2025, 7, 5),
+        ))
+        await db_session.commit()
+        second_page, _ = await service.get_seasons(limit=2, after=decode_cursor(next_cursor))
+
+        assert {s.id for s in first_page}.isdisjoint({s.id for s in second_page})
+        assert len(second_page) == 2
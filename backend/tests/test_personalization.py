@@ -0,0 +1,141 @@
+"""
+Tests for precomputed personalized content
+"""
+
+import uuid
+from datetime import date
+
+import httpx
+import pytest
+
+from app.database import get_db
+from app.main import app
+from app.models.challenge import ChallengeType
+from app.models.scoring import UserCounter
+from app.models.season import Season, SeasonMember
+from app.models.user import User, UserProfile
+from app.schemas.user import UserProfileUpdate
+from app.services.personalization import PersonalizationCache, PersonalizationService, personalization_cache
+from app.services.user_service import UserService
+from app.utils.security import get_current_user
+
+
+@pytest.fixture(autouse=True)
+def _teardown():
+    yield
+    personalization_cache.clear()
+
+
+async def _family_member(db) -> User:
+    user = User(id=uuid.uuid4(), email="lea.martin@example.com")
+    seasons = [
+        Season(
+            id=uuid.uuid4(), title=title, location=location, is_active=active,
+            start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+            invitation_code=code, created_by=user.id,
+        )
+        for title, location, active, code in (("Été 2024", "Lac Léman", False, "LAC001"), ("Été 2025", "Lac d'Annecy", True, "LAC002"))
+    ]
+    db.add_all([user] + seasons)
+    db.add_all([SeasonMember(season_id=season.id, user_id=user.id) for season in seasons])
+    db.add(UserProfile(
+        user_id=user.id, display_name="Léa",
+        challenge_preferences={"photo": True, "sport": True, "difficulty": "hard"},
+    ))
+    db.add_all([
+        UserCounter(user_id=user.id, season_id=seasons[0].id, name="challenges:exploration", value=4),
+        UserCounter(user_id=user.id, season_id=seasons[1].id, name="challenges:exploration", value=4),
+        UserCounter(user_id=user.id, season_id=seasons[1].id, name="challenges:sport", value=2),
+        UserCounter(user_id=user.id, season_id=seasons[1].id, name="challenges", value=10),
+    ])
+    await db.commit()
+    return user
+
+
+class TestPersonalization:
+    """Test cases for building and refreshing content vectors."""
+    
+    @pytest.mark.asyncio
+    async def test_built_from_profile_history_and_season(self, db_session):
+        user = await _family_member(db_session)
+        content = await PersonalizationService(db_session, PersonalizationCache()).get_content(user)
+        
+        # Sport: preferred and completed; photo: preferred; exploration: most completed
+        assert [c["type"] for c in content["personalized_challenges"]] == ["sport", "photo", "exploration"]
+        assert content["recommended_themes"] == ["Sport", "Photo", "Nature"]
+        # "hard", one notch more after ten completed challenges
+        assert content["difficulty_recommendation"] == 5
+        assert {c["location"] for c in content["personalized_challenges"]} == {"Lac d'Annecy"}
+        assert content["motivational_message"] == "Salut Léa, prêt pour de nouveaux défis ?"
+    
+    @pytest.mark.asyncio
+    async def test_answers_from_memory_and_refreshes_in_place(self, db_session):
+        user = await _family_member(db_session)
+        cache = PersonalizationCache()
+        first = await PersonalizationService(db_session, cache).get_content(user)
+        
+        # No database needed once computed
+        memory = PersonalizationService(None, cache)
+        assert await memory.get_content(user) == first
+        
+        for _ in range(12):
+            cache.record_completion(user.id, ChallengeType.QUIZ)
+        assert (await memory.get_content(user))["recommended_themes"] == ["Sport", "Photo", "Culture"]
+        
+        cache.update_profile(user.id, "Léa M.", {"creative": True})
+        content = await memory.get_content(user)
+        assert content["recommended_themes"] == ["Art", "Culture", "Nature"]
+        assert content["difficulty_recommendation"] == 3
+        assert content["motivational_message"].startswith("Salut Léa M.,")
+        
+        # Request preferences apply to one answer only
+        assert (await memory.get_content(user, {"team": True, "creative": False}))["recommended_themes"][0] == "Famille"
+        assert (await memory.get_content(user))["recommended_themes"][0] == "Art"
+    
+    @pytest.mark.asyncio
+    async def test_expired_or_invalidated_entries_are_rebuilt(self, db_session):
+        user = await _family_member(db_session)
+        cache = PersonalizationCache(ttl=0.0)
+        await PersonalizationService(db_session, cache).get_content(user)
+        assert cache.get(user.id) is None
+        
+        cache = PersonalizationCache()
+        await PersonalizationService(db_session, cache).get_content(user)
+        cache.invalidate(user.id)
+        assert cache.get(user.id) is None
+    
+    @pytest.mark.asyncio
+    async def test_profile_edit_updates_stored_and_cached_preferences(self, db_session):
+        user = await _family_member(db_session)
+        await PersonalizationService(db_session).get_content(user)
+        
+        profile = await UserService(db_session).update_user_profile(user.id, UserProfileUpdate(preferences={"quiz": True}))
+        assert profile.challenge_preferences == {"quiz": True}
+        assert personalization_cache.get(user.id).content["recommended_themes"][0] == "Culture"
+
+
+class TestPersonalizedContentEndpoint:
+    """Test cases for POST /ai/personalized-content."""
+    
+    @pytest.mark.asyncio
+    async def test_user_without_profile(self, db_session):
+        user = User(id=uuid.uuid4(), email="papa@example.com")
+        db_session.add(user)
+        await db_session.commit()
+        
+        async def test_db():
+            yield db_session
+        
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_db] = test_db
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.post("/ai/personalized-content")
+                assert response.status_code == 200
+                assert response.json()["motivational_message"] == "Salut papa, prêt pour de nouveaux défis ?"
+                assert response.json()["difficulty_recommendation"] == 2
+                
+                response = await client.post("/ai/personalized-content", json={"sport": True})
+                assert response.json()["recommended_themes"][0] == "Sport"
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,141 @@
+"""
+Tests for micro-batched photo submission analysis
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import date, datetime
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType, SubmissionStatus
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.services.ai_budget import AIBudget
+from app.services.ai_client import AIClient, AIProvider
+from app.services.ai_service import AIService
+from app.services.photo_analysis import PhotoAnalysis
+from app.services.submission_service import SubmissionService
+from app.utils.micro_batch import MicroBatcher
+from tests.conftest import TestSessionLocal
+from tests.fake_ai_provider import FakeAIProvider
+
+
+async def _photo_submissions(db, count: int):
+    users = [User(id=uuid.uuid4(), email=f"membre{i}@example.com") for i in range(count)]
+    season = Season(
+        id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+        start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+        invitation_code="LAC001", created_by=users[0].id,
+    )
+    challenge = Challenge(
+        id=uuid.uuid4(), season_id=season.id, title="Le héron", description="Photographie un héron",
+        type=ChallengeType.PHOTO, base_points=10, challenge_date=datetime(2025, 7, 2),
+    )
+    db.add_all(users + [season, challenge])
+    db.add_all([SeasonMember(season_id=season.id, user_id=user.id) for user in users])
+    await db.commit()
+    
+    service = SubmissionService(db)
+    return [
+        await service.submit(challenge.id, user.id, {"image_url": f"https://photos.example.com/{i}.jpg"})
+        for i, user in enumerate(users)
+    ]
+
+
+def _photo_analysis(fake: FakeAIProvider, **options) -> PhotoAnalysis:
+    client = AIClient(AIProvider("test-key", "gpt-test", "http://fake-ai"), transport=httpx.ASGITransport(app=fake.app))
+    ai = AIService(client, budget=AIBudget(session_factory=TestSessionLocal))
+    return PhotoAnalysis(session_factory=TestSessionLocal, ai=ai, **options)
+
+
+class TestMicroBatcher:
+    """Test cases for size and time flushing."""
+    
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_at_once(self):
+        batches = []
+        
+        async def double(items):
+            batches.append(items)
+            return [item * 2 for item in items]
+        
+        batcher = MicroBatcher(double, max_size=3, max_wait=10.0)
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(3))), 1)
+        assert results == [0, 2, 4]
+        assert batches == [[0, 1, 2]]
+    
+    @pytest.mark.asyncio
+    async def test_partial_batch_is_sent_after_max_wait(self):
+        batches = []
+        
+        async def echo(items):
+            batches.append(items)
+            return items
+        
+        batcher = MicroBatcher(echo, max_size=10, max_wait=0.02)
+        assert await asyncio.gather(batcher.submit("a"), batcher.submit("b")) == ["a", "b"]
+        assert await batcher.submit("c") == "c"
+        assert batches == [["a", "b"], ["c"]]
+    
+    @pytest.mark.asyncio
+    async def test_failures_reach_every_waiter(self):
+        async def fail(items):
+            raise RuntimeError("provider down")
+        
+        async def short(items):
+            return items[:1]
+        
+        for handler, error in ((fail, RuntimeError), (short, ValueError)):
+            batcher = MicroBatcher(handler, max_size=2, max_wait=0.01)
+            results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+            assert all(isinstance(result, error) for result in results)
+
+
+class TestPhotoAnalysis:
+    """Test cases for batched photo validation."""
+    
+    @pytest.mark.asyncio
+    async def test_evening_peak_is_one_request_and_one_update(self, db_session):
+        submissions = await _photo_submissions(db_session, 3)
+        fake = FakeAIProvider()
+        photos = _photo_analysis(fake, max_size=8, max_wait=0.02)
+        
+        outcomes = await asyncio.gather(*(
+            photos.analyze(submission.id, submission.submission_data["image_url"]) for submission in submissions
+        ))
+        assert [outcome["status"] for outcome in outcomes] == [SubmissionStatus.APPROVED] * 3
+        assert len(fake.requests) == 1
+        batch = json.loads(fake.requests[0]["messages"][-1]["content"])["submissions"]
+        assert batch == [f"https://photos.example.com/{i}.jpg" for i in range(3)]
+        
+        rows = (await db_session.execute(
+            select(ChallengeSubmission.validation_score, ChallengeSubmission.auto_validated, ChallengeSubmission.status)
+        )).all()
+        assert rows == [(0.8, True, SubmissionStatus.PENDING)] * 3
+        
+        # Validation reuses the recorded scores
+        service = SubmissionService(db_session, photos)
+        for submission in submissions:
+            assert await service.process_submission(submission.id)
+        assert len(fake.requests) == 1
+        points = await db_session.scalars(select(ChallengeSubmission.points_awarded))
+        assert points.all() == [8, 8, 8]
+        await photos.ai.client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_validation_waits_for_its_batch(self, db_session):
+        submission, = await _photo_submissions(db_session, 1)
+        fake = FakeAIProvider(reply=json.dumps({"results": [{"score": 40, "feedback": "Flou"}]}))
+        photos = _photo_analysis(fake, max_wait=0.01)
+        
+        assert await SubmissionService(db_session, photos).process_submission(submission.id)
+        await db_session.refresh(submission)
+        assert submission.status == SubmissionStatus.NEEDS_REVIEW
+        assert submission.validation_score == 0.4
+        assert submission.validation_notes == "Flou"
+        assert submission.auto_validated is False
+        await photos.ai.client.aclose()
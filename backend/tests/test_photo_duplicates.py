@@ -0,0 +1,178 @@
+"""
+Tests for perceptual hashing and near-duplicate photo detection
+"""
+
+import io
+import json
+import random
+import uuid
+from datetime import date, datetime
+
+import httpx
+import pytest
+from fastapi import UploadFile
+from PIL import Image, ImageOps
+from sqlalchemy import select
+
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType, SubmissionStatus
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.services.ai_budget import AIBudget
+from app.services.ai_client import AIClient, AIProvider
+from app.services.ai_service import AIService
+from app.services.photo_analysis import PhotoAnalysis
+from app.services.photo_duplicates import PhotoDuplicateIndex
+from app.services.submission_service import SubmissionService
+from app.utils.file_upload import file_upload_handler
+from app.utils.image_hash import BKTree, hamming, phash
+from tests.conftest import TestSessionLocal
+from tests.fake_ai_provider import FakeAIProvider
+
+
+def _photo() -> Image.Image:
+    return Image.effect_mandelbrot((640, 480), (-2.0, -1.2, 0.8, 1.2), 60).convert("RGB")
+
+
+def _jpeg(image: Image.Image, quality: int = 85) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_upload_handler, "upload_dir", tmp_path)
+    file_upload_handler._create_directories()
+    return tmp_path
+
+
+async def _upload(content: bytes, filename: str = "photo.jpg") -> dict:
+    return await file_upload_handler.save_file(UploadFile(io.BytesIO(content), filename=filename))
+
+
+class TestImageHash:
+    """Test cases for the perceptual hash and its index."""
+    
+    def test_edited_copies_stay_close(self):
+        original = phash(_photo())
+        resized = phash(Image.open(io.BytesIO(_jpeg(_photo().resize((320, 240)), quality=40))))
+        brighter = phash(_photo().point(lambda value: min(255, value + 20)))
+        assert hamming(original, resized) <= 4
+        assert hamming(original, brighter) <= 4
+        
+        mirrored = phash(ImageOps.mirror(_photo()))
+        other = phash(Image.radial_gradient("L").resize((640, 480)))
+        assert hamming(original, mirrored) > 16
+        assert hamming(original, other) > 16
+    
+    def test_hash_splits_the_ac_coefficients_at_their_median(self):
+        for image in (_photo(), Image.new("L", (64, 64), 255), Image.radial_gradient("L")):
+            value = phash(image)
+            # Brightness (the DC term) is left out; at most half the rest are above
+            assert value & 1 == 0
+            assert value.bit_count() <= 31
+    
+    def test_search_matches_a_full_scan(self):
+        rng = random.Random(7)
+        hashes = [rng.getrandbits(64) for _ in range(2000)]
+        # Some near-copies to find
+        hashes += [h ^ (1 << rng.randrange(64)) for h in hashes[:50]]
+        tree = BKTree()
+        for i, value_hash in enumerate(hashes):
+            tree.add(value_hash, i)
+        assert len(tree) == len(hashes)
+        
+        for probe in hashes[:50]:
+            expected = sorted(i for i, h in enumerate(hashes) if hamming(probe, h) <= 6)
+            assert sorted(i for _, i in tree.search(probe, 6)) == expected
+
+
+class TestUploadHash:
+    """Test cases for hashing photos as they are uploaded."""
+    
+    @pytest.mark.asyncio
+    async def test_hash_is_computed_at_upload(self, upload_dir):
+        info = await _upload(_jpeg(_photo()))
+        assert hamming(int(info["image_hash"], 16), phash(_photo())) <= 4
+        assert file_upload_handler.get_image_hash(info["url"]) == int(info["image_hash"], 16)
+        
+        # Unknown or external photos have no hash
+        missing = info["url"].replace(info["image_hash"], "0" * 16)
+        assert file_upload_handler.get_image_hash(missing) is None
+        assert file_upload_handler.get_image_hash("https://photos.example.com/lac.jpg") is None
+    
+    @pytest.mark.asyncio
+    async def test_undecodable_image_is_stored_without_hash(self, upload_dir):
+        info = await _upload(b"pas une image")
+        assert info["image_hash"] is None
+        assert file_upload_handler.get_image_hash(info["url"]) is None
+
+
+class TestDuplicateSubmissions:
+    """Test cases for flagging reused photos before their analysis."""
+    
+    @pytest.mark.asyncio
+    async def test_reused_photo_goes_to_review_without_analysis(self, db_session, upload_dir):
+        users = [User(id=uuid.uuid4(), email=f"membre{i}@example.com") for i in range(3)]
+        season = Season(
+            id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+            start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+            invitation_code="LAC001", created_by=users[0].id,
+        )
+        challenges = [
+            Challenge(
+                id=uuid.uuid4(), season_id=season.id, title=f"Photo {day}", description="Photographie le lac",
+                type=ChallengeType.PHOTO, base_points=10, challenge_date=datetime(2025, 7, day),
+            )
+            for day in (2, 3)
+        ]
+        db_session.add_all(users + [season] + challenges)
+        db_session.add_all([SeasonMember(season_id=season.id, user_id=user.id) for user in users])
+        await db_session.commit()
+        
+        original = await _upload(_jpeg(_photo()))
+        copy = await _upload(_jpeg(_photo().resize((480, 360)), quality=50))
+        different = await _upload(_jpeg(Image.radial_gradient("L").resize((640, 480)).convert("RGB")))
+        
+        service = SubmissionService(db_session)
+        submissions = [
+            await service.submit(challenges[0].id, users[0].id, {"image_url": original["url"]}),
+            await service.submit(challenges[1].id, users[1].id, {"image_url": copy["url"]}),
+            await service.submit(challenges[1].id, users[2].id, {"image_url": different["url"]}),
+        ]
+        assert all(submission.photo_hash for submission in submissions)
+        
+        fake = FakeAIProvider()
+        client = AIClient(AIProvider("test-key", "gpt-test", "http://fake-ai"), transport=httpx.ASGITransport(app=fake.app))
+        ai = AIService(client, budget=AIBudget(session_factory=TestSessionLocal))
+        photos = PhotoAnalysis(session_factory=TestSessionLocal, ai=ai, max_wait=0.01)
+        service = SubmissionService(db_session, photos, PhotoDuplicateIndex(max_distance=8))
+        for submission in submissions:
+            assert await service.process_submission(submission.id)
+        
+        rows = (await db_session.execute(
+            select(ChallengeSubmission.id, ChallengeSubmission.status, ChallengeSubmission.validation_notes)
+        )).all()
+        outcomes = {row.id: row for row in rows}
+        assert outcomes[submissions[0].id].status == SubmissionStatus.APPROVED
+        assert outcomes[submissions[2].id].status == SubmissionStatus.APPROVED
+        flagged = outcomes[submissions[1].id]
+        assert flagged.status == SubmissionStatus.NEEDS_REVIEW
+        assert str(submissions[0].id) in flagged.validation_notes
+        # Only the two distinct photos were analyzed
+        analyzed = [
+            url for request in fake.requests
+            for url in json.loads(request["messages"][-1]["content"])["submissions"]
+        ]
+        assert analyzed == [original["url"], different["url"]]
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_only_recent_seasons_are_kept(self, db_session):
+        index = PhotoDuplicateIndex(max_seasons=2)
+        first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        
+        for season_id in (first, second, first, third):
+            await index._sync(db_session, season_id)
+        
+        assert list(index._seasons) == [first, third]
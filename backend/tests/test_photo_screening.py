@@ -0,0 +1,137 @@
+"""
+Tests for local photo pre-screening
+"""
+
+import json
+import uuid
+from datetime import date, datetime
+
+import httpx
+import pytest
+from PIL import Image
+
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType, SubmissionStatus
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.services.ai_client import AIClient, AIProvider
+from app.services.ai_service import AIService
+from app.services.photo_analysis import PhotoAnalysis
+from app.services.photo_screening import PhotoScreener
+from app.services.submission_service import SubmissionService
+from tests.conftest import TestSessionLocal
+from tests.fake_ai_provider import FakeAIProvider
+
+# Photo color -> the fake classifier's probability
+PROBABILITIES = {(0, 0, 255): 0.99, (255, 0, 0): 0.01, (0, 255, 0): 0.5}
+
+
+class FakePhotoModel:
+    """Scores photos by their color, recording each batch it gets."""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def predict(self, images):
+        self.batches.append(len(images))
+        return [PROBABILITIES[image.getpixel((0, 0))] for image in images]
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    for name, color in (("lac", (0, 0, 255)), ("selfie", (255, 0, 0)), ("flou", (0, 255, 0))):
+        Image.new("RGB", (32, 24), color).save(tmp_path / f"{name}.png")
+    (tmp_path / "abime.jpg").write_bytes(b"pas une image")
+    return tmp_path
+
+
+def _ai_service(fake: FakeAIProvider, screener: PhotoScreener) -> AIService:
+    client = AIClient(AIProvider("test-key", "gpt-test", "http://fake-ai"), transport=httpx.ASGITransport(app=fake.app))
+    return AIService(client, screener=screener)
+
+
+class TestPhotoScreener:
+    """Test cases for the local classifier stage."""
+    
+    @pytest.mark.asyncio
+    async def test_scores_readable_local_photos(self, upload_dir):
+        model = FakePhotoModel()
+        screener = PhotoScreener(model=model, upload_dir=upload_dir)
+        
+        probabilities = await screener.screen([
+            "/uploads/lac.png", "/uploads/selfie.png", "/uploads/abime.jpg",
+            "/uploads/absente.png", "/uploads/../secret.png", "https://photos.example.com/lac.png",
+        ])
+        assert probabilities == [0.99, 0.01, None, None, None, None]
+        assert model.batches == [2]
+        screener.close()
+    
+    @pytest.mark.asyncio
+    async def test_disabled_without_model(self, upload_dir):
+        screener = PhotoScreener(model_path=None, upload_dir=upload_dir)
+        assert not screener.enabled
+        assert await screener.screen(["/uploads/lac.png"]) == [None]
+    
+    @pytest.mark.asyncio
+    async def test_model_failure_escalates(self, upload_dir):
+        class BrokenModel:
+            def predict(self, images):
+                raise RuntimeError("bad model")
+        
+        screener = PhotoScreener(model=BrokenModel(), upload_dir=upload_dir)
+        assert await screener.screen(["/uploads/lac.png"]) == [None]
+        screener.close()
+    
+    def test_verdict(self):
+        screener = PhotoScreener(approve_above=0.9, reject_below=0.1, model=FakePhotoModel())
+        assert [screener.verdict(p) for p in (0.95, 0.9, 0.5, 0.1, 0.02, None)] == [True, True, None, False, False, None]
+
+
+class TestPreScreenedAnalysis:
+    """Test cases for pre-screening ahead of the AI provider."""
+    
+    @pytest.mark.asyncio
+    async def test_only_uncertain_photos_reach_the_provider(self, upload_dir):
+        fake = FakeAIProvider()
+        screener = PhotoScreener(approve_above=0.9, reject_below=0.1, model=FakePhotoModel(), upload_dir=upload_dir)
+        service = _ai_service(fake, screener)
+        
+        analyses = await service.analyze_submissions(["/uploads/lac.png", "/uploads/flou.png", "/uploads/selfie.png"])
+        assert [analysis.get("screening") for analysis in analyses] == ["approved", None, "rejected"]
+        assert [analysis["score"] for analysis in analyses] == [99, 80, 1]
+        assert len(fake.requests) == 1
+        assert json.loads(fake.requests[0]["messages"][-1]["content"]) == {"submissions": ["/uploads/flou.png"]}
+        
+        # Nothing left to escalate: no provider call at all
+        await service.analyze_submissions(["/uploads/lac.png", "/uploads/selfie.png"])
+        assert len(fake.requests) == 1
+        await service.client.aclose()
+        screener.close()
+    
+    @pytest.mark.asyncio
+    async def test_rejected_photo_is_rejected_without_review(self, db_session, upload_dir):
+        user = User(id=uuid.uuid4(), email="membre@example.com")
+        season = Season(
+            id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+            start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+            invitation_code="LAC001", created_by=user.id,
+        )
+        challenge = Challenge(
+            id=uuid.uuid4(), season_id=season.id, title="Le héron", description="Photographie un héron",
+            type=ChallengeType.PHOTO, base_points=10, challenge_date=datetime(2025, 7, 2),
+        )
+        db_session.add_all([user, season, challenge, SeasonMember(season_id=season.id, user_id=user.id)])
+        await db_session.commit()
+        submission = await SubmissionService(db_session).submit(challenge.id, user.id, {"image_url": "/uploads/selfie.png"})
+        
+        fake = FakeAIProvider()
+        screener = PhotoScreener(model=FakePhotoModel(), upload_dir=upload_dir)
+        photos = PhotoAnalysis(session_factory=TestSessionLocal, ai=_ai_service(fake, screener), max_wait=0.01)
+        assert await SubmissionService(db_session, photos).process_submission(submission.id)
+        
+        submission = await db_session.get(ChallengeSubmission, submission.id, populate_existing=True)
+        assert submission.status == SubmissionStatus.REJECTED
+        assert submission.auto_validated is True
+        assert submission.points_awarded == 0
+        assert fake.requests == []
+        await photos.ai.client.aclose()
+        screener.close()
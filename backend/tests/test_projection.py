@@ -0,0 +1,100 @@
+"""
+Tests for column projections into response schemas
+"""
+
+import json
+import uuid
+from datetime import date, datetime
+
+import pytest
+
+from app.models.challenge import Challenge, ChallengeType
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.schemas.challenge import ChallengeResponse
+from app.schemas.season import SeasonResponse
+from app.services.challenge_service import ChallengeService
+from app.services.season_service import SeasonService, season_projection
+from app.utils.responses import dumps
+
+
+async def _season(db) -> Season:
+    users = [User(id=uuid.uuid4(), email=f"member{i}@example.com") for i in range(3)]
+    season = Season(
+        id=uuid.uuid4(),
+        title="Été au lac",
+        location="Lac d'Annecy",
+        latitude=45.86,
+        longitude=6.17,
+        start_date=date(2025, 7, 1),
+        end_date=date(2025, 7, 31),
+        invitation_code="LAC001",
+        created_by=users[0].id,
+        created_at=datetime(2025, 6, 20, 9, 30),
+    )
+    db.add_all(users + [season])
+    db.add_all([
+        SeasonMember(season_id=season.id, user_id=user.id, is_active=user is not users[2])
+        for user in users
+    ])
+    await db.commit()
+    return season
+
+
+def _validated(schema, data: dict) -> dict:
+    """The document FastAPI would have produced by validating the response."""
+    return json.loads(schema.model_validate(data).model_dump_json())
+
+
+class TestSeasonProjection:
+    """Test cases for season response projections."""
+    
+    @pytest.mark.asyncio
+    async def test_matches_validated_response(self, db_session):
+        season = await _season(db_session)
+        
+        projected = await SeasonService(db_session).get_season_response(season.id)
+        
+        document = json.loads(dumps(projected))
+        assert document["member_count"] == 2
+        assert document == _validated(SeasonResponse, document)
+        assert document["id"] == str(season.id)
+        assert document["start_date"] == "2025-07-01T00:00:00"
+    
+    @pytest.mark.asyncio
+    async def test_page_and_object_agree(self, db_session):
+        season = await _season(db_session)
+        
+        page, next_cursor = await SeasonService(db_session).get_seasons(limit=10)
+        
+        assert next_cursor is None
+        assert dumps(page[0]) == dumps(season_projection.from_object(season, member_count=2))
+    
+    @pytest.mark.asyncio
+    async def test_missing_season(self, db_session):
+        assert await SeasonService(db_session).get_season_response(uuid.uuid4()) is None
+
+
+class TestChallengeProjection:
+    """Test cases for challenge response projections."""
+    
+    @pytest.mark.asyncio
+    async def test_matches_validated_response(self, db_session):
+        season = await _season(db_session)
+        challenge = Challenge(
+            id=uuid.uuid4(),
+            season_id=season.id,
+            title="Quiz du lac",
+            description="Trois questions sur le lac",
+            type=ChallengeType.QUIZ,
+            content={"questions": []},
+            challenge_date=datetime(2025, 7, 2),
+        )
+        db_session.add(challenge)
+        await db_session.commit()
+        
+        challenges, _ = await ChallengeService(db_session).get_season_challenges(season.id)
+        
+        document = json.loads(dumps(challenges[0]))
+        assert document["type"] == "quiz"
+        assert document == _validated(ChallengeResponse, document)
@@ -0,0 +1,173 @@
+"""
+Query-plan audit: service queries must not fall back to full table scans
+"""
+
+import re
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, insert, text
+
+from app.database import Base
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType
+from app.models.scoring import Score
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.services.challenge_service import ChallengeService
+from app.services.scoring_service import ScoringService
+from app.services.season_service import SeasonService
+from app.utils.pagination import decode_cursor
+from tests.conftest import TestSessionLocal, test_engine
+
+# Large enough for the SQLite planner to prefer indexes once ANALYZE has run
+USERS = 40
+SEASONS = 200
+CHALLENGES_PER_SEASON = 5
+SCORES_PER_USER = 100
+
+# A plain "SCAN <table>" (no USING INDEX) is a full table scan
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+@pytest_asyncio.fixture
+async def large_fixture():
+    """Populate a schema with enough rows to make plans meaningful."""
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    users = [uuid.uuid4() for _ in range(USERS)]
+    seasons = [uuid.uuid4() for _ in range(SEASONS)]
+    challenges = [uuid.uuid4() for _ in range(SEASONS * CHALLENGES_PER_SEASON)]
+    base = datetime(2025, 7, 1)
+
+    async with test_engine.begin() as conn:
+        await conn.execute(insert(User), [
+            {"id": u, "email": f"user{i}@example.com"} for i, u in enumerate(users)
+        ])
+        await conn.execute(insert(Season), [
+            {
+                "id": s, "title": f"Season {i}", "location": "Lac d'Annecy",
+                "start_date": date(2025, 7, 1), "end_date": date(2025, 7, 31),
+                "invitation_code": f"S{i:05d}", "created_by": users[i % USERS],
+                "created_at": base + timedelta(minutes=i),
+            }
+            for i, s in enumerate(seasons)
+        ])
+        await conn.execute(insert(SeasonMember), [
+            {"season_id": s, "user_id": users[(i + k) % USERS]}
+            for i, s in enumerate(seasons) for k in range(4)
+        ])
+        await conn.execute(insert(Challenge), [
+            {
+                "id": c, "title": f"Challenge {i}", "description": "Quiz du lac",
+                "type": ChallengeType.QUIZ, "challenge_date": base + timedelta(days=i % 30),
+                "season_id": seasons[i // CHALLENGES_PER_SEASON],
+                "created_at": base + timedelta(minutes=i),
+            }
+            for i, c in enumerate(challenges)
+        ])
+        await conn.execute(insert(ChallengeSubmission), [
+            {
+                "challenge_id": c, "user_id": users[(i + k) % USERS],
+                "submission_data": {"answers": [0, 1, 2]},
+                "created_at": base + timedelta(minutes=i, seconds=k),
+            }
+            for i, c in enumerate(challenges) for k in range(2)
+        ])
+        await conn.execute(insert(Score), [
+            {
+                "user_id": u, "season_id": seasons[(i + k) % SEASONS], "points": 10,
+                "score_type": "challenge_completion", "description": "Quiz",
+                "score_date": date(2025, 7, 1) + timedelta(days=k % 30),
+                "created_at": base + timedelta(minutes=k),
+            }
+            for i, u in enumerate(users) for k in range(SCORES_PER_USER)
+        ])
+        await conn.execute(text("ANALYZE"))
+
+    yield {"users": users, "seasons": seasons, "challenges": challenges}
+
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+class QueryRecorder:
+    """Record SELECT statements executed on the test engine."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(test_engine.sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(test_engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+
+async def assert_no_full_scans(statements):
+    """Run EXPLAIN QUERY PLAN on each statement and fail on full table scans."""
+    tables = set(Base.metadata.tables)
+    offenders = []
+    async with test_engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            for row in plan.fetchall():
+                match = FULL_SCAN.match(row[-1])
+                if match and match.group(1) in tables:
+                    offenders.append(f"{row[-1]}  <-  {' '.join(statement.split())}")
+    assert not offenders, "Sequential scans found:\n" + "\n".join(offenders)
+
+
+class TestQueryPlans:
+    """Audit the plans of hot service queries against a large fixture."""
+
+    @pytest.mark.asyncio
+    async def test_season_queries(self, large_fixture):
+        async with TestSessionLocal() as db:
+            service = SeasonService(db)
+            with QueryRecorder() as recorder:
+                _, next_cursor = await service.get_seasons(limit=20)
+                await service.get_seasons(limit=20, after=decode_cursor(next_cursor))
+                await service.get_season_by_id(large_fixture["seasons"][7])
+                await service.get_season_response(large_fixture["seasons"][7])
+
+        await assert_no_full_scans(recorder.statements)
+
+    @pytest.mark.asyncio
+    async def test_challenge_queries(self, large_fixture):
+        async with TestSessionLocal() as db:
+            service = ChallengeService(db)
+            with QueryRecorder() as recorder:
+                await service.get_season_challenges(large_fixture["seasons"][3], limit=2)
+                await service.get_challenge_submissions(large_fixture["challenges"][11], limit=1)
+                await service.get_challenge_by_id(large_fixture["challenges"][5])
+                await service.get_challenge_response(large_fixture["challenges"][5])
+
+        await assert_no_full_scans(recorder.statements)
+
+    @pytest.mark.asyncio
+    async def test_scoring_queries(self, large_fixture):
+        async with TestSessionLocal() as db:
+            service = ScoringService(db)
+            with QueryRecorder() as recorder:
+                await service.get_score_history(
+                    large_fixture["users"][0], large_fixture["seasons"][0], limit=10
+                )
+
+        await assert_no_full_scans(recorder.statements)
+
+    @pytest.mark.asyncio
+    async def test_join_season_rejects_duplicates(self, large_fixture):
+        season_id = large_fixture["seasons"][0]
+        newcomer = large_fixture["users"][20]
+        async with TestSessionLocal() as db:
+            service = SeasonService(db)
+            assert await service.join_season(season_id, newcomer) is not None
+            assert await service.join_season(season_id, newcomer) is None
@@ -0,0 +1,97 @@
+"""
+Tests for compiled quiz answer keys
+"""
+
+import uuid
+from datetime import date, datetime
+
+import pytest
+
+from app.models.challenge import Challenge, ChallengeType
+from app.models.season import Season
+from app.models.user import User
+from app.schemas.challenge import ChallengeUpdate
+from app.services.challenge_service import ChallengeService
+from app.utils.quiz_keys import AnswerKey, AnswerKeyCache
+
+
+def _quiz(*correct):
+    return {"questions": [{"question": f"Q{i}", "options": ["a", "b", "c"], "correct": c} for i, c in enumerate(correct)]}
+
+
+class TestAnswerKey:
+    """Test cases for grading with a compiled key."""
+    
+    def test_count_correct(self):
+        key = AnswerKey.compile(_quiz(0, 2, 1, 0))
+        
+        assert key.count_correct([0, 2, 1, 0]) == 4
+        assert key.count_correct([0, 1, 1]) == 2
+        assert key.count_correct([]) == 0
+        assert key.count_correct(None) == 0
+    
+    def test_malformed_answers_never_match(self):
+        key = AnswerKey.compile({"questions": [{"correct": 0}, {"options": ["x"]}, {"correct": 1}]})
+        
+        assert key.count_correct(["0", None, 1]) == 1
+        assert key.count_correct([True, 0, 1]) == 1
+        assert key.count_correct([0, 254, 255]) == 1
+        assert not key.is_correct(1, None)
+        assert key.is_correct(2, 1)
+    
+    def test_malformed_content_compiles(self):
+        key = AnswerKey.compile({"questions": [{"correct": 0}, "Q2", None, {"correct": 1}]})
+        
+        assert key.size == 4
+        assert key.count_correct([0, 0, 0, 1]) == 2
+        assert key.count_correct(7) == 0
+        assert key.count_correct({"0": 0}) == 0
+        assert AnswerKey.compile({"questions": "Q1"}).size == 0
+        assert AnswerKey.compile(["Q1"]).size == 0
+        assert not key.is_correct(5, 1)
+    
+    def test_grade_many(self):
+        key = AnswerKey.compile(_quiz(1, 1, 2))
+        
+        assert key.grade_many([[1, 1, 2], [0, 1, 2], [2, 2, 2]]) == [3, 2, 1]
+    
+    def test_cache_is_bounded_and_keyed_by_version(self):
+        cache = AnswerKeyCache(maxsize=2)
+        v1, v2 = datetime(2025, 7, 1), datetime(2025, 7, 2)
+        cache.put("a", v1, AnswerKey(b"\x00"))
+        cache.put("b", v1, AnswerKey(b"\x01"))
+        
+        assert cache.get("a", v2) is None
+        assert cache.get("a", v1) is not None
+        cache.put("c", v1, AnswerKey(b"\x02"))
+        assert cache.get("b", v1) is None
+        assert cache.get("a", v1) is not None
+
+
+class TestChallengeAnswerKeys:
+    """Test cases for answer keys of stored challenges."""
+    
+    @pytest.mark.asyncio
+    async def test_edit_invalidates_key(self, db_session):
+        user = User(id=uuid.uuid4(), email="quizmaster@example.com")
+        season = Season(
+            id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+            start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+            invitation_code="LAC001", created_by=user.id,
+        )
+        challenge = Challenge(
+            id=uuid.uuid4(), season_id=season.id, title="Quiz", description="Quiz du lac",
+            type=ChallengeType.QUIZ, content=_quiz(0, 1), challenge_date=datetime(2025, 7, 2),
+        )
+        db_session.add_all([user, season, challenge])
+        await db_session.commit()
+        service = ChallengeService(db_session)
+        
+        answers = {"camille": [0, 1], "lou": [0, 0]}
+        assert await service.grade_quiz_batch(challenge.id, answers) == {"camille": 2, "lou": 1}
+        assert await service.get_answer_key(challenge.id) is await service.get_answer_key(challenge.id)
+        
+        await service.update_challenge(challenge.id, ChallengeUpdate(content=_quiz(0, 0)))
+        
+        assert await service.grade_quiz_batch(challenge.id, answers) == {"camille": 1, "lou": 2}
+        assert await service.grade_quiz_batch(uuid.uuid4(), answers) is None
@@ -0,0 +1,242 @@
+"""
+Tests for live multiplayer quiz rounds
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType, SubmissionStatus
+from app.models.scoring import Score, ScoreType
+from app.models.season import Season
+from app.models.user import User
+from app.services import quiz_round_service
+from app.services.quiz_round_service import QuizRound, QuizRoundManager, answers_channel, events_channel
+from app.utils.pubsub import Broker
+from app.utils.quiz_keys import AnswerKey
+from tests.conftest import TestSessionLocal
+
+QUIZ = {
+    "questions": [
+        {"question": "Altitude du lac ?", "options": ["447 m", "1200 m"], "correct": 0},
+        {"question": "Poisson emblématique ?", "options": ["Requin", "Omble"], "correct": 1},
+    ]
+}
+
+
+def _challenge(season_id=None) -> Challenge:
+    return Challenge(
+        id=uuid.uuid4(),
+        season_id=season_id or uuid.uuid4(),
+        title="Quiz du lac",
+        description="Deux questions",
+        type=ChallengeType.QUIZ,
+        content=QUIZ,
+        base_points=10,
+        bonus_points=4,
+        challenge_date=datetime(2025, 7, 2),
+    )
+
+
+async def _season_with_quiz(db):
+    player = User(id=uuid.uuid4(), email="lea@example.com")
+    season = Season(
+        id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+        start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+        invitation_code="LAC001", created_by=player.id,
+    )
+    challenge = _challenge(season.id)
+    db.add_all([player, season, challenge])
+    await db.commit()
+    return player, season, challenge
+
+
+def _manager(broker: Broker) -> QuizRoundManager:
+    return QuizRoundManager(
+        broker=broker, session_factory=TestSessionLocal,
+        question_seconds=2, lobby_seconds=0.05, pause_seconds=0,
+    )
+
+
+async def _solo_round(manager: QuizRoundManager, season_id, challenge_id, user_id):
+    """Play a round in which the only player answers everything right."""
+    with manager.broker.subscribe(events_channel(season_id)) as events:
+        async def next_event(event_type):
+            while (await events.get(timeout=2)).type != event_type:
+                pass
+        
+        task = await manager.start_round(season_id, challenge_id)
+        await next_event("round_started")
+        answers = answers_channel(season_id)
+        await manager.broker.publish(answers, {"type": "join", "user_id": str(user_id)})
+        for question, option in enumerate((0, 1)):
+            await next_event("question")
+            await manager.broker.publish(answers, {
+                "type": "answer", "user_id": str(user_id), "question": question, "answer": option,
+            })
+        return (await asyncio.wait_for(task, timeout=2))[str(user_id)]
+
+
+class TestQuizRound:
+    """Test cases for first-correct ordering within a round."""
+    
+    def _round(self) -> QuizRound:
+        quiz_round = QuizRound("season", _challenge(), AnswerKey.compile(QUIZ), question_seconds=10)
+        for user_id in ("papa", "maman", "lou"):
+            quiz_round.join(user_id)
+        return quiz_round
+    
+    def test_question_event_hides_answer(self):
+        event = self._round().open_next(now=100.0)
+        
+        assert event["options"] == ["447 m", "1200 m"]
+        assert "correct" not in event
+    
+    def test_first_correct_ordering_and_bonuses(self):
+        quiz_round = self._round()
+        quiz_round.open_next(now=100.0)
+        
+        assert quiz_round.record_answer("lou", 0, 1, now=100.5)
+        assert quiz_round.record_answer("maman", 0, 0, now=101.0)
+        assert quiz_round.record_answer("papa", 0, 0, now=101.2)
+        # Only the first answer counts
+        assert not quiz_round.record_answer("lou", 0, 0, now=101.5)
+        assert quiz_round.all_answered()
+        
+        result = quiz_round.question_result()
+        assert [(entry["user_id"], entry["bonus"]) for entry in result["order"]] == [("maman", 5), ("papa", 3)]
+        assert result["order"][0]["elapsed_ms"] == 1000
+    
+    def test_late_and_stray_answers_are_ignored(self):
+        quiz_round = self._round()
+        quiz_round.open_next(now=100.0)
+        
+        assert not quiz_round.record_answer("papa", 0, 0, now=111.0)
+        assert not quiz_round.record_answer("papa", 1, 1, now=101.0)
+        assert not quiz_round.record_answer("stranger", 0, 0, now=101.0)
+    
+    def test_bonuses_add_up_over_questions(self):
+        quiz_round = self._round()
+        quiz_round.open_next(now=0.0)
+        for user_id in ("papa", "maman", "lou"):
+            quiz_round.record_answer(user_id, 0, 0, now=1.0)
+        quiz_round.open_next(now=10.0)
+        quiz_round.record_answer("lou", 1, 1, now=11.0)
+        
+        assert quiz_round.speed_bonuses() == {"papa": 5, "maman": 3, "lou": 6}
+        assert quiz_round.answer_sets()["maman"] == [0, None]
+
+
+class TestQuizRoundManager:
+    """Test cases for running a round over the broker."""
+    
+    @pytest.mark.asyncio
+    async def test_round_awards_speed_bonuses_in_one_write(self, db_session):
+        papa = User(id=uuid.uuid4(), email="papa@example.com")
+        maman = User(id=uuid.uuid4(), email="maman@example.com")
+        season = Season(
+            id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+            start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+            invitation_code="LAC001", created_by=papa.id,
+        )
+        challenge = _challenge(season.id)
+        db_session.add_all([papa, maman, season, challenge])
+        await db_session.commit()
+        
+        broker = Broker()
+        manager = QuizRoundManager(
+            broker=broker, session_factory=TestSessionLocal,
+            question_seconds=2, lobby_seconds=0.05, pause_seconds=0,
+        )
+        events = broker.subscribe(events_channel(season.id))
+        answers = answers_channel(season.id)
+        
+        async def next_event(event_type):
+            while True:
+                event = await events.get(timeout=2)
+                if event.type == event_type:
+                    return json.loads(event.text)
+        
+        task = await manager.start_round(season.id, challenge.id)
+        assert await manager.start_round(season.id, challenge.id) is None
+        await next_event("round_started")
+        for user in (papa, maman):
+            await broker.publish(answers, {"type": "join", "user_id": str(user.id)})
+        
+        async def answer(user, question, option):
+            await broker.publish(answers, {
+                "type": "answer", "user_id": str(user.id), "question": question, "answer": option,
+            })
+        
+        # Maman is first correct on question 0; on question 1 only papa is right
+        await next_event("question")
+        await answer(maman, 0, 0)
+        await answer(papa, 0, 0)
+        await next_event("question_result")
+        await next_event("question")
+        await answer(papa, 1, 1)
+        await answer(maman, 1, 0)
+        await next_event("question_result")
+        
+        results = await asyncio.wait_for(task, timeout=2)
+        
+        assert results[str(papa.id)] == {"correct": 2, "points": 14, "speed_bonus": 8}
+        assert results[str(maman.id)] == {"correct": 1, "points": 5, "speed_bonus": 5}
+        assert not manager.is_running(season.id)
+        
+        bonuses = await db_session.execute(
+            select(Score.user_id, Score.points).where(Score.score_type == ScoreType.SPEED_BONUS.value)
+        )
+        assert dict(bonuses.all()) == {papa.id: 8, maman.id: 5}
+        statuses = await db_session.execute(select(ChallengeSubmission.status))
+        assert set(statuses.scalars()) == {SubmissionStatus.APPROVED}
+    
+    @pytest.mark.asyncio
+    async def test_replayed_round_earns_nothing(self, db_session):
+        player, season, challenge = await _season_with_quiz(db_session)
+        manager = _manager(Broker())
+        
+        first = await _solo_round(manager, season.id, challenge.id, player.id)
+        replay = await _solo_round(manager, season.id, challenge.id, player.id)
+        
+        assert first == {"correct": 2, "points": 14, "speed_bonus": 10}
+        assert replay == {"correct": 2, "points": 0, "speed_bonus": 0}
+        total = await db_session.scalar(select(func.sum(Score.points)).where(Score.user_id == player.id))
+        assert total == 24
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_starts_run_one_round(self, db_session):
+        _, season, challenge = await _season_with_quiz(db_session)
+        manager = _manager(Broker())
+        manager.question_seconds = 0.01
+        
+        tasks = await asyncio.gather(*(manager.start_round(season.id, challenge.id) for _ in range(2)))
+        
+        started = [task for task in tasks if task is not None]
+        assert len(started) == 1
+        await asyncio.wait_for(started[0], timeout=2)
+        assert not manager.is_running(season.id)
+        # A start that fails releases the season
+        assert await manager.start_round(season.id, uuid.uuid4()) is None
+        assert not manager.is_running(season.id)
+    
+    @pytest.mark.asyncio
+    async def test_submission_made_during_the_round_stands(self, db_session, monkeypatch):
+        player, season, challenge = await _season_with_quiz(db_session)
+        db_session.add(ChallengeSubmission(
+            challenge_id=challenge.id, user_id=player.id, submission_data={"answers": [1, 0]},
+        ))
+        await db_session.commit()
+        # As if it was recorded after the round looked for earlier submissions
+        monkeypatch.setattr(quiz_round_service, "ACTIVE_STATUSES", (SubmissionStatus.APPROVED,))
+        
+        result = await _solo_round(_manager(Broker()), season.id, challenge.id, player.id)
+        
+        assert result == {"correct": 2, "points": 0, "speed_bonus": 0}
+        statuses = await db_session.execute(select(ChallengeSubmission.status))
+        assert statuses.scalars().all() == [SubmissionStatus.PENDING]
+        assert await db_session.scalar(select(func.count()).select_from(Score)) == 0
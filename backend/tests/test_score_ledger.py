@@ -0,0 +1,69 @@
+"""
+Tests for the score ledger archival (SQLite fallback)
+"""
+
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.scoring import Score, ScoreArchive
+from app.models.season import Season
+from app.models.user import User
+from app.services.score_ledger_service import ScoreLedgerService
+
+
+async def _season_with_scores(db, completed: bool) -> Season:
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex[:8]}@example.com")
+    season = Season(
+        id=uuid.uuid4(),
+        title="Été au lac",
+        location="Lac d'Annecy",
+        start_date=date(2025, 7, 1),
+        end_date=date(2025, 7, 31),
+        invitation_code=uuid.uuid4().hex[:6].upper(),
+        created_by=user.id,
+        is_completed=completed,
+    )
+    db.add_all([user, season])
+    db.add_all([
+        Score(user_id=user.id, season_id=season.id, points=10 * (i + 1),
+              score_type="challenge_completion", description=f"Défi {i}")
+        for i in range(3)
+    ])
+    await db.commit()
+    return season
+
+
+class TestScoreArchival:
+    """Test cases for moving completed seasons to cold storage."""
+    
+    @pytest.mark.asyncio
+    async def test_archive_completed_season(self, db_session, tmp_path):
+        season = await _season_with_scores(db_session, completed=True)
+        ledger = ScoreLedgerService(db_session)
+        ledger.archive_dir = tmp_path
+        
+        archive = await ledger.archive_season(season.id)
+        
+        assert archive.row_count == 3
+        assert archive.points_total == 60
+        remaining = await db_session.execute(
+            select(func.count()).select_from(Score).where(Score.season_id == season.id)
+        )
+        assert remaining.scalar() == 0
+        
+        replayed = [row async for row in ledger.iter_archived_scores(season.id)]
+        assert [row["points"] for row in replayed] == [10, 20, 30]
+    
+    @pytest.mark.asyncio
+    async def test_active_season_is_not_archived(self, db_session, tmp_path):
+        season = await _season_with_scores(db_session, completed=False)
+        ledger = ScoreLedgerService(db_session)
+        ledger.archive_dir = tmp_path
+        
+        assert await ledger.archive_season(season.id) is None
+        assert await ledger.archive_completed_seasons() == []
+        archives = await db_session.execute(select(func.count()).select_from(ScoreArchive))
+        assert archives.scalar() == 0
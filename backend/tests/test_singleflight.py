@@ -0,0 +1,135 @@
+"""
+Tests for coalescing concurrent identical calls
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_client import AIClient, AIProvider
+from app.services.ai_service import AIService
+from app.utils import geo
+from app.utils.singleflight import SingleFlight
+from tests.fake_ai_provider import FakeAIProvider
+
+
+class _Call:
+    def __init__(self, result="ok", error=None):
+        self.result = result
+        self.error = error
+        self.started = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+    
+    async def __call__(self):
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class TestSingleFlight:
+    """Test cases for sharing, errors and cancellation."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        flights, call = SingleFlight(), _Call()
+        waiters = [asyncio.create_task(flights.do("lac", call)) for _ in range(4)]
+        await asyncio.sleep(0)
+        call.release.set()
+        
+        assert await asyncio.gather(*waiters) == ["ok"] * 4
+        assert call.started == 1
+        assert flights.shared == 3
+        assert len(flights) == 0
+        
+        assert await flights.do("lac", call) == "ok"
+        assert call.started == 2
+    
+    @pytest.mark.asyncio
+    async def test_errors_are_shared(self):
+        flights, call = SingleFlight(), _Call(error=ValueError("boom"))
+        waiters = [asyncio.create_task(flights.do("lac", call)) for _ in range(2)]
+        await asyncio.sleep(0)
+        call.release.set()
+        
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert call.started == 1
+    
+    @pytest.mark.asyncio
+    async def test_survives_one_waiter_leaving(self):
+        flights, call = SingleFlight(), _Call()
+        leaving = asyncio.create_task(flights.do("lac", call))
+        staying = asyncio.create_task(flights.do("lac", call))
+        await asyncio.sleep(0)
+        
+        leaving.cancel()
+        await asyncio.sleep(0)
+        call.release.set()
+        assert await staying == "ok"
+        assert leaving.cancelled()
+        assert not call.cancelled
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_when_every_waiter_leaves(self):
+        flights, call = SingleFlight(), _Call()
+        waiters = [asyncio.create_task(flights.do("lac", call)) for _ in range(2)]
+        await asyncio.sleep(0)
+        
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert call.cancelled
+        assert len(flights) == 0
+        
+        fresh = _Call()
+        fresh.release.set()
+        assert await flights.do("lac", fresh) == "ok"
+
+
+class TestCoalescedCalls:
+    """Test cases for the coalesced AI and geocoding calls."""
+    
+    @pytest.mark.asyncio
+    async def test_family_opening_the_app_together(self):
+        fake = FakeAIProvider(delay=0.05)
+        client = AIClient(AIProvider("test-key", "gpt-test", "http://fake-ai"), transport=httpx.ASGITransport(app=fake.app))
+        service = AIService(client, AIResponseCache(path=None))
+        
+        contents = await asyncio.gather(*(
+            service.generate_challenge_content("Coucher de soleil", 2, "Lac d'Annecy") for _ in range(4)
+        ))
+        assert len(fake.requests) == 1
+        assert all(content == contents[0] for content in contents)
+        
+        contents[0]["title"] = "Modifié"
+        assert contents[1]["title"] == "Défi du lac"
+        assert service.cache.lookups["miss"] == 4
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_location_lookups(self, monkeypatch):
+        lookups = []
+        
+        async def reverse_geocode(latitude, longitude):
+            lookups.append((latitude, longitude))
+            await asyncio.sleep(0.01)
+            return geo.LocationInfo(latitude, longitude)
+        
+        monkeypatch.setattr(geo, "_reverse_geocode", reverse_geocode)
+        results = await asyncio.gather(
+            geo.get_location_info(45.899247, 6.129384),
+            geo.get_location_info(45.8992471, 6.1293839),
+            geo.get_location_info(45.7, 5.9),
+        )
+        assert len(lookups) == 2
+        assert results[0] is results[1]
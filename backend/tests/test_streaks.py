@@ -0,0 +1,119 @@
+"""
+Tests for incremental streaks and streak bonuses
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.scoring import Score, ScoreType, UserStreak, Badge, BadgeCategory, UserBadge
+from app.models.season import Season
+from app.models.user import User, UserProfile
+from app.services.badge_service import badge_rules
+from app.services.streak_service import StreakService, STREAK_BONUS_POINTS, advance, local_date
+
+START = datetime(2025, 7, 1, 10, 0)
+
+
+async def _user_and_season(db, timezone: str = "Europe/Paris"):
+    user = User(id=uuid.uuid4(), email="lea@example.com")
+    season = Season(
+        id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+        start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+        invitation_code="LAC001", created_by=user.id,
+    )
+    profile = UserProfile(user_id=user.id, display_name="Léa", timezone=timezone)
+    db.add_all([user, season, profile])
+    await db.commit()
+    return user, season
+
+
+async def _bonuses(db, user_id):
+    result = await db.execute(
+        select(Score).where(Score.user_id == user_id, Score.score_type == ScoreType.STREAK_BONUS.value)
+    )
+    return result.scalars().all()
+
+
+class TestStreakRules:
+    """Test cases for day arithmetic."""
+    
+    def test_advance(self):
+        day = date(2025, 7, 2)
+        assert advance(0, 0, None, day) == (1, 1)
+        assert advance(3, 5, day - timedelta(days=1), day) == (4, 5)
+        assert advance(3, 5, day - timedelta(days=2), day) == (1, 5)
+        assert advance(3, 5, day, day) is None
+    
+    def test_local_date_uses_timezone(self):
+        # 23:30 UTC is already the next day in Paris
+        moment = datetime(2025, 7, 1, 23, 30)
+        assert local_date(moment, "UTC") == date(2025, 7, 1)
+        assert local_date(moment, "Europe/Paris") == date(2025, 7, 2)
+        assert local_date(moment, "Nowhere/Unknown") == date(2025, 7, 1)
+
+
+class TestStreakService:
+    """Test cases for incremental streak updates."""
+    
+    @pytest.mark.asyncio
+    async def test_sixth_day_earns_bonus_and_badge(self, db_session):
+        user, season = await _user_and_season(db_session)
+        badge = Badge(
+            name="Régularité", description="6 jours consécutifs", category=BadgeCategory.STREAK.value,
+            criteria={"type": "streak_days", "days": 6},
+        )
+        db_session.add(badge)
+        await db_session.commit()
+        badge_rules.invalidate()
+        streaks = StreakService(db_session)
+        
+        for day in range(6):
+            # Twice a day still counts once
+            await streaks.record_activity(season.id, [user.id], START + timedelta(days=day))
+            await streaks.record_activity(season.id, [user.id], START + timedelta(days=day, hours=2))
+            await db_session.commit()
+        
+        bonuses = await _bonuses(db_session, user.id)
+        assert [bonus.points for bonus in bonuses] == [STREAK_BONUS_POINTS]
+        assert bonuses[0].score_date == date(2025, 7, 6)
+        badges = await db_session.execute(select(UserBadge).where(UserBadge.user_id == user.id))
+        assert len(badges.scalars().all()) == 1
+        
+        assert await streaks.get_streak(user.id, season.id, START + timedelta(days=6)) == (6, 6)
+        assert await streaks.get_streak(user.id, season.id, START + timedelta(days=7)) == (0, 6)
+    
+    @pytest.mark.asyncio
+    async def test_gap_resets_current_streak(self, db_session):
+        user, season = await _user_and_season(db_session)
+        streaks = StreakService(db_session)
+        
+        for day in (0, 1, 2, 4):
+            await streaks.record_activity(season.id, [user.id], START + timedelta(days=day))
+            await db_session.commit()
+        
+        streak = await db_session.get(UserStreak, (user.id, season.id))
+        assert (streak.current_streak, streak.longest_streak) == (1, 3)
+    
+    @pytest.mark.asyncio
+    async def test_rebuild_replays_ledger_without_duplicating_bonuses(self, db_session):
+        user, season = await _user_and_season(db_session)
+        db_session.add_all([
+            Score(
+                user_id=user.id, season_id=season.id, points=10,
+                score_type=ScoreType.CHALLENGE_COMPLETION.value, description="Défi réussi",
+                created_at=START + timedelta(days=day),
+            )
+            for day in range(7)
+        ])
+        await db_session.commit()
+        
+        counts = await StreakService(db_session).rebuild(season.id)
+        assert counts == {"streaks": 1, "bonuses": 1}
+        assert await StreakService(db_session).rebuild(season.id) == {"streaks": 1, "bonuses": 0}
+        
+        streak = await db_session.get(UserStreak, (user.id, season.id))
+        assert (streak.current_streak, streak.longest_streak) == (7, 7)
+        assert len(await _bonuses(db_session, user.id)) == 1
@@ -0,0 +1,191 @@
+"""
+Tests for challenge submission validation and the background pipeline
+"""
+
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType, SubmissionStatus
+from app.models.scoring import Score
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.services.submission_pipeline import SubmissionPipeline
+from app.services.submission_service import SubmissionService, grade_quiz, grade_sport
+from app.utils.quiz_keys import AnswerKey
+from tests.conftest import TestSessionLocal
+
+QUIZ = {
+    "questions": [
+        {"question": "Altitude du lac ?", "options": ["447 m", "1200 m"], "correct": 0},
+        {"question": "Poisson emblématique ?", "options": ["Omble", "Requin"], "correct": 0},
+    ]
+}
+
+
+async def _member_and_challenge(db, challenge_type=ChallengeType.QUIZ, content=QUIZ):
+    user = User(id=uuid.uuid4(), email="camille@example.com")
+    season = Season(
+        id=uuid.uuid4(),
+        title="Été au lac",
+        location="Lac d'Annecy",
+        start_date=date(2025, 7, 1),
+        end_date=date(2025, 7, 31),
+        invitation_code="LAC001",
+        created_by=user.id,
+    )
+    challenge = Challenge(
+        id=uuid.uuid4(),
+        season_id=season.id,
+        title="Quiz du lac",
+        description="Deux questions",
+        type=challenge_type,
+        content=content,
+        base_points=20,
+        bonus_points=5,
+        challenge_date=datetime(2025, 7, 2),
+    )
+    db.add_all([user, season, challenge, SeasonMember(season_id=season.id, user_id=user.id)])
+    await db.commit()
+    return user, challenge
+
+
+async def _count(db, model) -> int:
+    result = await db.execute(select(func.count()).select_from(model))
+    return result.scalar()
+
+
+class TestGrading:
+    """Test cases for automatic grading."""
+    
+    def test_quiz(self):
+        key = AnswerKey.compile(QUIZ)
+        
+        assert grade_quiz(key, {"answers": [0, 0]})["score"] == 1.0
+        assert grade_quiz(key, {"answers": [0, 1]})["status"] == SubmissionStatus.APPROVED
+        assert grade_quiz(key, {"answers": [1]})["status"] == SubmissionStatus.REJECTED
+        assert grade_quiz(AnswerKey.compile({}), {"answers": [0]})["status"] == SubmissionStatus.NEEDS_REVIEW
+    
+    def test_sport(self):
+        content = {"activity": "hiking", "target_distance": 5000}
+        
+        assert grade_sport(content, {"distance": 5200})["status"] == SubmissionStatus.APPROVED
+        assert grade_sport(content, {"distance": 2500})["score"] == 0.5
+        assert grade_sport(content, {})["status"] == SubmissionStatus.REJECTED
+    
+    def test_sport_with_malformed_data(self):
+        content = {"activity": "hiking", "target_distance": 5000}
+        
+        for distance in ("abc", [5000], {"km": 5}, True, "nan", -10):
+            assert grade_sport(content, {"distance": distance})["status"] == SubmissionStatus.NEEDS_REVIEW
+        assert grade_sport(content, {"distance": "5200"})["status"] == SubmissionStatus.APPROVED
+        assert grade_sport({"target_distance": "loin"}, {"distance": 5200})["notes"] == "Challenge has no target"
+
+
+class TestSubmissionService:
+    """Test cases for submitting and validating."""
+    
+    @pytest.mark.asyncio
+    async def test_retried_submit_returns_same_submission(self, db_session):
+        user, challenge = await _member_and_challenge(db_session)
+        service = SubmissionService(db_session)
+        
+        first = await service.submit(challenge.id, user.id, {"answers": [0, 0]})
+        second = await service.submit(challenge.id, user.id, {"answers": [0, 0]})
+        
+        assert first.id == second.id
+        assert first.status == SubmissionStatus.PENDING
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_submit_returns_the_recorded_one(self, db_session, monkeypatch):
+        user, challenge = await _member_and_challenge(db_session)
+        service = SubmissionService(db_session)
+        user_id, challenge_id = user.id, challenge.id
+        first_id = (await service.submit(challenge_id, user_id, {"answers": [0, 0]})).id
+        
+        # The other submit checked before the first one was recorded
+        lookups = [None]
+        active_submission = service._active_submission
+        
+        async def racing(*args):
+            return lookups.pop() if lookups else await active_submission(*args)
+        
+        monkeypatch.setattr(service, "_active_submission", racing)
+        second = await service.submit(challenge_id, user_id, {"answers": [1, 1]})
+        
+        assert second.id == first_id
+        assert await _count(db_session, ChallengeSubmission) == 1
+        attempted = await db_session.scalar(
+            select(SeasonMember.challenges_attempted).where(SeasonMember.user_id == user_id)
+        )
+        assert attempted == 1
+    
+    @pytest.mark.asyncio
+    async def test_non_member_cannot_submit(self, db_session):
+        _, challenge = await _member_and_challenge(db_session)
+        outsider = User(id=uuid.uuid4(), email="outsider@example.com")
+        db_session.add(outsider)
+        await db_session.commit()
+        
+        assert await SubmissionService(db_session).submit(challenge.id, outsider.id, {}) is None
+    
+    @pytest.mark.asyncio
+    async def test_processing_is_idempotent(self, db_session):
+        user, challenge = await _member_and_challenge(db_session)
+        service = SubmissionService(db_session)
+        submission = await service.submit(challenge.id, user.id, {"answers": [0, 1]})
+        
+        assert await service.process_submission(submission.id) is True
+        assert await service.process_submission(submission.id) is False
+        
+        response = await service.get_submission_response(submission.id, user.id)
+        assert response.status == SubmissionStatus.APPROVED
+        assert response.points_awarded == 10
+        assert response.auto_validated is True
+        assert await _count(db_session, Score) == 1
+
+
+    @pytest.mark.asyncio
+    async def test_malformed_activity_data_goes_to_review(self, db_session):
+        user, challenge = await _member_and_challenge(
+            db_session, ChallengeType.SPORT, {"activity": "swimming", "target_distance": 500}
+        )
+        service = SubmissionService(db_session)
+        submission = await service.submit(challenge.id, user.id, {"distance": "abc"})
+        
+        assert await service.process_submission(submission.id) is True
+        await db_session.refresh(submission)
+        assert submission.status == SubmissionStatus.NEEDS_REVIEW
+        assert await _count(db_session, Score) == 0
+
+
+class TestSubmissionPipeline:
+    """Test cases for the background worker pool."""
+    
+    @pytest.mark.asyncio
+    async def test_workers_validate_queued_submissions(self, db_session):
+        user, challenge = await _member_and_challenge(db_session)
+        submission = await SubmissionService(db_session).submit(challenge.id, user.id, {"answers": [0, 0]})
+        # One worker: the in-memory test database shares a single connection
+        pipeline = SubmissionPipeline(session_factory=TestSessionLocal, workers=1, queue_size=10)
+        
+        # Pending submissions are recovered on start; the duplicate is a no-op
+        await pipeline.start()
+        assert pipeline.enqueue(submission.id)
+        await pipeline.stop()
+        
+        await db_session.refresh(submission)
+        assert submission.status == SubmissionStatus.APPROVED
+        assert submission.points_awarded == 25
+        scores = await db_session.execute(select(Score.points))
+        assert scores.scalars().all() == [25]
+    
+    @pytest.mark.asyncio
+    async def test_queue_is_bounded(self):
+        pipeline = SubmissionPipeline(session_factory=TestSessionLocal, workers=1, queue_size=1)
+        
+        assert pipeline.enqueue(uuid.uuid4())
+        assert pipeline.is_full()
+        assert not pipeline.enqueue(uuid.uuid4())
@@ -0,0 +1,120 @@
+"""
+Tests for bulk scoring and team challenges
+"""
+
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.challenge import Challenge, ChallengeSubmission, ChallengeType, SubmissionStatus
+from app.models.scoring import Score, ScoreType
+from app.models.season import Season, SeasonMember
+from app.models.user import User
+from app.services import scoring_service as scoring_module
+from app.services.scoring_service import ScoringService
+from app.services.submission_service import SubmissionService
+
+
+async def _family(db, size: int = 3):
+    users = [User(id=uuid.uuid4(), email=f"membre{n}@example.com") for n in range(size)]
+    season = Season(
+        id=uuid.uuid4(), title="Été au lac", location="Lac d'Annecy",
+        start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+        invitation_code="LAC001", created_by=users[0].id,
+    )
+    db.add_all(users + [season])
+    db.add_all([SeasonMember(season_id=season.id, user_id=user.id) for user in users])
+    await db.commit()
+    return season, users
+
+
+async def _members(db, season_id):
+    result = await db.execute(
+        select(SeasonMember.user_id, SeasonMember.total_points, SeasonMember.challenges_completed)
+        .where(SeasonMember.season_id == season_id)
+    )
+    return {row.user_id: (row.total_points, row.challenges_completed) for row in result}
+
+
+class TestBulkAward:
+    """Test cases for awarding the same points to several users."""
+    
+    @pytest.mark.asyncio
+    async def test_one_transaction_and_one_push(self, db_session, monkeypatch):
+        season, users = await _family(db_session)
+        challenge = Challenge(
+            id=uuid.uuid4(), season_id=season.id, title="Pique-nique", description="En famille",
+            type=ChallengeType.TEAM, is_team_challenge=True, challenge_date=datetime(2025, 7, 2),
+        )
+        db_session.add(challenge)
+        await db_session.commit()
+        pushes = []
+        monkeypatch.setattr(scoring_module.leaderboard_feed, "notify", pushes.append)
+        
+        scores = await ScoringService(db_session).award_points_bulk(
+            [user.id for user in users] + [users[0].id], season.id, 15, "Défi d'équipe", challenge_id=challenge.id
+        )
+        
+        assert len(scores) == 3
+        assert {score.user_id for score in scores} == {user.id for user in users}
+        assert all(score.id and score.score_type == ScoreType.TEAM_BONUS.value for score in scores)
+        assert pushes == [season.id]
+        assert await _members(db_session, season.id) == {user.id: (15, 1) for user in users}
+    
+    @pytest.mark.asyncio
+    async def test_empty_award(self, db_session):
+        season, _ = await _family(db_session, 1)
+        assert await ScoringService(db_session).award_points_bulk([], season.id, 15, "Rien") == []
+
+
+class TestTeamChallenge:
+    """Test cases for validating team challenge submissions."""
+    
+    @pytest.mark.asyncio
+    async def test_whole_family_earns_the_points(self, db_session):
+        season, users = await _family(db_session)
+        challenge = Challenge(
+            id=uuid.uuid4(), season_id=season.id, title="Tour du lac", description="À vélo",
+            type=ChallengeType.SPORT, is_team_challenge=True, content={"target_distance": 10},
+            base_points=30, bonus_points=0, challenge_date=datetime(2025, 7, 2),
+        )
+        db_session.add(challenge)
+        await db_session.commit()
+        
+        service = SubmissionService(db_session)
+        submission = await service.submit(challenge.id, users[0].id, {"distance": 12})
+        assert await service.process_submission(submission.id)
+        
+        result = await db_session.execute(select(Score.user_id, Score.score_type, Score.points))
+        scores = {row.user_id: (row.score_type, row.points) for row in result}
+        assert scores[users[0].id] == (ScoreType.CHALLENGE_COMPLETION.value, 30)
+        assert scores[users[1].id] == scores[users[2].id] == (ScoreType.TEAM_BONUS.value, 30)
+    
+    @pytest.mark.asyncio
+    async def test_awarded_once_when_several_teammates_submit(self, db_session):
+        season, users = await _family(db_session)
+        challenge = Challenge(
+            id=uuid.uuid4(), season_id=season.id, title="Tour du lac", description="À vélo",
+            type=ChallengeType.SPORT, is_team_challenge=True, content={"target_distance": 10},
+            base_points=30, bonus_points=0, challenge_date=datetime(2025, 7, 2),
+        )
+        db_session.add(challenge)
+        await db_session.commit()
+        
+        service = SubmissionService(db_session)
+        submissions = [await service.submit(challenge.id, user.id, {"distance": 12}) for user in users]
+        for submission in submissions:
+            assert await service.process_submission(submission.id)
+        
+        assert await _members(db_session, season.id) == {user.id: (30, 1) for user in users}
+        assert await db_session.scalar(select(func.count()).select_from(Score)) == 3
+        result = await db_session.execute(
+            select(ChallengeSubmission.user_id, ChallengeSubmission.status, ChallengeSubmission.points_awarded)
+        )
+        assert {row.user_id: (row.status, row.points_awarded) for row in result} == {
+            users[0].id: (SubmissionStatus.APPROVED, 30),
+            users[1].id: (SubmissionStatus.APPROVED, 0),
+            users[2].id: (SubmissionStatus.APPROVED, 0),
+        }